@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Runs the compiler benchmarks from a checkout, by default over the e2e
+stories. Takes the same options as `storyscript bench`, e.g.
+
+    python benchmarks/run.py --output results.json --baseline before.json
+"""
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+from storyscript.Cli import Cli  # noqa: E402
+
+
+if __name__ == '__main__':
+    corpus = os.path.join(root, 'tests', 'e2e')
+    Cli.bench.main(prog_name='run.py', default_map={'path': corpus})
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Times every phase of the compiler over small and large synthetic stories
+and bundles, and fails if a phase grows much faster than its input, e.g.
+
+    python benchmarks/scaling.py
+
+The tests only count calls, which don't depend on the load of the machine.
+This script measures the wall time and should run on an idle machine.
+"""
+import gc
+import os
+import sys
+import time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+from storyscript.Api import Api  # noqa: E402
+from storyscript.Benchmark import Benchmark  # noqa: E402
+from storyscript.StoryGenerator import StoryGenerator  # noqa: E402
+
+
+# growth of the input between the two runs of a shape
+factor = 4
+# phases faster than this are too noisy to be compared
+resolution = 0.005
+shapes = [('lines', 100), ('templates', 60), ('ladder', 60),
+          ('list_literal', 2000), ('nesting', 8), ('inline', 200)]
+
+
+def growth(before, after):
+    """
+    Returns the growth of a time, or `None` if it's too short to tell.
+    """
+    if after < resolution:
+        return None
+    return after / max(before, resolution / factor)
+
+
+def time_story(benchmark, story):
+    """
+    Times a story without the garbage collector, whose full collections
+    grow with the size of the heap rather than with the work of a phase.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        return benchmark.time_story(story)
+    finally:
+        gc.enable()
+
+
+def phases(shape, size):
+    """
+    Returns the growth of every phase of a shape.
+    """
+    benchmark = Benchmark(repeat=3)
+    generate = getattr(StoryGenerator(), shape)
+    small = time_story(benchmark, generate(size))
+    large = time_story(benchmark, generate(size * factor))
+    return {phase: growth(small[phase], large[phase])
+            for phase in Benchmark.phases}
+
+
+def bundle():
+    """
+    Returns the growth of compiling a bundle.
+    """
+    # the first compilation builds the parser
+    Api.loads('a = 0')
+    times = []
+    for count in (25, 25 * factor):
+        files = StoryGenerator().bundle(count, fan_in=10)
+        start = time.perf_counter()
+        Api.load_map(files).check_success()
+        times.append(time.perf_counter() - start)
+    return {'compile': times[1] / times[0]}
+
+
+def main():
+    failed = False
+    results = [(shape, phases(shape, size)) for shape, size in shapes]
+    results.append(('bundle', bundle()))
+    for shape, ratios in results:
+        for phase, ratio in ratios.items():
+            if ratio is None:
+                continue
+            slow = ratio >= factor * 2
+            failed = failed or slow
+            mark = ' (superlinear)' if slow else ''
+            print(f'{shape} {phase}: {ratio:.2f}x{mark}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -24,8 +24,8 @@ release_version = None
 try:
     result = {'__file__': path.join(root_dir, name, 'Version.py')}
     exec(read(path.join(name, 'Version.py')), result)
-    version = result['version']
-    release_version = result['release_version']
+    version = result['get_version']()
+    release_version = result['get_release_version']()
 except FileNotFoundError:
     pass
 
@@ -125,6 +125,9 @@ setup(name=name,
       license='MIT',
       packages=find_packages(),
       include_package_data=True,
+      package_data={
+          'storyscript.compiler.semantics.functions': ['hub.json']
+      },
       zip_safe=True,
       install_requires=requirements,
       extras_require={
@@ -1,125 +1,219 @@
 # -*- coding: utf-8 -*-
+import os
+
+from .Budget import Budget
 from .Bundle import Bundle
+from .CompilationResult import StoryscriptCompilationResult
+from .Profile import Profile
 from .Story import Story
 from .exceptions import StoryError
 
 
-class StoryscriptCompilationResult:
+class Api:
     """
-    Result of a Storyscript compilation.
-    Contains the compiled story or a list of compilation errors.
+    Exposes functionalities for external use
     """
-
-    def __init__(self, result, errors):
-        self._result = result
-        self._errors = errors
-        self._deprecations = []
-        self._warnings = []
-
-    @classmethod
-    def from_result(cls, story):
-        """
-        Creates a CompilationResult from a result.
-        """
-        return cls(story, errors=[])
-
-    @classmethod
-    def from_error(cls, error):
-        """
-        Creates a CompilationResult from a single error.
-        """
-        return cls(None, errors=[error])
-
-    def result(self):
-        """
-        Returns the compiled story.
-        """
-        return self._result
-
-    def errors(self):
-        """
-        Returns a list of all errorsemitted by the Storyscript compiler.
-        """
-        return self._errors
-
-    def warnings(self):
-        """
-        Returns a list of all warnings emitted by the Storyscript compiler.
-        """
-        return self._warnings
-
-    def deprecations(self):
+    @staticmethod
+    def session(cache_size=128, catalogues=None):
         """
-        Returns a list of all deprecations emitted by the Storyscript compiler.
+        Creates a session for compiling many stories, which shares the parser
+        and caches results between compilations. `catalogues` are files of
+        additional mutations, e.g. of other engines.
         """
-        return self._deprecations
+        from .CompilerSession import CompilerSession
+        return CompilerSession(cache_size=cache_size, catalogues=catalogues)
 
-    def success(self):
+    @staticmethod
+    def profile(profile):
         """
-        Returns `True` if the compilation succeeded.
+        Returns the profile measuring a compilation and its totals so far.
+        Compilations are always measured, without tracing memory, s.t. their
+        results have metrics.
         """
-        return self._result is not None
+        if profile is None:
+            profile = Profile(memory=False)
+        return profile, profile.totals()
 
-    def check_success(self):
+    @staticmethod
+    def loads(string, debug=False, budget=None, stop_after=None,
+              profile=None):
         """
-        Throws the first error encountered if the compilation did not succeed.
+        Load story from a string. With `stop_after`, the story is only
+        checked up to the given stage and the result is its tree. The
+        compilation is measured by `profile`, if given.
         """
-        if len(self._errors) > 0:
-            raise self._errors[0]
-
+        profile, baseline = Api.profile(profile)
+        try:
+            with Profile.use(profile):
+                s = Story(string).process(budget=budget,
+                                          stop_after=stop_after)
+            result = StoryscriptCompilationResult.from_result(s)
+        except StoryError as e:
+            result = StoryscriptCompilationResult.from_error(e)
+        except Exception as e:
+            if debug:
+                raise e
+            else:
+                e = StoryError.internal_error(e)
+                result = StoryscriptCompilationResult.from_error(e)
+        stories = {'<string>': result.result()}
+        metrics = profile.metrics([string], stories, baseline=baseline)
+        return result.measured(metrics)
 
-class Api:
-    """
-    Exposes functionalities for external use
-    """
     @staticmethod
-    def loads(string, debug=False):
+    def load(stream, debug=False, budget=None, stop_after=None,
+             profile=None):
         """
-        Load story from a string.
+        Load story from a file stream.
         """
+        profile, baseline = Api.profile(profile)
+        sources = []
+        stories = {}
         try:
-            s = Story(string).process()
-            return StoryscriptCompilationResult.from_result(s)
+            name = getattr(stream, 'name', '<stream>')
+            with Profile.use(profile), Profile.story(name):
+                with Profile.phase('read'):
+                    story = Story.from_stream(stream)
+                sources.append(story.story)
+                story = story.process(budget=budget, stop_after=stop_after)
+            stories = {name: story}
+            if stop_after is None:
+                s = {name: story, 'services': story['services']}
+            else:
+                s = {name: story}
+            result = StoryscriptCompilationResult.from_result(s)
         except StoryError as e:
-            return StoryscriptCompilationResult.from_error(e)
+            result = StoryscriptCompilationResult.from_error(e)
         except Exception as e:
             if debug:
                 raise e
             else:
                 e = StoryError.internal_error(e)
-                return StoryscriptCompilationResult.from_error(e)
+                result = StoryscriptCompilationResult.from_error(e)
+        metrics = profile.metrics(sources, stories, baseline=baseline)
+        return result.measured(metrics)
 
     @staticmethod
-    def load(stream, debug=False):
+    def load_map(files, debug=False, budget=None, stop_after=None,
+                 profile=None):
         """
-        Load story from a file stream.
+        Load multiple stories from a file mapping. The budget is shared by
+        all stories.
         """
+        profile, baseline = Api.profile(profile)
+        bundle = Bundle(story_files=files)
+        stories = {}
         try:
-            story = Story.from_stream(stream).process()
-            s = {stream.name: story, 'services': story['services']}
-            return StoryscriptCompilationResult.from_result(s)
+            with Budget.use(budget), Profile.use(profile):
+                s = bundle.bundle(stop_after=stop_after)
+            stories = s['stories']
+            result = StoryscriptCompilationResult.from_result(s)
         except StoryError as e:
-            return StoryscriptCompilationResult.from_error(e)
+            result = StoryscriptCompilationResult.from_error(e)
         except Exception as e:
             if debug:
                 raise e
             else:
                 e = StoryError.internal_error(e)
-                return StoryscriptCompilationResult.from_error(e)
+                result = StoryscriptCompilationResult.from_error(e)
+        # imported stories are read from the disk
+        sources = bundle.story_files.values()
+        metrics = profile.metrics(sources, stories, baseline=baseline)
+        return result.measured(metrics)
 
     @staticmethod
-    def load_map(files, debug=False):
+    async def run_async(executor, timeout, fn, *args):
+        """
+        Runs a function in an executor without blocking the event loop.
+        The default executor of the loop is used if `executor` is None.
+        Raises `asyncio.TimeoutError` after `timeout` seconds. Cancelling
+        the coroutine cancels compilations that haven't started yet, while
+        running ones are left to finish in the background.
+        """
+        import asyncio
+        loop = asyncio.get_event_loop()
+        future = loop.run_in_executor(executor, fn, *args)
+        return await asyncio.wait_for(future, timeout)
+
+    @staticmethod
+    async def aloads(string, debug=False, executor=None, timeout=None,
+                     budget=None):
         """
-        Load multiple stories from a file mapping
+        Load story from a string in an executor, which can be a process
+        pool.
+        """
+        return await Api.run_async(executor, timeout, Api.loads, string,
+                                   debug, budget)
+
+    @staticmethod
+    async def aload(stream, debug=False, executor=None, timeout=None,
+                    budget=None):
+        """
+        Load story from a file stream in an executor, which can be a process
+        pool. The stream is read on the event loop.
         """
         try:
-            s = Bundle(story_files=files).bundle()
-            return StoryscriptCompilationResult.from_result(s)
-        except StoryError as e:
-            return StoryscriptCompilationResult.from_error(e)
+            name = getattr(stream, 'name', '<stream>')
+            source = stream.read()
         except Exception as e:
             if debug:
                 raise e
             else:
                 e = StoryError.internal_error(e)
                 return StoryscriptCompilationResult.from_error(e)
+        result = await Api.run_async(executor, timeout, Api.loads, source,
+                                     debug, budget)
+        if not result.success():
+            return result
+        story = result.result()
+        s = {name: story, 'services': story['services']}
+        result = StoryscriptCompilationResult.from_result(s).measured(
+            result.metrics())
+        return result
+
+    @staticmethod
+    async def aload_map(files, debug=False, executor=None, timeout=None,
+                        budget=None):
+        """
+        Load multiple stories from a file mapping in an executor, which can
+        be a process pool.
+        """
+        return await Api.run_async(executor, timeout, Api.load_map, files,
+                                   debug, budget)
+
+    @staticmethod
+    def loads_many(sources, jobs=None, ordered=True, debug=False,
+                   executor=None):
+        """
+        Load many independent stories from strings, yielding a result per
+        story. Stories are compiled by `jobs` warm worker processes, which
+        default to the number of CPUs, or by `executor` if given. With
+        `ordered=False`, `(index, result)` pairs are yielded as soon as
+        stories are compiled.
+        """
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        if executor is not None:
+            from .Batch import Batch
+            batch = Batch(executor, 2 * jobs, debug=debug)
+            return batch.run(Api.loads, sources, ordered=ordered)
+        if jobs == 1:
+            results = (Api.loads(source, debug=debug) for source in sources)
+            if ordered:
+                return results
+            return enumerate(results)
+        return Api.loads_pool(sources, jobs, ordered, debug)
+
+    @staticmethod
+    def loads_pool(sources, jobs, ordered, debug):
+        """
+        Load stories in a pool of `jobs` worker processes, which live as
+        long as the batch. A pool broken by a dying worker is replaced.
+        """
+        from .Batch import Batch, start_pool
+        batch = Batch(start_pool(jobs), 2 * jobs, debug=debug,
+                      factory=lambda: start_pool(jobs))
+        try:
+            yield from batch.run(Api.loads, sources, ordered=ordered)
+        finally:
+            batch.executor.shutdown()
@@ -2,6 +2,8 @@
 import json
 
 from .Bundle import Bundle
+from .FileSystem import FileSystem
+from .Shards import Shards
 from .exceptions import StoryError
 from .parser import Grammar
 
@@ -20,12 +22,28 @@ class App:
         return bundle.bundle_trees(ebnf=ebnf, lower=lower)
 
     @staticmethod
-    def compile(path, ignored_path=None, ebnf=None, concise=False,
-                first=False):
+    def bundle(path, ignored_path=None, entries=None, index=None,
+               excluded=None):
+        """
+        Loads the bundle of stories found in path or, when entries are
+        given, the bundle reachable from these entrypoints. Entrypoints are
+        looked up inside path when it is an archive. Directories are scanned
+        with the directory `index` file, skipping `excluded` directories.
+        """
+        if entries:
+            filesystem = FileSystem.from_path(path)
+            return Bundle.from_entries(entries, filesystem=filesystem)
+        return Bundle.from_path(path, ignored_path=ignored_path, index=index,
+                                excluded=excluded)
+
+    @classmethod
+    def compile(cls, path, ignored_path=None, ebnf=None, concise=False,
+                first=False, entries=None, index=None, excluded=None):
         """
         Parses and compiles stories found in path, returning JSON
         """
-        bundle = Bundle.from_path(path, ignored_path=ignored_path)
+        bundle = cls.bundle(path, ignored_path=ignored_path, entries=entries,
+                            index=index, excluded=excluded)
         result = bundle.bundle(ebnf=ebnf)
         if concise:
             result = _clean_dict(result)
@@ -35,6 +53,37 @@ class App:
             result = next(iter(result['stories'].values()))
         return json.dumps(result, indent=2)
 
+    @classmethod
+    def check(cls, path, ignored_path=None, ebnf=None, entries=None,
+              stage=None, index=None, excluded=None):
+        """
+        Checks stories found in path up to a stage: `parse`, `lower` or
+        `semantics`. All stages are run if no stage is given. Errors are
+        raised like in a full compilation.
+        """
+        # the JSON generation raises errors of its own, so checking the
+        # semantics runs it too
+        if stage == 'semantics':
+            stage = None
+        bundle = cls.bundle(path, ignored_path=ignored_path, entries=entries,
+                            index=index, excluded=excluded)
+        bundle.bundle(ebnf=ebnf, stop_after=stage)
+
+    @classmethod
+    def compile_shards(cls, path, output_dir, ignored_path=None, ebnf=None,
+                       concise=False, entries=None, index=None,
+                       excluded=None):
+        """
+        Parses and compiles stories found in path, writing one JSON file per
+        story and a manifest to output_dir. Returns the written files.
+        """
+        bundle = cls.bundle(path, ignored_path=ignored_path, entries=entries,
+                            index=index, excluded=excluded)
+        result = bundle.bundle(ebnf=ebnf)
+        if concise:
+            result['stories'] = _clean_dict(result['stories'])
+        return Shards(output_dir).write(result)
+
     @staticmethod
     def lex(path, ebnf=None):
         """
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, \
+    ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .CompilationResult import StoryscriptCompilationResult
+from .Story import Story
+from .exceptions import StoryError
+
+
+def warm_worker():
+    """
+    Builds the parser of a worker before it receives its first story.
+    """
+    Story('a = 0').process()
+
+
+def start_pool(workers):
+    """
+    Starts a pool of `workers` processes. Every worker is sent a warm-up
+    task, which runs before the first story.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers)
+    for _ in range(workers):
+        executor.submit(warm_worker)
+    return executor
+
+
+class Batch:
+    """
+    Compiles independent stories in an executor. At most `window` stories
+    are submitted at a time, s.t. sources can be streamed.
+
+    A worker process that dies breaks its pool. With a `factory`, the
+    broken pool is replaced by a new one and the stories it was compiling
+    are compiled again, one at a time, s.t. only the story that killed its
+    worker fails.
+    """
+
+    def __init__(self, executor, window, debug=False, factory=None):
+        self.executor = executor
+        self.window = window
+        self.debug = debug
+        self.factory = factory
+
+    def result(self, future):
+        """
+        Returns the result of a compilation. Failures of the executor only
+        affect the story they happened on.
+        """
+        try:
+            return future.result()
+        except Exception as e:
+            if self.debug:
+                raise e
+            e = StoryError.internal_error(e)
+            return StoryscriptCompilationResult.from_error(e)
+
+    def run(self, compile, sources, ordered=True):
+        if ordered:
+            return self.ordered(compile, sources)
+        return self.completed(compile, sources)
+
+    def submit(self, compile, source):
+        """
+        Submits a story. A broken executor is replaced if the batch has a
+        `factory`, and fails the story otherwise.
+        """
+        try:
+            return self.executor.submit(compile, source, self.debug)
+        except BrokenProcessPool as e:
+            if self.factory is None:
+                future = Future()
+                future.set_exception(e)
+                return future
+        self.executor.shutdown(wait=False)
+        self.executor = self.factory()
+        return self.executor.submit(compile, source, self.debug)
+
+    def outcome(self, compile, source, future, pending):
+        """
+        Returns the result of a story. A story whose worker died is
+        compiled again once the `pending` futures are done, s.t. it is the
+        only story of the new executor.
+        """
+        if self.factory is not None and \
+                isinstance(future.exception(), BrokenProcessPool):
+            wait(pending)
+            future = self.submit(compile, source)
+        return self.result(future)
+
+    def ordered(self, compile, sources):
+        """
+        Yields the results in the order of the sources.
+        """
+        pending = deque()
+        try:
+            for source in sources:
+                pending.append((self.submit(compile, source), source))
+                if len(pending) >= self.window:
+                    yield self.next(compile, pending)
+            while pending:
+                yield self.next(compile, pending)
+        finally:
+            for future, _ in pending:
+                future.cancel()
+
+    def next(self, compile, pending):
+        """
+        Returns the result of the first of the `pending` stories.
+        """
+        future, source = pending.popleft()
+        return self.outcome(compile, source, future,
+                            [future for future, _ in pending])
+
+    def completed(self, compile, sources):
+        """
+        Yields `(index, result)` pairs as soon as stories are compiled.
+        """
+        pending = {}
+        try:
+            for index, source in enumerate(sources):
+                pending[self.submit(compile, source)] = (index, source)
+                if len(pending) >= self.window:
+                    yield from self.done(compile, pending)
+            while pending:
+                yield from self.done(compile, pending)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def done(self, compile, pending):
+        """
+        Yields `(index, result)` pairs of the `pending` stories, once at
+        least one of them is compiled.
+        """
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, source = pending.pop(future)
+            yield index, self.outcome(compile, source, future, pending)
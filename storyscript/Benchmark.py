@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from . import Version
+from .Story import Story
+from .StoryGenerator import StoryGenerator
+from .compiler.json.JSONCompiler import JSONCompiler
+from .compiler.lowering import Compactor, Lowering
+from .compiler.semantics import Semantics
+from .parser import Parser, Transformer
+
+
+class Benchmark:
+    """
+    Times each phase of the compiler separately, over a corpus of stories
+    (e.g. `tests/e2e`) and over large synthetic stories, and the cold import
+    time of the package. Results are plain dictionaries, s.t. they can be
+    stored as JSON and compared between commits.
+    """
+    # the format of the results
+    format = 1
+
+    # `parse` includes lexing, as the parser lexes lazily
+    phases = ['lex', 'parse', 'transform', 'lower', 'semantics', 'json']
+    # the statements whose import time is measured
+    imports = {'package': 'import storyscript',
+               'cli': 'import storyscript.Cli',
+               'compiler': 'import storyscript.Api'}
+
+    def __init__(self, repeat=3, ebnf=None):
+        self.repeat = repeat
+        self.parser = Parser(ebnf=ebnf)
+
+    @staticmethod
+    def corpus(path):
+        """
+        Yields `(name, source)` for the stories of a directory, or a single
+        story.
+        """
+        if os.path.isfile(path):
+            yield os.path.basename(path), Story.read(path)
+            return
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.story'):
+                    story_path = os.path.join(root, name)
+                    name = os.path.relpath(story_path, path)
+                    yield name, Story.read(story_path)
+
+    @staticmethod
+    def synthetic(size=1000, seed=0):
+        """
+        Yields `(name, source)` for synthetic stories of about `size` lines,
+        one per shape of code.
+        """
+        generator = StoryGenerator(seed)
+        yield 'lines', generator.lines(size)
+        yield 'templates', generator.templates(size)
+        yield 'ladder', generator.ladder(size // 2)
+        yield 'list', generator.list_literal(size * 10)
+        yield 'nesting', generator.nesting(30)
+        yield 'inline', generator.inline(size // 10)
+
+    def time_phases(self, source):
+        """
+        Compiles a story once, returning the time of each phase in seconds.
+        """
+        times = {}
+        source = f'{source}\n'
+        start = time.perf_counter()
+        list(self.parser.lark.lex(source))
+        times['lex'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tree = self.parser.lark.parse(source)
+        times['parse'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tree = Transformer().transform(tree)
+        tree.parser = self.parser
+        times['transform'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tree = Lowering(parser=self.parser).process(tree)
+        tree = Compactor.process(tree)
+        times['lower'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tree = Semantics().process(tree)
+        times['semantics'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        JSONCompiler(Story(source)).compile(tree)
+        times['json'] = time.perf_counter() - start
+        return times
+
+    @staticmethod
+    def importtime(statement):
+        """
+        Runs a statement in a fresh interpreter with `-X importtime`,
+        returning the module, the cumulative import time in microseconds and
+        the nesting depth of every import.
+        """
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        command = [sys.executable, '-X', 'importtime', '-c', statement]
+        p = subprocess.run(command, stderr=subprocess.PIPE, encoding='utf8',
+                           env=env, check=True)
+        imports = []
+        for line in p.stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            _, cumulative, module = line[len('import time:'):].split('|')
+            if not cumulative.strip().isdigit():
+                continue
+            depth = (len(module) - len(module.lstrip()) - 1) // 2
+            imports.append((module.strip(), int(cumulative), depth))
+        return imports
+
+    def time_imports(self):
+        """
+        Returns the best cold import time of every statement of `imports`
+        in seconds, without the modules the interpreter imports at startup.
+        `-X importtime` needs Python 3.7, before which `None` is returned.
+        """
+        if sys.version_info < (3, 7):
+            return None
+        startup = set(module for module, _, _ in self.importtime('pass'))
+        times = {}
+        for name, statement in self.imports.items():
+            best = None
+            for _ in range(self.repeat):
+                total = sum(cumulative for module, cumulative, depth
+                            in self.importtime(statement)
+                            if depth == 0 and module not in startup)
+                if best is None or total < best:
+                    best = total
+            times[name] = best / 1e6
+        return times
+
+    def time_story(self, source):
+        """
+        Returns the best time of each phase over the repetitions.
+        """
+        best = None
+        for _ in range(self.repeat):
+            times = self.time_phases(source)
+            if best is None:
+                best = times
+            else:
+                best = {phase: min(best[phase], times[phase])
+                        for phase in self.phases}
+        return best
+
+    def run(self, stories):
+        """
+        Times a suite of stories. Stories that don't compile are listed as
+        failed and left out of the totals.
+        """
+        results = {}
+        failed = []
+        totals = {phase: 0 for phase in self.phases}
+        for name, source in stories:
+            if source.strip() == '':
+                continue
+            try:
+                times = self.time_story(source)
+            except Exception:
+                failed.append(name)
+                continue
+            times['lines'] = len(source.splitlines())
+            results[name] = times
+            for phase in self.phases:
+                totals[phase] += times[phase]
+        return {'stories': len(results), 'failed': failed,
+                'totals': totals, 'results': results}
+
+    def report(self, suites, imports=True):
+        """
+        Runs the given suites, a dictionary of suite names and stories, and
+        times the imports unless `imports` is false.
+        """
+        revision = None
+        if Version.is_checkout():
+            try:
+                revision = Version.git_describe()
+            except Exception:
+                pass
+        return {
+            'format': self.format,
+            'version': Version.version,
+            'revision': revision,
+            'python': platform.python_version(),
+            'repeat': self.repeat,
+            'phases': self.phases,
+            'suites': {name: self.run(stories)
+                       for name, stories in suites.items()},
+            'imports': self.time_imports() if imports else None,
+        }
+
+    @classmethod
+    def compare(cls, baseline, report):
+        """
+        Compares the phase totals of two reports, returning the ratio of
+        each phase per suite (e.g. 1.1 for 10% slower), and the ratios of
+        the import times as the `imports` suite.
+        """
+        ratios = {}
+        before = baseline.get('imports') or {}
+        after = report.get('imports') or {}
+        imports = {name: after[name] / before[name] for name in after
+                   if before.get(name)}
+        if imports:
+            ratios['imports'] = imports
+        for suite, results in report['suites'].items():
+            base = baseline['suites'].get(suite)
+            if base is None:
+                continue
+            ratios[suite] = {}
+            for phase in cls.phases:
+                before = base['totals'].get(phase)
+                if before:
+                    ratios[suite][phase] = results['totals'][phase] / before
+        return ratios
+
+    @staticmethod
+    def dumps(report):
+        return json.dumps(report, indent=2, sort_keys=True)
+
+    @classmethod
+    def write(cls, report, path):
+        with io.open(path, 'w', encoding='utf8') as f:
+            f.write(cls.dumps(report))
+
+    @staticmethod
+    def load(path):
+        with io.open(path, 'r', encoding='utf8') as f:
+            return json.load(f)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from contextlib import contextmanager
+
+from .exceptions import CompilerError
+
+
+_local = threading.local()
+
+
+class Budget:
+    """
+    Limits the resources a compilation may use: its wall time in seconds, the
+    number of nodes of its tree, its nesting depth and the number of lines
+    generated by the lowering. Limits that are `None` are not enforced.
+
+    The nesting depth counts the indented blocks, lists, objects and
+    parenthesized expressions a statement is nested in, e.g. `a = 1` has a
+    depth of 0 and `a = [(b + 1)]` a depth of 2.
+
+    The budget of the running compilation is kept per thread. The compiler
+    checks it at phase boundaries and in its main loops, raising
+    `budget_exceeded` as soon as a limit is exceeded.
+    """
+
+    def __init__(self, time=None, nodes=None, depth=None, fake_lines=None):
+        self.time = time
+        self.nodes = nodes
+        self.depth = depth
+        self.fake_lines = fake_lines
+        self.deadline = None
+        self.fake_line_count = 0
+
+    def start(self):
+        """
+        Returns a fresh copy of the budget, whose clock starts now.
+        """
+        budget = Budget(time=self.time, nodes=self.nodes, depth=self.depth,
+                        fake_lines=self.fake_lines)
+        if self.time is not None:
+            budget.deadline = time.monotonic() + self.time
+        return budget
+
+    @staticmethod
+    def current():
+        """
+        Returns the budget of the running compilation, or `None`.
+        """
+        return getattr(_local, 'budget', None)
+
+    @staticmethod
+    @contextmanager
+    def use(budget):
+        """
+        Enforces a budget for the compilations run in the context.
+        """
+        if budget is None:
+            yield
+            return
+        previous = Budget.current()
+        _local.budget = budget.start()
+        try:
+            yield
+        finally:
+            _local.budget = previous
+
+    @staticmethod
+    def exceeded(limit):
+        return CompilerError('budget_exceeded', format={'limit': limit})
+
+    @classmethod
+    def check_time(cls):
+        """
+        Stops the compilation once its time is up.
+        """
+        budget = cls.current()
+        if budget is None or budget.deadline is None:
+            return
+        if time.monotonic() > budget.deadline:
+            limit = f'time limit of {budget.time} seconds'
+            raise cls.exceeded(limit)
+
+    @staticmethod
+    def nests(node):
+        """
+        Checks whether a node opens a nesting level.
+        """
+        if node.data == 'primary_expression':
+            child = node.children[0]
+            return getattr(child, 'data', None) == 'or_expression'
+        return node.data in ('nested_block', 'list', 'map')
+
+    @classmethod
+    def check_tree(cls, tree):
+        """
+        Stops the compilation if a tree has too many nodes or is nested too
+        deeply. The tree is walked iteratively, s.t. deep trees can be
+        rejected before they are visited recursively.
+        """
+        budget = cls.current()
+        if budget is None or (budget.nodes is None and budget.depth is None):
+            return
+        count = 0
+        stack = [(tree, 0)]
+        while stack:
+            node, depth = stack.pop()
+            count += 1
+            if budget.nodes is not None and count > budget.nodes:
+                raise cls.exceeded(f'limit of {budget.nodes} nodes')
+            if not hasattr(node, 'children'):
+                continue
+            if cls.nests(node):
+                depth += 1
+                if budget.depth is not None and depth > budget.depth:
+                    limit = f'nesting depth limit of {budget.depth}'
+                    raise cls.exceeded(limit)
+            for child in node.children:
+                stack.append((child, depth))
+        cls.check_time()
+
+    @classmethod
+    def add_fake_line(cls):
+        """
+        Accounts for a line generated by the lowering.
+        """
+        budget = cls.current()
+        if budget is None:
+            return
+        budget.fake_line_count += 1
+        if budget.fake_lines is not None and \
+                budget.fake_line_count > budget.fake_lines:
+            limit = f'limit of {budget.fake_lines} generated lines'
+            raise cls.exceeded(limit)
+        cls.check_time()
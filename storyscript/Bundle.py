@@ -2,6 +2,8 @@
 import os
 import subprocess
 
+from .FileSystem import FileSystem, LocalFileSystem
+from .Profile import Profile
 from .Story import Story
 from .parser import Parser
 
@@ -11,19 +13,23 @@ class Bundle:
     Bundles all stories that must be compiled together.
     """
 
-    def __init__(self, story_files=None):
+    def __init__(self, story_files=None, filesystem=None):
         self.stories = {}
         if story_files is None:
             story_files = {}
+        if filesystem is None:
+            filesystem = LocalFileSystem()
         self.story_files = story_files
+        self.filesystem = filesystem
 
     @staticmethod
     def gitignores():
         """
-        Get the list of files ignored by git
+        Get the list of files ignored by git. Ignored directories are listed
+        once, with a trailing slash.
         """
         command = ['git', 'ls-files', '--others', '--ignored',
-                   '--exclude-standard']
+                   '--exclude-standard', '--directory']
         p = subprocess.run(command,
                            stdout=subprocess.PIPE,
                            stderr=subprocess.DEVNULL,
@@ -34,53 +40,66 @@ class Bundle:
 
     @staticmethod
     def ignores(path):
-        ignores = []
+        """
+        Get the list of ignored paths. Ignored directories are pruned as a
+        whole and listed with a trailing slash.
+        """
         if os.path.isdir(path):
-            for root, subdirs, files in os.walk(path):
-                for file in files:
-                    if file.endswith('.story'):
-                        story = os.path.relpath(os.path.join(root, file))
-                        ignores.append(story)
-            return ignores
+            return [os.path.join(os.path.relpath(path), '')]
         return [os.path.relpath(path)]
 
-    @staticmethod
-    def filter_path(root, filename, ignores):
-        if filename.endswith('.story'):
-            path = os.path.relpath(os.path.join(root, filename))
-            if path not in ignores:
-                return path
-        return None
-
     @classmethod
-    def parse_directory(cls, directory, ignored_path=None):
+    def directory_ignores(cls, ignored_path=None):
         """
-        Parse a directory to find stories.
+        Returns the paths ignored when scanning a directory: the files
+        ignored by git and the stories of `ignored_path`.
         """
-        paths = []
         ignores = cls.gitignores()
         if ignored_path:
             ignores = ignores + cls.ignores(ignored_path)
-        for root, subdirs, files in os.walk(directory):
-            for file in files:
-                path = cls.filter_path(root, file, ignores)
-                if path:
-                    paths.append(path)
-        return paths
+        return ignores
+
+    @classmethod
+    def parse_directory(cls, directory, ignored_path=None, index=None,
+                        excluded=None):
+        """
+        Parse a directory to find stories.
+        """
+        filesystem = LocalFileSystem(directory, excluded=excluded,
+                                     index=index)
+        return filesystem.stories(ignores=cls.directory_ignores(ignored_path))
 
     @classmethod
-    def from_path(cls, path, ignored_path=None):
+    def from_path(cls, path, ignored_path=None, index=None, excluded=None):
         """
         Load a bundle of stories from the filesystem.
         If a directory is given. all `.story` files in the directory will be
-        loaded.
-        """
-        bundle = Bundle()
+        loaded, except in directories named like one of `excluded`. `index`
+        is an optional file used to persist directory listings between runs.
+        Zip and tar archives are read without extracting them and all of
+        their stories are loaded.
+        """
+        filesystem = FileSystem.from_path(path, excluded=excluded,
+                                          index=index)
+        ignores = None
         if os.path.isdir(path):
-            for story in cls.parse_directory(path, ignored_path=ignored_path):
-                bundle.load_story(story)
-            return bundle
-        bundle.load_story(path)
+            ignores = cls.directory_ignores(ignored_path)
+        bundle = Bundle(filesystem=filesystem)
+        for story in filesystem.stories(ignores=ignores):
+            bundle.load_story(story)
+        return bundle
+
+    @classmethod
+    def from_entries(cls, entries, filesystem=None):
+        """
+        Load a bundle from explicit entrypoints. Only the entrypoints and the
+        modules they import, directly or transitively, will be compiled.
+        """
+        if filesystem is None:
+            filesystem = LocalFileSystem()
+        bundle = Bundle(filesystem=filesystem)
+        for entry in entries:
+            bundle.load_story(filesystem.normalize(entry))
         return bundle
 
     def load_story(self, path):
@@ -88,7 +107,8 @@ class Bundle:
         Reads a story file and adds it to the loaded stories
         """
         if path not in self.story_files:
-            self.story_files[path] = Story.read(path)
+            with Profile.story(path), Profile.phase('read'):
+                self.story_files[path] = self.filesystem.read(path)
         return Story(self.story_files[path])
 
     def find_stories(self):
@@ -115,30 +135,53 @@ class Bundle:
         Parse stories.
         """
         for storypath in stories:
+            if storypath in self.stories:
+                continue
             story = self.load_story(storypath)
-            story.parse(parser=parser, lower=lower)
+            with Profile.story(storypath):
+                story.parse(parser=parser, lower=lower)
             self.parse(story.modules(), parser=parser, lower=lower)
             self.stories[storypath] = story.tree
 
-    def compile(self, stories, parser):
+    def compile(self, stories, parser, mutation_table=None, stop_after=None):
         """
         Reads and parses a story, then compiles its modules and finally
-        compiles the story itself.
+        compiles the story itself. Stories are only compiled once, even if
+        they are imported by several stories. With `stop_after`, the trees
+        of the last stage are kept instead.
         """
         for storypath in stories:
+            if storypath in self.stories:
+                continue
             story = self.load_story(storypath)
-            story.parse(parser=parser)
-            self.compile(story.modules(), parser=parser)
-            story.compile()
-            self.stories[storypath] = story.compiled
-
-    def bundle(self, ebnf=None):
-        """
-        Makes the bundle
+            with Profile.story(storypath):
+                story.parse(parser=parser)
+            self.compile(story.modules(), parser=parser,
+                         mutation_table=mutation_table, stop_after=stop_after)
+            if stop_after == 'parse':
+                self.stories[storypath] = story.tree
+                continue
+            with Profile.story(storypath):
+                story.compile(mutation_table=mutation_table,
+                              stop_after=stop_after)
+            if stop_after is None:
+                self.stories[storypath] = story.compiled
+            else:
+                self.stories[storypath] = story.tree
+
+    def bundle(self, ebnf=None, parser=None, mutation_table=None,
+               stop_after=None):
+        """
+        Makes the bundle. When stopping after an earlier stage, the bundle
+        holds the trees of that stage and no services.
         """
         entrypoint = self.find_stories()
-        parser = self.parser(ebnf)
-        self.compile(entrypoint, parser=parser)
+        if parser is None:
+            parser = self.parser(ebnf)
+        self.compile(entrypoint, parser=parser, mutation_table=mutation_table,
+                     stop_after=stop_after)
+        if stop_after is not None:
+            return {'stories': self.stories, 'entrypoint': entrypoint}
         return {'stories': self.stories, 'services': self.services(),
                 'entrypoint': entrypoint}
 
@@ -158,5 +201,5 @@ class Bundle:
         parser = self.parser(ebnf)
         results = {}
         for story in stories:
-            results[story] = Story.from_file(story).lex(parser=parser)
+            results[story] = self.load_story(story).lex(parser=parser)
         return results
@@ -1,14 +1,16 @@
 # -*- coding: utf-8 -*-
 import io
 import os
+from contextlib import contextmanager
 
 import click
 
 from click_alias import ClickAliasedGroup
 
-from .App import App
+from . import Version
+from .Client import Client, RemoteError
 from .Project import Project
-from .Version import version as app_version
+from .Stages import Stages
 from .exceptions import StoryError
 
 
@@ -17,6 +19,117 @@ class Cli:
     version_help = 'Prints Storyscript version'
     silent_help = 'Silent mode. Return syntax errors only.'
     ebnf_help = 'Load the grammar from a file. Useful for development'
+    output_dir_help = ('Write one file per story and a manifest to this '
+                       'directory')
+    entry_help = ('Compile only this story and the stories it imports. '
+                  'Can be given multiple times')
+    stage_help = 'Stop after this stage. By default, all stages are run'
+    index_help = ('Keep the directory listings in this file, s.t. unchanged '
+                  'directories are not listed again')
+    exclude_help = ('Skip directories with this name, e.g. node_modules. '
+                    'Can be given multiple times')
+    # importing the stages doesn't import the compiler
+    stages = Stages.stoppable
+    profile_help = ('Measure each story and print a report as a table or as '
+                    'JSON to stderr')
+    cprofile_help = 'Profile the compilation with cProfile into this file'
+    tracemalloc_help = ('Write the top allocation sites of the compilation '
+                        'to this file')
+    repeat_help = 'Compile every story this many times, keeping the best'
+    size_help = 'The number of lines of the synthetic stories'
+    synthetic_help = 'Also time large synthetic stories'
+    imports_help = 'Also time the cold imports of the package'
+    bench_output_help = 'Write the results to this file instead of stdout'
+    baseline_help = 'Compare the results with the results in this file'
+    socket_help = 'Listen on this Unix socket'
+    stdio_help = 'Read requests from stdin and write responses to stdout'
+
+    @staticmethod
+    def client(debug):
+        """
+        Returns a client of the running compile server, if any. Debugging
+        always happens in-process.
+        """
+        if debug:
+            return None
+        return Client.connect()
+
+    @staticmethod
+    @contextmanager
+    def measure(profiler, cprofile, allocations):
+        """
+        Measures the compilations run in the context, leaving out the
+        startup of the command.
+        """
+        from .Profile import Profile
+        with Profile.use(profiler), Profile.cprofile(cprofile), \
+                Profile.allocations(allocations):
+            yield
+
+    @staticmethod
+    def measured(compile, profiler, profile, cprofile, allocations):
+        """
+        Runs an in-process compilation, measuring it and printing its
+        profile.
+        """
+        with Cli.measure(profiler, cprofile, allocations):
+            result = compile()
+        Cli.echo_profile(profiler, profile)
+        return result
+
+    @staticmethod
+    def compile_shards(client, path, output_dir, measurement, options):
+        """
+        Compiles stories into one file per story in `output_dir`, with the
+        compile server if it's running. Returns the written files.
+        """
+        if client is not None:
+            return client.call('compile', path=path, output_dir=output_dir,
+                               **options)
+        from .App import App
+        return Cli.measured(
+            lambda: App.compile_shards(path, output_dir, **options),
+            *measurement)
+
+    @staticmethod
+    def compile_stories(client, path, first, measurement, options):
+        """
+        Compiles stories, with the compile server if it's running.
+        """
+        if client is not None:
+            return client.call('compile', path=path, first=first, **options)
+        from .App import App
+        return Cli.measured(
+            lambda: App.compile(path, first=first, **options), *measurement)
+
+    @staticmethod
+    def echo_results(results, json, output):
+        """
+        Prints the compiled stories, or writes them to `output`.
+        """
+        if not json:
+            msg = 'Script syntax passed!'
+            click.echo(click.style(msg, fg='green'))
+            return
+        if output:
+            with io.open(output, 'w') as f:
+                f.write(results)
+            exit()
+        click.echo(results)
+
+    @staticmethod
+    def echo_profile(profiler, profile):
+        """
+        Prints the report of a profile to stderr, as a table or as JSON.
+        """
+        if profiler is None:
+            return
+        if profile == 'json':
+            import json
+            report = json.dumps(profiler.report(), indent=2, sort_keys=True)
+            click.echo(report, err=True)
+        else:
+            click.echo(profiler.table(), err=True)
 
     @click.group(invoke_without_command=True, cls=ClickAliasedGroup)
     @click.option('--version', '-v', is_flag=True, help=version_help)
@@ -27,7 +140,7 @@ class Cli:
         """
         if version:
             message = 'StoryScript {} - http://storyscript.org'
-            click.echo(message.format(app_version))
+            click.echo(message.format(Version.version))
             exit()
 
         if context.invoked_subcommand is None:
@@ -46,7 +159,16 @@ class Cli:
         """
         Parses stories, producing the abstract syntax tree.
         """
+        from .App import App
         try:
+            client = Cli.client(debug)
+            if client is not None:
+                trees = client.call('parse', path=path, ignored_path=ignore,
+                                    ebnf=ebnf, lower=lower, raw=raw)
+                for story, tree in trees.items():
+                    click.echo('File: {}'.format(story))
+                    click.echo(tree)
+                return
             trees = App.parse(path, ignored_path=ignore, ebnf=ebnf,
                               lower=lower)
             for story, tree in trees.items():
@@ -55,6 +177,9 @@ class Cli:
                     click.echo(tree)
                 else:
                     click.echo(tree.pretty())
+        except RemoteError as e:
+            e.echo()
+            exit(1)
         except StoryError as e:
             if debug:
                 raise e.error
@@ -80,24 +205,90 @@ class Cli:
     @click.option('--ebnf', help=ebnf_help)
     @click.option('--ignore', default=None,
                   help='Specify path of ignored files')
+    @click.option('--output-dir', default=None, help=output_dir_help)
+    @click.option('--entry', '-e', 'entries', multiple=True, help=entry_help)
+    @click.option('--profile', type=click.Choice(['table', 'json']),
+                  default=None, help=profile_help)
+    @click.option('--cprofile', default=None, help=cprofile_help)
+    @click.option('--tracemalloc', 'allocations', default=None,
+                  help=tracemalloc_help)
+    @click.option('--index', default=None, help=index_help)
+    @click.option('--exclude', 'excluded', multiple=True, help=exclude_help)
     def compile(path, output, json, silent, debug, ebnf, ignore, concise,
-                first):
+                first, output_dir, entries, profile, cprofile, allocations,
+                index, excluded):
         """
         Compiles stories and prints the resulting json
         """
+        from .Profile import Profile
+        options = {'ignored_path': ignore, 'ebnf': ebnf, 'concise': concise,
+                   'entries': list(entries) or None, 'index': index,
+                   'excluded': list(excluded) or None}
+        profiler = None
+        if profile is not None:
+            profiler = Profile()
+        measurement = (profiler, profile, cprofile, allocations)
         try:
-            results = App.compile(path, ignored_path=ignore,
-                                  ebnf=ebnf, concise=concise, first=first)
+            # compilations are measured in-process
+            measured = profile or cprofile or allocations
+            client = Cli.client(debug or measured is not None)
+            if output_dir:
+                written = Cli.compile_shards(client, path, output_dir,
+                                             measurement, options)
+                if not silent:
+                    for file in written:
+                        click.echo(file)
+                return
+            results = Cli.compile_stories(client, path, first, measurement,
+                                          options)
             if not silent:
-                if json:
-                    if output:
-                        with io.open(output, 'w') as f:
-                            f.write(results)
-                        exit()
-                    click.echo(results)
-                else:
-                    msg = 'Script syntax passed!'
-                    click.echo(click.style(msg, fg='green'))
+                Cli.echo_results(results, json, output)
+        except RemoteError as e:
+            e.echo()
+            exit(1)
+        except StoryError as e:
+            if debug:
+                raise e.error
+            else:
+                e.echo()
+                exit(1)
+        except Exception as e:
+            if debug:
+                raise e
+            else:
+                StoryError.internal_error(e).echo()
+                exit(1)
+
+    @staticmethod
+    @main.command()
+    @click.argument('path', default=os.getcwd())
+    @click.option('--stage', type=click.Choice(stages),
+                  default=None, help=stage_help)
+    @click.option('--debug', is_flag=True)
+    @click.option('--ebnf', help=ebnf_help)
+    @click.option('--ignore', default=None,
+                  help='Specify path of ignored files')
+    @click.option('--entry', '-e', 'entries', multiple=True, help=entry_help)
+    @click.option('--index', default=None, help=index_help)
+    @click.option('--exclude', 'excluded', multiple=True, help=exclude_help)
+    def check(path, stage, debug, ebnf, ignore, entries, index, excluded):
+        """
+        Checks stories for errors, without generating the json
+        """
+        from .App import App
+        options = {'ignored_path': ignore, 'ebnf': ebnf,
+                   'entries': list(entries) or None, 'stage': stage,
+                   'index': index, 'excluded': list(excluded) or None}
+        try:
+            client = Cli.client(debug)
+            if client is not None:
+                client.call('check', path=path, **options)
+            else:
+                App.check(path, **options)
+            click.echo(click.style('Script syntax passed!', fg='green'))
+        except RemoteError as e:
+            e.echo()
+            exit(1)
         except StoryError as e:
             if debug:
                 raise e.error
@@ -120,12 +311,24 @@ class Cli:
         """
         Shows lexer tokens for given stories
         """
+        from .App import App
         try:
+            client = Cli.client(debug)
+            if client is not None:
+                results = client.call('lex', path=path, ebnf=ebnf)
+                for file, tokens in results.items():
+                    click.echo('File: {}'.format(file))
+                    for n, (type, value) in enumerate(tokens):
+                        click.echo('{} {} {}'.format(n, type, value))
+                return
             results = App.lex(path, ebnf=ebnf)
             for file, tokens in results.items():
                 click.echo('File: {}'.format(file))
                 for n, token in enumerate(tokens):
                     click.echo('{} {} {}'.format(n, token.type, token.value))
+        except RemoteError as e:
+            e.echo()
+            exit(1)
         except StoryError as e:
             if debug:
                 raise e.error
@@ -139,12 +342,70 @@ class Cli:
                 StoryError.internal_error(e).echo()
                 exit(1)
 
+    @staticmethod
+    @main.command()
+    @click.argument('path', default=os.getcwd())
+    @click.option('--repeat', default=3, help=repeat_help)
+    @click.option('--size', default=1000, help=size_help)
+    @click.option('--synthetic/--no-synthetic', default=True,
+                  help=synthetic_help)
+    @click.option('--imports/--no-imports', default=True, help=imports_help)
+    @click.option('--output', '-o', default=None, help=bench_output_help)
+    @click.option('--baseline', default=None, help=baseline_help)
+    @click.option('--ebnf', help=ebnf_help)
+    def bench(path, repeat, size, synthetic, imports, output, baseline,
+              ebnf):
+        """
+        Times each phase of the compiler over stories, as JSON
+        """
+        from .Benchmark import Benchmark
+        benchmark = Benchmark(repeat=repeat, ebnf=ebnf)
+        suites = {'corpus': benchmark.corpus(path)}
+        if synthetic:
+            suites['synthetic'] = benchmark.synthetic(size)
+        report = benchmark.report(suites, imports=imports)
+        if output:
+            Benchmark.write(report, output)
+        else:
+            click.echo(Benchmark.dumps(report))
+        if baseline:
+            ratios = Benchmark.compare(Benchmark.load(baseline), report)
+            for suite, phases in ratios.items():
+                for phase, ratio in phases.items():
+                    click.echo(f'{suite} {phase}: {ratio:.2f}x', err=True)
+
+    @staticmethod
+    @main.command()
+    @click.option('--socket', 'socket_path', default=None, help=socket_help)
+    @click.option('--stdio', is_flag=True, help=stdio_help)
+    def serve(socket_path, stdio):
+        """
+        Runs a compile server, which keeps the compiler warm between
+        requests. Other commands use it when it's running.
+        """
+        from .Server import Server
+        server = Server()
+        if stdio:
+            server.serve_stdio()
+            return
+        if socket_path is None:
+            socket_path = Client.socket_path()
+        click.echo('Listening on {}'.format(socket_path), err=True)
+        try:
+            server.serve_socket(socket_path)
+        except KeyboardInterrupt:
+            pass
+        except StoryError as e:
+            e.echo()
+            exit(1)
+
     @staticmethod
     @main.command(aliases=['g'])
     def grammar():
         """
         Prints the grammar specification
         """
+        from .App import App
         click.echo(App.grammar())
 
     @staticmethod
@@ -171,4 +432,4 @@ class Cli:
         """
         Prints the current version
         """
-        click.echo(app_version)
+        click.echo(Version.version)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import socket
+import stat
+import tempfile
+
+import click
+
+from . import Version
+
+
+class RemoteError(Exception):
+    """
+    An error reported by the compile server.
+    """
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self._message = message
+
+    def message(self):
+        return self._message
+
+    def echo(self):
+        click.echo(self.message())
+
+
+class Client:
+    """
+    Talks to a running compile server over its Unix socket.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.socket = None
+        self.reader = None
+        self.id = 0
+
+    @staticmethod
+    def socket_path():
+        """
+        Returns the path of the server socket, which can be set with the
+        STORYSCRIPT_SOCKET environment variable.
+        """
+        path = os.environ.get('STORYSCRIPT_SOCKET')
+        if path:
+            return path
+        directory = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+        return os.path.join(directory, f'storyscript-{os.getuid()}.sock')
+
+    @staticmethod
+    def trusted(path):
+        """
+        Checks whether a path is a socket which only the current user owns
+        and can access, so that a socket placed by another user in a shared
+        directory is never used.
+        """
+        try:
+            info = os.stat(path)
+        except OSError:
+            return False
+        if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+            return False
+        return info.st_mode & 0o077 == 0
+
+    @classmethod
+    def connect(cls, path=None):
+        """
+        Connects to the server, if one of the same version is running on a
+        trusted socket. Returns None otherwise.
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            return None
+        if path is None:
+            path = cls.socket_path()
+        if not cls.trusted(path):
+            return None
+        client = cls(path)
+        try:
+            client.open()
+            if client.call('version') == Version.version:
+                return client
+        except (OSError, ValueError, RemoteError):
+            pass
+        client.close()
+        return None
+
+    def open(self):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(self.path)
+        self.reader = self.socket.makefile('rb')
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def call(self, method, **params):
+        """
+        Calls a server method from the working directory of the client.
+        """
+        self.id += 1
+        params['cwd'] = os.getcwd()
+        request = {'jsonrpc': '2.0', 'id': self.id, 'method': method,
+                   'params': params}
+        self.socket.sendall((json.dumps(request) + '\n').encode('utf8'))
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError('The server closed the connection')
+        response = json.loads(line.decode('utf8'))
+        if 'error' in response:
+            error = response['error']
+            raise RemoteError(error['code'], error['message'])
+        return response['result']
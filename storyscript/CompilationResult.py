@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+
+class StoryscriptCompilationResult:
+    """
+    Result of a Storyscript compilation.
+    Contains the compiled story or a list of compilation errors.
+    """
+
+    def __init__(self, result, errors):
+        self._result = result
+        self._errors = errors
+        self._deprecations = []
+        self._warnings = []
+        self._metrics = {}
+
+    @classmethod
+    def from_result(cls, story):
+        """
+        Creates a CompilationResult from a result.
+        """
+        return cls(story, errors=[])
+
+    @classmethod
+    def from_error(cls, error):
+        """
+        Creates a CompilationResult from a single error.
+        """
+        return cls(None, errors=[error])
+
+    def result(self):
+        """
+        Returns the compiled story.
+        """
+        return self._result
+
+    def errors(self):
+        """
+        Returns a list of all errorsemitted by the Storyscript compiler.
+        """
+        return self._errors
+
+    def warnings(self):
+        """
+        Returns a list of all warnings emitted by the Storyscript compiler.
+        """
+        return self._warnings
+
+    def deprecations(self):
+        """
+        Returns a list of all deprecations emitted by the Storyscript compiler.
+        """
+        return self._deprecations
+
+    def measured(self, metrics):
+        """
+        Sets the metrics of the compilation, returning the result.
+        """
+        self._metrics = metrics
+        return self
+
+    def metrics(self):
+        """
+        Returns the metrics of the compilation: the time of each phase, the
+        size of the sources, the number of nodes before and after the
+        lowering, the number of compiled stories, of lines in their trees,
+        of services and of functions, and the number of cache hits, if the
+        compilation was cached.
+        """
+        return self._metrics
+
+    def success(self):
+        """
+        Returns `True` if the compilation succeeded.
+        """
+        return self._result is not None
+
+    def check_success(self):
+        """
+        Throws the first error encountered if the compilation did not succeed.
+        """
+        if len(self._errors) > 0:
+            raise self._errors[0]
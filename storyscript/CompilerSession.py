@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+
+from .Bundle import Bundle
+from .CompilationResult import StoryscriptCompilationResult
+from .Profile import Profile
+from .Story import Story
+from .compiler.semantics.functions.MutationTable import MutationTable
+from .exceptions import StoryError
+
+
+class CompilerSession:
+    """
+    Compiles many stories with the same mutation table, which is built once
+    per session, and the parser of the calling thread. Sessions can be shared
+    between threads. The outcomes of previous compilations are kept in
+    an LRU cache keyed by the hash of their sources. A `cache_size` of 0
+    disables the cache. Mutations of additional `catalogues` files are
+    available to all stories of the session.
+    """
+
+    def __init__(self, cache_size=128, catalogues=None):
+        self.mutation_table = MutationTable.init(catalogues=catalogues)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(*sources):
+        """
+        Returns the cache key of a compilation
+        """
+        digest = hashlib.sha256()
+        for source in sources:
+            digest.update(source.encode('utf8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def cached(self, key):
+        """
+        Returns the cached outcome of a compilation, or `None`.
+        """
+        with self.lock:
+            outcome = self.cache.get(key)
+            if outcome is not None:
+                self.cache.move_to_end(key)
+            return outcome
+
+    def store(self, key, outcome):
+        """
+        Caches the outcome of a compilation, evicting the least recently used
+        one when the cache is full.
+        """
+        if self.cache_size <= 0:
+            return
+        with self.lock:
+            self.cache[key] = outcome
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    @staticmethod
+    def result(outcome):
+        """
+        Creates the result of an outcome. Compiled stories are copied, s.t.
+        callers can't modify cached ones.
+        """
+        if isinstance(outcome, StoryError):
+            return StoryscriptCompilationResult.from_error(outcome)
+        return StoryscriptCompilationResult.from_result(copy.deepcopy(outcome))
+
+    @staticmethod
+    def internal_error(error, debug):
+        if debug:
+            raise error
+        error = StoryError.internal_error(error)
+        return StoryscriptCompilationResult.from_error(error)
+
+    def process(self, story):
+        return story.process(mutation_table=self.mutation_table)
+
+    def run(self, key, compile, debug, sources, stories):
+        """
+        Runs a compilation unless its outcome is cached already. `compile`
+        returns the outcome and whether it may be cached. The metrics of the
+        result count the `sources` and the compiled stories of the outcome,
+        which `stories` returns.
+        """
+        profile = Profile(memory=False)
+        cache_hits = None
+        if self.cache_size > 0:
+            cache_hits = 0
+        outcome = self.cached(key)
+        if outcome is None:
+            try:
+                with Profile.use(profile):
+                    outcome, cacheable = compile()
+            except StoryError as e:
+                outcome, cacheable = e, True
+            except Exception as e:
+                return self.internal_error(e, debug)
+            if cacheable:
+                self.store(key, outcome)
+        else:
+            cache_hits = 1
+        compiled = {}
+        if not isinstance(outcome, StoryError):
+            compiled = stories(outcome)
+        metrics = profile.metrics(sources, compiled, cache_hits=cache_hits)
+        return self.result(outcome).measured(metrics)
+
+    def loads(self, string, debug=False):
+        """
+        Load story from a string.
+        """
+        def compile():
+            return self.process(Story(string)), True
+
+        return self.run(self.key('loads', string), compile, debug, [string],
+                        lambda story: {'<string>': story})
+
+    def load(self, stream, debug=False):
+        """
+        Load story from a file stream.
+        """
+        try:
+            name = getattr(stream, 'name', '<stream>')
+            source = stream.read()
+        except Exception as e:
+            return self.internal_error(e, debug)
+
+        def compile():
+            story = self.process(Story(source))
+            return {name: story, 'services': story['services']}, True
+
+        return self.run(self.key('load', name, source), compile, debug,
+                        [source], lambda outcome: {name: outcome[name]})
+
+    def load_map(self, files, debug=False):
+        """
+        Load multiple stories from a file mapping
+        """
+        sources = []
+        for path in sorted(files):
+            sources += [path, files[path]]
+
+        def compile():
+            bundle = Bundle(story_files=dict(files))
+            try:
+                outcome = bundle.bundle(mutation_table=self.mutation_table)
+            except StoryError as e:
+                outcome = e
+            # stories imported from the disk are not part of the key
+            return outcome, set(bundle.story_files) == set(files)
+
+        return self.run(self.key('load_map', *sources), compile, debug,
+                        files.values(), lambda outcome: outcome['stories'])
@@ -189,6 +189,23 @@ class ErrorCodes:
         'E0126',
         'Type casting not supported from `{left}` to `{right}`.'
     )
+    budget_exceeded = (
+        'E0127',
+        'Compilation stopped: the story exceeds the {limit}'
+    )
+    catalogue_format = (
+        'E0128',
+        'Mutation catalogues of format `{format}` are not supported. '
+        'Expected format `{expected}`.'
+    )
+    shard_conflict = (
+        'E0129',
+        'Stories `{first}` and `{second}` would both be written to `{name}`.'
+    )
+    socket_in_use = (
+        'E0130',
+        "Can't listen on `{path}`: {reason}."
+    )
 
     @staticmethod
     def is_error(error_name):
@@ -205,3 +222,12 @@ class ErrorCodes:
         Retrieve the error object for a valid error name.
         """
         return getattr(ErrorCodes, error_name)
+
+    @staticmethod
+    def get_name(error):
+        """
+        Retrieve the name of an error object.
+        """
+        for name, value in vars(ErrorCodes).items():
+            if value == error:
+                return name
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import os
+import posixpath
+import tarfile
+import zipfile
+
+from .Scanner import Scanner
+from .Story import Story
+from .exceptions import StoryError
+
+
+class FileSystem:
+    """
+    A source of story files.
+    """
+
+    archives = {
+        '.zip': 'zip',
+        '.tar': 'tar', '.tar.gz': 'tar', '.tgz': 'tar', '.tar.bz2': 'tar',
+        '.tbz2': 'tar', '.tar.xz': 'tar', '.txz': 'tar',
+    }
+
+    def read(self, path):
+        """
+        Returns the content of a story
+        """
+        raise NotImplementedError()
+
+    def stories(self, ignores=None):
+        """
+        Returns the paths of all stories
+        """
+        raise NotImplementedError()
+
+    def normalize(self, path):
+        """
+        Returns the canonical form of a story path
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def archive_type(cls, path):
+        """
+        Returns the type of archive a path points to, or `None`.
+        """
+        name = path.lower()
+        for extension, archive in cls.archives.items():
+            if name.endswith(extension):
+                return archive
+        return None
+
+    @classmethod
+    def from_path(cls, path, excluded=None, index=None):
+        """
+        Returns the file system for a path: an archive or the local disk.
+        Directories on the local disk are scanned with the `excluded`
+        directories and the `index` of the scanner.
+        """
+        archive = cls.archive_type(path)
+        if archive is not None and os.path.isfile(path):
+            if archive == 'zip':
+                return ZipFileSystem(path)
+            return TarFileSystem(path)
+        return LocalFileSystem(path, excluded=excluded, index=index)
+
+
+class LocalFileSystem(FileSystem):
+    """
+    Reads stories from the local disk. The stories of a directory are found
+    with the scanner, a file is a story on its own.
+    """
+
+    def __init__(self, path='.', excluded=None, index=None):
+        self.path = path
+        self.excluded = excluded
+        self.index = index
+
+    def stories(self, ignores=None):
+        if not os.path.isdir(self.path):
+            return [self.path]
+        scanner = Scanner(ignores=ignores, excluded=self.excluded,
+                          index=self.index)
+        return scanner.scan(self.path)
+
+    def read(self, path):
+        return Story.read(path)
+
+    def normalize(self, path):
+        return os.path.relpath(path)
+
+
+class MemoryFileSystem(FileSystem):
+    """
+    Reads stories from a mapping of paths to story sources.
+    """
+
+    def __init__(self, files=None):
+        if files is None:
+            files = {}
+        self.files = files
+
+    def read(self, path):
+        if path not in self.files:
+            raise StoryError.create_error('file_not_found', path=path,
+                                          abspath=path)
+        return self.files[path]
+
+    def stories(self, ignores=None):
+        if ignores is None:
+            ignores = []
+        ignores = set(ignores)
+        stories = []
+        for path in sorted(self.files.keys()):
+            if path.endswith('.story') and path not in ignores:
+                stories.append(path)
+        return stories
+
+    def normalize(self, path):
+        return posixpath.normpath(path)
+
+
+class ArchiveFileSystem(MemoryFileSystem):
+    """
+    Reads stories from an archive.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def add(self, name, data):
+        """
+        Adds a story read from the archive member `name`
+        """
+        try:
+            self.files[self.normalize(name)] = data.decode('utf8')
+        except UnicodeDecodeError as e:
+            raise StoryError.create_error(
+                'unicode_decode_error',
+                reason=f'`{name}` in `{self.path}` is not utf8 ({e.reason})')
+
+
+class ZipFileSystem(ArchiveFileSystem):
+    """
+    Reads stories from a zip archive. All stories are read at once.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.filename.endswith('.story') and not info.is_dir():
+                    self.add(info.filename, archive.read(info))
+
+
+class TarFileSystem(ArchiveFileSystem):
+    """
+    Reads stories from a (compressed) tar archive. The archive is streamed
+    once and all stories are read on the way.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        with tarfile.open(path, 'r|*') as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith('.story'):
+                    self.add(member.name,
+                             archive.extractfile(member).read())
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+import io
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+_local = threading.local()
+
+
+class Profile:
+    """
+    Measures where compilations spend their time, per story: the wall time
+    of each phase, the number of nodes before and after the lowering, the
+    lines generated by the lowering, the string templates parsed again by
+    the lowering and the peak memory.
+
+    Like the budget, the profile of the running compilation is kept per
+    thread and the compiler reports to it at phase boundaries. Compilations
+    without a profile only pay for a lookup.
+
+    Before Python 3.9, the peak of the traced memory can't be reset, so the
+    peak memory of a phase is the peak since the profile started tracing.
+    """
+
+    # the timed phases, in order
+    phases = ['read', 'parse', 'lower', 'semantics', 'json']
+    counters = ['nodes', 'lowered_nodes', 'fake_lines', 'template_parses']
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stories = {}
+        self.names = []
+        # phases running inside a phase are part of the outer one
+        self.depth = 0
+        # the traced memory when the profile started tracing
+        self.traced = 0
+
+    @staticmethod
+    def current():
+        """
+        Returns the profile of the running compilation, or `None`.
+        """
+        return getattr(_local, 'profile', None)
+
+    @staticmethod
+    @contextmanager
+    def use(profile):
+        """
+        Profiles the compilations run in the context. Memory is traced in
+        the context if the profile measures it.
+        """
+        if profile is None:
+            yield
+            return
+        previous = Profile.current()
+        tracing = profile.memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if profile.memory and tracemalloc.is_tracing():
+            profile.traced = tracemalloc.get_traced_memory()[0]
+        _local.profile = profile
+        try:
+            yield
+        finally:
+            if tracing:
+                tracemalloc.stop()
+            _local.profile = previous
+
+    @staticmethod
+    @contextmanager
+    def cprofile(path):
+        """
+        Profiles the code run in the context with cProfile, writing the
+        stats to `path`, e.g. for pstats or snakeviz.
+        """
+        if path is None:
+            yield
+            return
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+
+    @staticmethod
+    @contextmanager
+    def allocations(path, limit=50):
+        """
+        Traces the memory allocated by the code run in the context, writing
+        the `limit` top allocation sites of the memory it still holds at the
+        end to `path`.
+        """
+        if path is None:
+            yield
+            return
+        tracing = not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        try:
+            yield
+        finally:
+            after = tracemalloc.take_snapshot()
+            if tracing:
+                tracemalloc.stop()
+            ignored = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            after = after.filter_traces(ignored)
+            before = before.filter_traces(ignored)
+            stats = after.compare_to(before, 'lineno')[:limit]
+            with io.open(path, 'w', encoding='utf8') as f:
+                for stat in stats:
+                    f.write(f'{stat}\n')
+
+    def record(self):
+        """
+        Returns the measurements of the current story.
+        """
+        name = self.names[-1] if self.names else '<string>'
+        record = self.stories.get(name)
+        if record is None:
+            record = {key: 0 for key in self.phases + self.counters}
+            record['peak_memory'] = 0
+            self.stories[name] = record
+        return record
+
+    @classmethod
+    @contextmanager
+    def story(cls, name):
+        """
+        Attributes the measurements taken in the context to a story.
+        """
+        profile = cls.current()
+        if profile is None:
+            yield
+            return
+        profile.names.append(name)
+        try:
+            yield
+        finally:
+            profile.names.pop()
+
+    @staticmethod
+    def reset_peak():
+        """
+        Resets the peak of the traced memory, returning whether it has been
+        reset. `tracemalloc.reset_peak` needs Python 3.9. Tracing isn't
+        restarted instead, as that would forget the traces of snapshots
+        taken in the meantime, e.g. by `allocations`.
+        """
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+            return True
+        return False
+
+    @classmethod
+    @contextmanager
+    def phase(cls, phase):
+        """
+        Times a phase of the current story, and the memory it allocates.
+        """
+        profile = cls.current()
+        if profile is None or profile.depth > 0:
+            yield
+            return
+        memory = profile.memory and tracemalloc.is_tracing()
+        if memory:
+            baseline = profile.traced
+            if cls.reset_peak():
+                baseline = tracemalloc.get_traced_memory()[0]
+        profile.depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            profile.depth -= 1
+            record = profile.record()
+            record[phase] += elapsed
+            if memory:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                record['peak_memory'] = max(record['peak_memory'], peak)
+
+    @classmethod
+    def count(cls, counter, amount=1):
+        profile = cls.current()
+        if profile is None:
+            return
+        profile.record()[counter] += amount
+
+    @classmethod
+    def count_nodes(cls, counter, tree):
+        """
+        Counts the nodes of a tree. The tree is only walked when profiling.
+        """
+        if cls.current() is None:
+            return
+        count = 0
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(getattr(node, 'children', ()))
+        cls.count(counter, count)
+
+    def totals(self):
+        totals = {key: 0 for key in self.phases + self.counters}
+        totals['peak_memory'] = 0
+        for record in self.stories.values():
+            for key in totals:
+                if key == 'peak_memory':
+                    totals[key] = max(totals[key], record[key])
+                else:
+                    totals[key] += record[key]
+        return totals
+
+    def metrics(self, sources, stories, baseline=None, cache_hits=None):
+        """
+        Summarizes the compilation of `sources` into `stories`, a mapping of
+        paths to compiled stories. Only the measurements taken since the
+        `baseline` totals are counted.
+        """
+        totals = self.totals()
+        if baseline is not None:
+            totals = {key: value - baseline[key]
+                      for key, value in totals.items()}
+        compiled = [story for story in stories.values()
+                    if isinstance(story, dict)]
+        services = set()
+        for story in compiled:
+            services.update(story['services'])
+        return {
+            'phases': {phase: totals[phase] for phase in self.phases},
+            'source_size': sum(len(source) for source in sources),
+            'nodes': totals['nodes'],
+            'lowered_nodes': totals['lowered_nodes'],
+            'stories': len(compiled),
+            'output_lines': sum(len(story['tree']) for story in compiled),
+            'services': len(services),
+            'functions': sum(len(story['functions']) for story in compiled),
+            'cache_hits': cache_hits,
+        }
+
+    def report(self):
+        """
+        Returns the measurements as a dictionary, e.g. to be dumped as JSON.
+        Times are in seconds and memory in bytes.
+        """
+        return {'stories': self.stories, 'totals': self.totals()}
+
+    def table(self):
+        """
+        Returns the measurements as a table, a row per story. Times are in
+        milliseconds and memory in kilobytes.
+        """
+        header = ['story'] + self.phases + \
+            ['nodes', 'lowered', 'fake', 'templates', 'peak kB']
+        rows = [header]
+        records = sorted(self.stories.items()) + [('total', self.totals())]
+        for name, record in records:
+            row = [name]
+            row += [f'{record[phase] * 1000:.1f}' for phase in self.phases]
+            row += [str(record[counter]) for counter in self.counters]
+            row.append(str(record['peak_memory'] // 1024))
+            rows.append(row)
+        widths = [max(len(row[i]) for row in rows)
+                  for i in range(len(header))]
+        lines = []
+        for row in rows:
+            cells = [row[0].ljust(widths[0])]
+            cells += [cell.rjust(width)
+                      for cell, width in zip(row[1:], widths[1:])]
+            lines.append('  '.join(cells))
+        return '\n'.join(lines)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+
+
+class Scanner:
+    """
+    Finds the stories of a directory tree. Ignored directories and
+    directories with an excluded name, e.g. `node_modules`, are pruned
+    before descending into them. No directory is excluded by default.
+
+    Optionally, the listings of directories can be persisted in an index.
+    Every directory is still visited and stat'ed on repeated scans, as the
+    modification time of a directory doesn't change with its subdirectories,
+    but directories which haven't changed aren't listed again.
+    """
+
+    index_version = 1
+
+    def __init__(self, ignores=None, excluded=None, index=None):
+        if ignores is None:
+            ignores = []
+        if excluded is None:
+            excluded = []
+        self.ignores = set(ignores)
+        self.excluded = set(excluded)
+        self.index_path = index
+        self.index = self.load_index(index)
+        self.new_index = {}
+
+    @classmethod
+    def load_index(cls, path):
+        """
+        Loads a persisted directory index. A missing or outdated index is
+        treated as empty.
+        """
+        if path is None:
+            return {}
+        try:
+            with io.open(path, 'r', encoding='utf8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(index, dict) or \
+                index.get('version') != cls.index_version:
+            return {}
+        return index.get('directories', {})
+
+    def save_index(self):
+        """
+        Persists the directory listings of the last scan.
+        """
+        index = {'version': self.index_version,
+                 'directories': self.new_index}
+        with io.open(self.index_path, 'w', encoding='utf8') as f:
+            f.write(json.dumps(index))
+
+    @staticmethod
+    def join(directory, name):
+        """
+        Joins a name to a relative directory, without a leading `./`.
+        """
+        if directory == '.':
+            return name
+        return os.path.join(directory, name)
+
+    @staticmethod
+    def list_directory(directory):
+        """
+        Lists the stories and the subdirectories of a directory.
+        Symlinked directories are not followed.
+        """
+        stories = []
+        directories = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        directories.append(entry.name)
+                elif entry.name.endswith('.story'):
+                    stories.append(entry.name)
+        stories.sort()
+        directories.sort()
+        return stories, directories
+
+    def listing(self, directory, key):
+        """
+        Returns the listing of a directory, using the index when the
+        directory hasn't been modified since it was indexed.
+        """
+        if self.index_path is None:
+            return self.list_directory(directory)
+        mtime = os.stat(directory).st_mtime_ns
+        entry = self.index.get(key)
+        if entry is not None and entry[0] == mtime:
+            stories, directories = entry[1], entry[2]
+        else:
+            stories, directories = self.list_directory(directory)
+        self.new_index[key] = [mtime, stories, directories]
+        return stories, directories
+
+    def is_ignored_directory(self, path):
+        return os.path.join(path, '') in self.ignores
+
+    def walk(self, directory, key, paths):
+        """
+        Collects the stories of a directory and recurses into all of its
+        subdirectories which are neither excluded nor ignored.
+        """
+        stories, directories = self.listing(directory, key)
+        for name in stories:
+            path = self.join(directory, name)
+            if path not in self.ignores:
+                paths.append(path)
+        for name in directories:
+            if name in self.excluded:
+                continue
+            path = self.join(directory, name)
+            if self.is_ignored_directory(path):
+                continue
+            self.walk(path, os.path.join(key, name), paths)
+
+    def scan(self, directory):
+        """
+        Returns the stories found in `directory`, relative to the current
+        working directory.
+        """
+        paths = []
+        self.walk(os.path.relpath(directory), os.path.abspath(directory),
+                  paths)
+        if self.index_path is not None:
+            self.save_index()
+        return paths
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+import inspect
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .App import App
+from .Story import Story
+from .Version import version
+from .exceptions import StoryError
+
+
+class Server:
+    """
+    Compiles stories on behalf of clients, keeping the parser warm between
+    requests. Requests and responses are JSON-RPC 2.0 messages, one per line.
+
+    Parsers are cached per thread, so every request runs on the same worker
+    thread, whichever connection it comes from.
+    """
+
+    parse_error = -32700
+    invalid_request = -32600
+    method_not_found = -32601
+    invalid_params = -32602
+    internal_error = -32603
+    story_error = -32000
+
+    def __init__(self):
+        self.worker = ThreadPoolExecutor(max_workers=1)
+        self.methods = {
+            'compile': self.compile,
+            'parse': self.parse,
+            'lex': self.lex,
+            'check': self.check,
+            'version': self.version,
+        }
+
+    @staticmethod
+    def warm():
+        """
+        Builds the parser and compiles a story, s.t. the first request
+        doesn't pay for it.
+        """
+        Story('a = 0').process()
+
+    @staticmethod
+    def compile(path, ignored_path=None, ebnf=None, concise=False,
+                first=False, entries=None, output_dir=None, index=None,
+                excluded=None):
+        if output_dir:
+            return App.compile_shards(path, output_dir,
+                                      ignored_path=ignored_path, ebnf=ebnf,
+                                      concise=concise, entries=entries,
+                                      index=index, excluded=excluded)
+        return App.compile(path, ignored_path=ignored_path, ebnf=ebnf,
+                           concise=concise, first=first, entries=entries,
+                           index=index, excluded=excluded)
+
+    @staticmethod
+    def parse(path, ignored_path=None, ebnf=None, lower=False, raw=False):
+        trees = App.parse(path, ignored_path=ignored_path, ebnf=ebnf,
+                          lower=lower)
+        if raw:
+            return {story: str(tree) for story, tree in trees.items()}
+        return {story: tree.pretty() for story, tree in trees.items()}
+
+    @staticmethod
+    def lex(path, ebnf=None):
+        results = App.lex(path, ebnf=ebnf)
+        return {story: [[token.type, token.value] for token in tokens]
+                for story, tokens in results.items()}
+
+    @staticmethod
+    def check(path, ignored_path=None, ebnf=None, entries=None, stage=None,
+              index=None, excluded=None):
+        """
+        Checks stories up to a stage, only reporting errors.
+        """
+        App.check(path, ignored_path=ignored_path, ebnf=ebnf,
+                  entries=entries, stage=stage, index=index,
+                  excluded=excluded)
+        return True
+
+    @staticmethod
+    def version():
+        return version
+
+    @staticmethod
+    def response(id, result):
+        return {'jsonrpc': '2.0', 'id': id, 'result': result}
+
+    @staticmethod
+    def error(id, code, message):
+        return {'jsonrpc': '2.0', 'id': id,
+                'error': {'code': code, 'message': message}}
+
+    def run(self, method, params, cwd=None):
+        """
+        Runs a method in the working directory of the client.
+        """
+        previous = os.getcwd()
+        try:
+            if cwd:
+                os.chdir(cwd)
+            return self.methods[method](**params)
+        finally:
+            os.chdir(previous)
+
+    def call(self, method, params, cwd=None):
+        """
+        Runs a method on the worker thread. Requests are processed one at a
+        time, as the working directory is shared.
+        """
+        return self.worker.submit(self.run, method, params, cwd=cwd).result()
+
+    def handle(self, line):
+        """
+        Handles a single request, returning the response.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self.error(None, self.parse_error, 'Parse error')
+        if not isinstance(request, dict):
+            return self.error(None, self.invalid_request, 'Invalid request')
+        id = request.get('id')
+        method = request.get('method')
+        params = request.get('params', {})
+        if method not in self.methods:
+            return self.error(id, self.method_not_found, 'Method not found')
+        if not isinstance(params, dict):
+            return self.error(id, self.invalid_params, 'Invalid params')
+        cwd = params.pop('cwd', None)
+        try:
+            inspect.signature(self.methods[method]).bind(**params)
+        except TypeError as e:
+            return self.error(id, self.invalid_params, str(e))
+        try:
+            return self.response(id, self.call(method, params, cwd=cwd))
+        except StoryError as e:
+            return self.error(id, self.story_error, e.message())
+        except Exception as e:
+            message = StoryError.internal_error(e).message()
+            return self.error(id, self.internal_error, message)
+
+    def serve_stream(self, reader, writer):
+        """
+        Answers the requests read from a stream until it's closed.
+        """
+        for line in reader:
+            if not line.strip():
+                continue
+            response = self.handle(line)
+            writer.write(json.dumps(response) + '\n')
+            writer.flush()
+
+    def serve_stdio(self):
+        self.worker.submit(self.warm).result()
+        self.serve_stream(sys.stdin, sys.stdout)
+
+    @staticmethod
+    def listening(path):
+        """
+        Checks whether a server accepts connections on a Unix socket.
+        """
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client.connect(path)
+            return True
+        except OSError:
+            return False
+        finally:
+            client.close()
+
+    @classmethod
+    def remove_stale(cls, path):
+        """
+        Removes a stale socket left by a server which stopped. Anything
+        else at the path, e.g. the socket of a running server, is kept.
+        """
+        try:
+            mode = os.lstat(path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise StoryError.create_error('socket_in_use', path=path,
+                                          reason='it is not a socket')
+        if cls.listening(path):
+            raise StoryError.create_error(
+                'socket_in_use', path=path,
+                reason='another server is listening on it')
+        os.remove(path)
+
+    def unix_server(self, path):
+        """
+        Creates a server listening on a Unix socket, which only the current
+        user can access from the start. Stale sockets are replaced.
+        """
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                reader = (line.decode('utf8') for line in self.rfile)
+                server.serve_stream(reader, Writer(self.wfile))
+
+        self.remove_stale(path)
+        # the socket is created with the permissions of the umask
+        umask = os.umask(0o177)
+        try:
+            unix_server = socketserver.ThreadingUnixStreamServer(path,
+                                                                 Handler)
+        finally:
+            os.umask(umask)
+        unix_server.daemon_threads = True
+        return unix_server
+
+    def serve_socket(self, path):
+        unix_server = self.unix_server(path)
+        self.worker.submit(self.warm).result()
+        try:
+            unix_server.serve_forever()
+        finally:
+            unix_server.server_close()
+            self.worker.shutdown()
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class Writer:
+    """
+    Writes text to a binary stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        self.stream.write(text.encode('utf8'))
+
+    def flush(self):
+        self.stream.flush()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import io
+import json
+import os
+
+from .Story import Story
+from .exceptions import StoryError
+
+
+class Shards:
+    """
+    Writes a compiled bundle as one file per story, plus a manifest that
+    allows engines to load only the stories they need.
+    Files are only rewritten when their content changes.
+    """
+
+    manifest_name = 'manifest.json'
+    # the shards are written to a subdirectory, s.t. no story can replace
+    # the manifest
+    shards_directory = 'shards'
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj, indent=2)
+
+    @staticmethod
+    def digest(text):
+        """
+        Returns the content hash of a shard
+        """
+        return hashlib.sha256(text.encode('utf8')).hexdigest()
+
+    @classmethod
+    def shard_name(cls, story):
+        """
+        Returns the file name of the shard of a story, relative to the output
+        directory. Parent references and absolute paths can't escape the
+        shards directory.
+        """
+        name = os.path.normpath(os.path.splitdrive(story)[1])
+        parts = []
+        for part in name.split(os.sep):
+            if part == '..':
+                part = '__'
+            if part not in ('', '.'):
+                parts.append(part)
+        name = '/'.join(parts)
+        if name.endswith('.story'):
+            name = name[:-len('.story')]
+        return f'{cls.shards_directory}/{name}.json'
+
+    @staticmethod
+    def imports(story):
+        """
+        Returns the stories imported by a compiled story
+        """
+        modules = story.get('modules') or {}
+        return sorted(set(Story.module_path(m) for m in modules.values()))
+
+    def previous_manifest(self):
+        """
+        Reads the manifest of a previous run, if there's any.
+        """
+        path = os.path.join(self.directory, self.manifest_name)
+        try:
+            with io.open(path, 'r', encoding='utf8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_file(self, name, text):
+        """
+        Writes a file unless it exists with the same content already.
+        Returns whether the file has been written.
+        """
+        path = os.path.join(self.directory, name)
+        if os.path.isfile(path):
+            with io.open(path, 'r', encoding='utf8') as f:
+                if f.read() == text:
+                    return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.tmp'
+        with io.open(tmp, 'w', encoding='utf8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return True
+
+    def remove_stale(self, previous, manifest):
+        """
+        Removes the shards of stories which are no longer in the bundle
+        """
+        if not isinstance(previous, dict):
+            return
+        files = set(story['file'] for story in manifest['stories'].values())
+        for story in previous.get('stories', {}).values():
+            name = story.get('file')
+            if name and name not in files:
+                path = os.path.join(self.directory, name)
+                if os.path.isfile(path):
+                    os.remove(path)
+
+    def shard_names(self, stories):
+        """
+        Returns the shard names of stories, ensuring no two stories are
+        written to the same shard.
+        """
+        names = {}
+        for path in stories:
+            name = self.shard_name(path)
+            if name in names:
+                raise StoryError.create_error('shard_conflict',
+                                              first=names[name], second=path,
+                                              name=name)
+            names[name] = path
+        return {path: name for name, path in names.items()}
+
+    def write(self, bundle):
+        """
+        Writes the shards and the manifest of a bundle.
+        Returns the paths of all written files.
+        """
+        names = self.shard_names(bundle['stories'])
+        previous = self.previous_manifest()
+        manifest = {'entrypoint': bundle['entrypoint'],
+                    'services': bundle['services'], 'stories': {}}
+        written = []
+        for path, story in bundle['stories'].items():
+            name = names[path]
+            text = self.dumps(story)
+            if self.write_file(name, text):
+                written.append(os.path.join(self.directory, name))
+            manifest['stories'][path] = {
+                'file': name,
+                'hash': self.digest(text),
+                'services': story.get('services', []),
+                'imports': self.imports(story),
+            }
+        self.remove_stale(previous, manifest)
+        if self.write_file(self.manifest_name, self.dumps(manifest)):
+            written.append(os.path.join(self.directory, self.manifest_name))
+        return written
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+
+class Stages:
+    """
+    The stages of a compilation, in order. The parser runs the first stage
+    and the passes of the compiler run the others. A compilation can stop
+    after any stage but the last.
+    """
+
+    names = ['parse', 'lower', 'semantics', 'json']
+    # the stages of the passes of the compiler
+    passes = names[1:]
+    # the stages a compilation can stop after
+    stoppable = names[:-1]
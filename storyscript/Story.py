@@ -1,23 +1,31 @@
 # -*- coding: utf-8 -*-
 import io
 import os
-from functools import lru_cache
-
+import threading
 
 from lark.exceptions import UnexpectedInput, UnexpectedToken
 
+from .Budget import Budget
+from .Profile import Profile
 from .compiler import Compiler
 from .compiler.lowering import Lowering
 from .exceptions import CompilerError, StoryError, StorySyntaxError
 from .parser import Parser
 
 
-@lru_cache(maxsize=1)
+_local = threading.local()
+
+
 def _parser():
     """
-    Cached instance of the parser
+    Cached instance of the parser. Parsers keep state while parsing, so
+    every thread has its own instance.
     """
-    return Parser()
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = Parser()
+        _local.parser = parser
+    return parser
 
 
 class Story:
@@ -31,6 +39,15 @@ class Story:
         self.path = path
         self.lines = story.splitlines(keepends=False)
 
+    def __getstate__(self):
+        """
+        Pickles the story without its tree and compiled output.
+        """
+        state = self.__dict__.copy()
+        state.pop('tree', None)
+        state.pop('compiled', None)
+        return state
+
     @classmethod
     def read(cls, path):
         """
@@ -76,10 +93,12 @@ class Story:
         if parser is None:
             parser = self._parser()
         try:
-            self.tree = parser.parse(self.story)
+            with Profile.phase('parse'):
+                self.tree = parser.parse(self.story)
             if lower:
-                proc = Lowering(parser)
-                self.tree = proc.process(self.tree)
+                with Profile.phase('lower'):
+                    proc = Lowering(parser)
+                    self.tree = proc.process(self.tree)
         except (CompilerError, StorySyntaxError) as error:
             raise self.error(error) from error
         except UnexpectedToken as error:
@@ -93,20 +112,34 @@ class Story:
         """
         modules = []
         for module in self.tree.find_data('imports'):
-            path = module.string.child(0).value[1:-1]
-            if path.endswith('.story') is False:
-                path = '{}.story'.format(path)
-            modules.append(path)
+            path = module.string.child(0).value
+            modules.append(self.module_path(path))
         return modules
 
-    def compile(self):
+    @staticmethod
+    def module_path(path):
+        """
+        Returns the story path of an imported module.
+        """
+        if path.endswith('.story') is False:
+            path = '{}.story'.format(path)
+        return path
+
+    def compile(self, mutation_table=None, stop_after=None):
         """
-        Compiles the story and stores the result.
+        Compiles the story and stores the result. When stopping after an
+        earlier stage, the tree of that stage is stored instead.
         """
         try:
-            self.compiled = Compiler.compile(self.tree, story=self)
+            result = Compiler.compile(self.tree, story=self,
+                                      mutation_table=mutation_table,
+                                      stop_after=stop_after)
         except (CompilerError, StorySyntaxError) as error:
             raise self.error(error) from error
+        if stop_after is None:
+            self.compiled = result
+        else:
+            self.tree = result
 
     def lex(self, parser):
         """
@@ -116,14 +149,25 @@ class Story:
             parser = self._parser()
         return parser.lex(self.story)
 
-    def process(self, parser=None):
+    def process(self, parser=None, mutation_table=None, budget=None,
+                stop_after=None):
         """
-        Parse and compile a story, returning the compiled JSON
+        Parse and compile a story, returning the compiled JSON.
+        The compilation is stopped if it exceeds its budget. With
+        `stop_after`, only the stages up to `parse`, `lower` or `semantics`
+        are run and the tree of that stage is returned.
         """
+        assert stop_after is None or stop_after in Compiler.stages
         if parser is None:
             parser = self._parser()
-        self.parse(parser=parser)
-        self.compile()
+        with Budget.use(budget):
+            self.parse(parser=parser)
+            if stop_after == 'parse':
+                return self.tree
+            self.compile(mutation_table=mutation_table,
+                         stop_after=stop_after)
+        if stop_after is not None:
+            return self.tree
         return self.compiled
 
     def _parser(self):
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+import random
+
+
+class StoryGenerator:
+    """
+    Generates valid stories of a given shape and size, e.g. to test how the
+    compiler scales. The stories only depend on the seed, s.t. a run can be
+    reproduced.
+    """
+    words = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf',
+             'hotel', 'india', 'juliet', 'kilo', 'lima', 'mike', 'november']
+    services = [('alpine', 'echo', 'message'), ('http', 'fetch', 'url'),
+                ('slack', 'send', 'text')]
+    indent = '    '
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+
+    def word(self):
+        return self.random.choice(self.words)
+
+    def pick(self, names, default):
+        if len(names) == 0:
+            return default
+        return self.random.choice(names)
+
+    def statement(self, index, names):
+        """
+        Returns the lines of a random statement. The variables it defines
+        are added to `names`, a dictionary of the variables of each type.
+        """
+        ints, strings, lists = names['int'], names['string'], names['list']
+        kind = self.random.randrange(8)
+        if kind == 0:
+            name = f'n{index}'
+            a, b = self.pick(ints, '1'), self.pick(ints, '2')
+            names['int'].append(name)
+            return [f'{name} = {a} * {self.random.randrange(1, 9)} + {b}']
+        if kind == 1:
+            name = f's{index}'
+            value = self.pick(ints, '1')
+            names['string'].append(name)
+            return [f'{name} = "{self.word()} {{{value}}} {self.word()}"']
+        if kind == 2:
+            name = f'l{index}'
+            items = ', '.join(self.pick(ints, '0') for _ in range(3))
+            names['list'].append(name)
+            return [f'{name} = [{items}]']
+        if kind == 3:
+            name = f'n{index}'
+            names['int'].append(name)
+            return [f'{name} = {self.pick(lists, "[1, 2]")} length']
+        if kind == 4:
+            name = f's{index}'
+            value = self.pick(strings, "''")
+            names['string'].append(name)
+            return [f'{name} = {value} uppercase']
+        if kind == 5:
+            value = self.pick(ints, '0')
+            return [f'if {value} > {self.random.randrange(10)}',
+                    f'{self.indent}b{index} = {value} + 1',
+                    'else',
+                    f'{self.indent}b{index} = {value} - 1']
+        if kind == 6:
+            return [f'foreach {self.pick(lists, "[1, 2]")} as item',
+                    f'{self.indent}e{index} = item * 2']
+        service, command, argument = self.random.choice(self.services)
+        value = self.pick(strings, '"text"')
+        return [f'{service} {command} {argument}:{value}']
+
+    def lines(self, count):
+        """
+        A story of `count` lines with a mix of statements.
+        """
+        names = {'int': [], 'string': [], 'list': []}
+        lines = []
+        while len(lines) < count:
+            lines += self.statement(len(lines), names)
+        return '\n'.join(lines)
+
+    def nesting(self, depth):
+        """
+        A story with blocks nested `depth` levels deep.
+        """
+        lines = ['x = 1', 'items = [1, 2, 3]']
+        for level in range(depth):
+            indent = self.indent * level
+            if level % 2 == 0:
+                lines.append(f'{indent}if x > {level}')
+            else:
+                lines.append(f'{indent}foreach items as i{level}')
+            lines.append(f'{indent}{self.indent}y{level} = x + {level}')
+        return '\n'.join(lines)
+
+    def ladder(self, branches):
+        """
+        A story with an if/else if ladder of `branches` branches.
+        """
+        lines = ['x = 0', 'if x == 0', f'{self.indent}y = 0']
+        for branch in range(1, branches):
+            lines += [f'else if x == {branch}', f'{self.indent}y = {branch}']
+        lines += ['else', f'{self.indent}y = -1']
+        return '\n'.join(lines)
+
+    def list_literal(self, elements):
+        """
+        A story with a list literal of `elements` elements.
+        """
+        items = ', '.join(str(self.random.randrange(1000))
+                          for _ in range(elements))
+        return f'items = [{items}]'
+
+    def templates(self, count):
+        """
+        A story with `count` string templates.
+        """
+        lines = ['x = 1', 'name = "story"']
+        for index in range(count):
+            parts = [self.word()]
+            for _ in range(self.random.randrange(1, 4)):
+                parts.append(self.random.choice(['{x}', '{name}',
+                                                 '{x + 1}']))
+                parts.append(self.word())
+            lines.append(f't{index} = "{" ".join(parts)}"')
+        return '\n'.join(lines)
+
+    def inline(self, count):
+        """
+        A story with a line of `count` inline mutations and templates, which
+        are all lowered into the block of that line.
+        """
+        items = []
+        for index in range(count):
+            if self.random.randrange(2) == 0:
+                items.append(f'(items length) + {index}')
+            else:
+                items.append(f'"{self.word()} {{items length}}"')
+        return f'items = [1, 2]\nvalues = [{", ".join(items)}]'
+
+    def bundle(self, count, fan_in=10, depth=5):
+        """
+        A mapping of `count` story paths to stories. The stories are split
+        into `depth` layers and each story imports up to `fan_in` stories of
+        the next layer, s.t. the stories of the last layers are imported
+        many times.
+        """
+        layers = [[] for _ in range(depth)]
+        for index in range(count):
+            layers[index * depth // count].append(f'stories/s{index}.story')
+        files = {}
+        for level, layer in enumerate(layers):
+            imported = layers[level + 1] if level + 1 < depth else []
+            for path in layer:
+                modules = self.random.sample(imported,
+                                             min(fan_in, len(imported)))
+                lines = [f"import '{module[:-6]}' as m{number}"
+                         for number, module in enumerate(modules)]
+                lines.append(self.lines(5))
+                files[path] = '\n'.join(lines)
+        return files
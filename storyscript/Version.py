@@ -1,10 +1,11 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import io
+import pkgutil
 import subprocess
+import sys
 from os import path
-
-import pkg_resources
+from types import ModuleType
 
 root_dir = path.abspath(path.dirname(path.dirname(__file__)))
 
@@ -37,11 +38,18 @@ def read_version_file():
 
 
 def read_version_package():
-    resource_package = 'storyscript'
-    ver = pkg_resources.resource_string(resource_package, 'VERSION')
+    ver = pkgutil.get_data('storyscript', 'VERSION')
     return ver.decode('utf8').strip()
 
 
+def is_checkout():
+    """
+    Whether storyscript runs from a git checkout. Installed releases never
+    are, s.t. they never spawn git.
+    """
+    return path.exists(path.join(root_dir, '.git'))
+
+
 def read_version():
     try:
         return read_version_file()
@@ -63,10 +71,11 @@ def get_version():
         return _version
 
     # detect a git version (for development builds)
-    try:
-        return git_describe()
-    except Exception:
-        pass
+    if is_checkout():
+        try:
+            return git_describe()
+        except Exception:
+            pass
 
     # soft fallback in case everything fails
     return '0.0.0'
@@ -78,14 +87,42 @@ def get_release_version():
         return _version
 
     # detect a git version (for development builds)
-    try:
-        return git_version()
-    except Exception:
-        pass
+    if is_checkout():
+        try:
+            return git_version()
+        except Exception:
+            pass
 
     # soft fallback in case everything fails
     return '0.0.0'
 
 
-version = get_version()
-release_version = get_release_version()
+_getters = {'version': get_version, 'release_version': get_release_version}
+
+
+def lazy(name):
+    """
+    Computes `version` and `release_version` on first use, s.t. importing
+    this module never runs git.
+    """
+    if name not in _getters:
+        raise AttributeError(name)
+    value = _getters[name]()
+    globals()[name] = value
+    return value
+
+
+class LazyModule(ModuleType):
+    """
+    Resolves the lazy attributes of this module. A module level
+    `__getattr__` would need Python 3.7.
+    """
+
+    def __getattr__(self, name):
+        return lazy(name)
+
+
+# setup.py executes this file without a module
+_module = sys.modules.get(globals().get('__name__'))
+if _module is not None:
+    _module.__class__ = LazyModule
@@ -1,11 +1,26 @@
 # -*- coding: utf-8 -*-
-from .Api import Api
-from .Version import version
+import sys
+from types import ModuleType
 
 
-__version__ = version = version
+class Package(ModuleType):
+    """
+    Imports the compiler on first use, s.t. importing storyscript, e.g. for
+    the command line, stays cheap. A module level `__getattr__` would need
+    Python 3.7.
+    """
 
+    def __getattr__(self, name):
+        if name in ('version', '__version__'):
+            from .Version import version
+            value = version
+        elif name in ('load', 'loads', 'load_map'):
+            from .Api import Api
+            value = getattr(Api, name)
+        else:
+            raise AttributeError(name)
+        setattr(self, name, value)
+        return value
 
-loads = Api.loads
-load = Api.load
-load_map = Api.load_map
+
+sys.modules[__name__].__class__ = Package
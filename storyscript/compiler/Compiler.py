@@ -1,22 +1,90 @@
 # -*- coding: utf-8 -*-
+from storyscript.Budget import Budget
+from storyscript.Profile import Profile
+from storyscript.Stages import Stages
+from storyscript.compiler.Pass import Pass
+from storyscript.compiler.PassManager import PassManager
 from storyscript.compiler.json.JSONCompiler import JSONCompiler
+from storyscript.compiler.lowering.Compactor import Compactor
+from storyscript.compiler.lowering.Deduplicator import Deduplicator
 from storyscript.compiler.lowering.Lowering import Lowering
 from storyscript.compiler.semantics.Semantics import Semantics
 
 
 class Compiler:
 
+    # the stages a compilation can stop after, in order
+    stages = Stages.stoppable
+
+    @staticmethod
+    def lower(tree, story, **options):
+        return Lowering(parser=tree.parser).process(tree)
+
+    @staticmethod
+    def compact(tree, story, **options):
+        tree = Compactor.process(tree)
+        Profile.count_nodes('lowered_nodes', tree)
+        return tree
+
+    @staticmethod
+    def check_budget(tree, story, **options):
+        Budget.check_tree(tree)
+        return tree
+
+    @staticmethod
+    def semantics(tree, story, mutation_table=None, **options):
+        return Semantics(mutation_table=mutation_table).process(tree)
+
+    @staticmethod
+    def deduplicate(tree, story, **options):
+        """
+        Eliminates common subexpressions. This pass isn't registered by
+        default, see `Deduplicator`.
+        """
+        return Deduplicator.process(tree)
+
+    @staticmethod
+    def json(tree, story, debug=False, **options):
+        Budget.check_time()
+        return JSONCompiler(story).compile(tree, debug=debug)
+
     @classmethod
-    def generate(cls, tree, debug=False):
+    def default_passes(cls):
+        """
+        Returns the passes of a compilation.
+        """
+        return PassManager([
+            Pass('lower', 'lower', cls.lower),
+            Pass('compact', 'lower', cls.compact),
+            Pass('check_budget', 'semantics', cls.check_budget),
+            Pass('semantics', 'semantics', cls.semantics),
+            Pass('json', 'json', cls.json),
+        ])
+
+    @classmethod
+    def generate(cls, tree, debug=False, mutation_table=None,
+                 stop_after=None):
         """
         Parses an AST and checks it.
         """
-        tree = Lowering(parser=tree.parser).process(tree)
-        return Semantics().process(tree)
+        if stop_after is None:
+            stop_after = 'semantics'
+        return cls.passes.run(tree, None, stop_after=stop_after, debug=debug,
+                              mutation_table=mutation_table)
 
     @classmethod
-    def compile(cls, tree, story, debug=False, backend='json'):
+    def compile(cls, tree, story, debug=False, backend='json',
+                mutation_table=None, stop_after=None):
+        """
+        Compiles an AST. With `stop_after`, only the stages up to the given
+        one are run and the resulting tree is returned.
+        """
         assert backend == 'json'
-        compiler = JSONCompiler(story)
-        tree = cls.generate(tree, debug=debug)
-        return compiler.compile(tree, debug=debug)
+        assert stop_after is None or stop_after in cls.stages[1:]
+        Profile.count_nodes('nodes', tree)
+        return cls.passes.run(tree, story, stop_after=stop_after, debug=debug,
+                              mutation_table=mutation_table)
+
+
+# the registered passes, which run for every compilation
+Compiler.passes = Compiler.default_passes()
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+
+class Pass:
+    """
+    A pass of the compiler, which belongs to one of its stages. `run` is
+    called with the tree of the previous pass, the story and the options of
+    the compilation (`debug` and `mutation_table`) and returns the tree for
+    the next pass, e.g. `run(tree, story, **options)`.
+    """
+
+    def __init__(self, name, stage, run):
+        self.name = name
+        self.stage = stage
+        self.run = run
+
+    def __repr__(self):
+        return f'Pass({self.name!r}, {self.stage!r})'
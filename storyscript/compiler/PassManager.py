@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from storyscript.Profile import Profile
+from storyscript.Stages import Stages
+
+
+class PassManager:
+    """
+    Runs the passes of a compilation in order. Passes can be registered
+    around the existing ones, and hooks are called before and after every
+    pass, e.g. to export metrics:
+
+        def after(name, story, tree, elapsed):
+            ...
+
+        Compiler.passes.add_hook(after=after)
+
+    Before hooks are called with the name of the pass, the story and the
+    tree, after hooks also with the time the pass took in seconds.
+
+    Passes and hooks can be changed while other threads compile: changes
+    replace the lists of passes and hooks under a lock, and every run uses
+    the lists it started with.
+    """
+
+    # the stages of the passes, in order
+    stages = Stages.passes
+
+    def __init__(self, passes=None):
+        if passes is None:
+            passes = []
+        self.passes = list(passes)
+        self.before = []
+        self.after = []
+        self.lock = threading.Lock()
+
+    def names(self):
+        return [p.name for p in self.passes]
+
+    def index(self, name):
+        names = self.names()
+        if name not in names:
+            raise ValueError(f'unknown pass {name}')
+        return names.index(name)
+
+    def position(self, pass_, before=None, after=None):
+        """
+        Returns the index a pass is inserted at: before or after another
+        pass, or after the last pass of its stage or of an earlier one.
+        """
+        if before is not None:
+            return self.index(before)
+        if after is not None:
+            return self.index(after) + 1
+        stage = self.stages.index(pass_.stage)
+        position = 0
+        for i, p in enumerate(self.passes):
+            if self.stages.index(p.stage) <= stage:
+                position = i + 1
+        return position
+
+    def register(self, pass_, before=None, after=None):
+        """
+        Registers a pass before or after another pass, or as the last pass
+        of its stage. The passes of a stage have to run after the passes of
+        the earlier stages, s.t. compilations stopping after a stage run
+        all of its passes.
+        """
+        if pass_.stage not in self.stages:
+            raise ValueError(f'unknown stage {pass_.stage}')
+        with self.lock:
+            if pass_.name in self.names():
+                raise ValueError(f'pass {pass_.name} is already registered')
+            passes = list(self.passes)
+            passes.insert(self.position(pass_, before, after), pass_)
+            stages = [self.stages.index(p.stage) for p in passes]
+            if stages != sorted(stages):
+                raise ValueError(f'pass {pass_.name} of stage {pass_.stage} '
+                                 'would run out of stage order')
+            self.passes = passes
+
+    def unregister(self, name):
+        """
+        Removes a pass, returning it.
+        """
+        with self.lock:
+            passes = list(self.passes)
+            pass_ = passes.pop(self.index(name))
+            self.passes = passes
+        return pass_
+
+    def add_hook(self, before=None, after=None):
+        with self.lock:
+            if before is not None:
+                self.before = self.before + [before]
+            if after is not None:
+                self.after = self.after + [after]
+
+    def remove_hook(self, before=None, after=None):
+        with self.lock:
+            if before is not None:
+                hooks = list(self.before)
+                hooks.remove(before)
+                self.before = hooks
+            if after is not None:
+                hooks = list(self.after)
+                hooks.remove(after)
+                self.after = hooks
+
+    def run(self, tree, story, stop_after=None, **options):
+        """
+        Runs the passes up to the stage `stop_after`, or all passes,
+        returning the result of the last one.
+        """
+        passes, before, after = self.passes, self.before, self.after
+        last = len(self.stages) - 1
+        if stop_after is not None:
+            last = self.stages.index(stop_after)
+        for p in passes:
+            if self.stages.index(p.stage) > last:
+                break
+            for hook in before:
+                hook(p.name, story, tree)
+            start = time.perf_counter()
+            with Profile.phase(p.stage):
+                tree = p.run(tree, story, **options)
+            elapsed = time.perf_counter() - start
+            for hook in after:
+                hook(p.name, story, tree, elapsed)
+        return tree
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
 from storyscript.compiler.Compiler import Compiler
+from storyscript.compiler.Pass import Pass
+from storyscript.compiler.PassManager import PassManager
 
-__all__ = ['Compiler']
+__all__ = ['Compiler', 'Pass', 'PassManager']
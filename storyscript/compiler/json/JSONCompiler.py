@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from storyscript.Budget import Budget
 from storyscript.Version import version
 from storyscript.exceptions import StorySyntaxError
 from storyscript.exceptions import internal_assert
@@ -59,7 +60,7 @@ class JSONCompiler:
         Compiles an import rule
         """
         module = tree.child(1).value
-        self.lines.modules[module] = tree.string.child(0).value[1:-1]
+        self.lines.modules[module] = tree.string.child(0).value
 
     def absolute_expression(self, tree, parent):
         """
@@ -413,6 +414,7 @@ class JSONCompiler:
                          'try_block', 'return_statement', 'arguments',
                          'imports', 'while_block', 'throw_statement',
                          'break_statement', 'mutation_block', 'indented_chain']
+        Budget.check_time()
         if tree.data in allowed_nodes:
             getattr(self, tree.data)(tree, parent)
         else:
@@ -141,6 +141,23 @@ class Objects:
         value = unicode_escape(tree, tree.child(0).value)
         return {'$OBJECT': 'string', 'string': value}
 
+    def string_template(self, tree):
+        """
+        Compiles a string template tree. Its expressions are replaced with
+        `{}` in the string and listed in `values`.
+        """
+        parts = []
+        values = []
+        for child in tree.children:
+            if child.data == 'string':
+                value = self.string(child)['string']
+                parts.append(value.replace('{', '{{').replace('}', '}}'))
+            else:
+                parts.append('{}')
+                values.append(self.path(child))
+        return {'$OBJECT': 'string', 'string': ''.join(parts),
+                'values': values}
+
     @staticmethod
     def boolean(tree):
         if tree.child(0).value == 'true':
@@ -213,6 +230,8 @@ class Objects:
         if hasattr(subtree, 'data'):
             if subtree.data == 'string':
                 return self.string(subtree)
+            elif subtree.data == 'string_template':
+                return self.string_template(subtree)
             elif subtree.data == 'boolean':
                 return self.boolean(subtree)
             elif subtree.data == 'list':
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from lark.lexer import Token
+
+from storyscript.parser.Tree import Tree
+
+
+class Compactor:
+    """
+    Compacts the expressions of a lowered tree. The grammar nests every
+    operand in a chain of precedence levels, e.g. a number is wrapped in
+    `or_expression -> and_expression -> ... -> primary_expression -> entity`.
+    A compacted expression only consists of:
+
+        - `entity` leaves (and the `as_expression` of typed assignments)
+        - `operation` nodes with the operator token and its operands
+          (in source order, e.g. `[a, +, b]` or `[!, a]`)
+        - `cast_expression` nodes with an operand and an `as_operator`
+
+    The nesting of the operations is kept, s.t. the compiled output doesn't
+    change.
+    """
+
+    # precedence levels which are skipped when they only wrap an operand
+    chain = {'or_expression', 'and_expression', 'cmp_expression',
+             'arith_expression', 'mul_expression', 'unary_expression',
+             'pow_expression', 'primary_expression'}
+
+    # operator subtrees which are replaced with their token
+    operators = {'cmp_operator', 'arith_operator', 'unary_operator',
+                 'mul_operator', 'pow_operator'}
+
+    @classmethod
+    def operand(cls, node):
+        """
+        Returns the compacted form of an expression subtree.
+        """
+        while node.data in cls.chain and len(node.children) == 1:
+            node = node.children[0]
+
+        if node.data == 'entity' or node.data == 'as_expression':
+            # the lowering casts typed assignments with an `as_expression`
+            cls.visit(node)
+            return node
+
+        if node.data == 'pow_expression' and \
+                node.child(1).data == 'as_operator':
+            return Tree('cast_expression', [cls.operand(node.child(0)),
+                                            node.child(1)])
+
+        assert node.data in cls.chain
+        children = []
+        for child in node.children:
+            if isinstance(child, Token):
+                # AND and OR aren't wrapped in an operator subtree
+                children.append(child)
+            elif child.data in cls.operators:
+                children.append(child.child(0))
+            else:
+                children.append(cls.operand(child))
+        return Tree('operation', children)
+
+    @classmethod
+    def visit(cls, tree):
+        """
+        Compacts all expressions in the tree.
+        """
+        for child in tree.children:
+            if not isinstance(child, Tree):
+                continue
+            if child.data == 'expression' or \
+                    child.data == 'primary_expression':
+                child.children = [cls.operand(child.child(0))]
+            else:
+                cls.visit(child)
+
+    @classmethod
+    def process(cls, tree):
+        cls.visit(tree)
+        return tree
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+from lark.lexer import Token
+
+from storyscript.compiler.lowering.Faketree import FakeTree
+from storyscript.parser.Tree import Tree
+
+
+class Deduplicator:
+    """
+    Eliminates common subexpressions of a checked tree. The lowering assigns
+    every inline mutation, expression of a string template or service call
+    to a fake path. A fake assignment of the same pure mutation or
+    expression as an earlier one is removed and its references use the
+    path of the earlier one, e.g.
+
+        __p-1.1 = l length
+        __p-1.2 = l length
+        x = __p-1.1 + __p-1.2
+
+    becomes `x = __p-1.1 + __p-1.1`. An assignment is reused by the
+    following fake assignments of its block and, unless the variables it
+    reads are assigned in between, by the following blocks and the blocks
+    nested in if, while, foreach and try statements.
+
+    Service and function calls are never merged. The pass runs after the
+    semantics, which tell mutations from service calls.
+    """
+
+    # mutations that return a random value or change their operand
+    impure = {'random', 'pop', 'remove'}
+
+    # statements whose nested blocks run in order, after the statement
+    flow = {'if_block', 'elseif_block', 'else_block', 'while_block',
+            'foreach_block', 'try_block', 'catch_block', 'finally_block'}
+
+    def __init__(self):
+        # the removed fake paths and the paths which replace them
+        self.renames = {}
+
+    @staticmethod
+    def key(tree):
+        """
+        Returns a key of a subtree, which is equal for equal subtrees.
+        """
+        if isinstance(tree, Token):
+            return tree.type, tree.value
+        return tree.data, tuple(Deduplicator.key(c) for c in tree.children)
+
+    @staticmethod
+    def subtrees(tree):
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Tree):
+                yield node
+                stack.extend(node.children)
+
+    @classmethod
+    def reads(cls, tree):
+        """
+        Returns the variables a subtree reads.
+        """
+        return {node.child(0).value for node in cls.subtrees(tree)
+                if node.data == 'path'}
+
+    @classmethod
+    def writes(cls, tree):
+        """
+        Returns the variables a statement assigns, including the ones
+        assigned by its nested blocks.
+        """
+        names = set()
+        for node in cls.subtrees(tree):
+            if node.data == 'assignment':
+                names.add(node.child(0).child(0).value)
+            elif node.data == 'output' or node.data == 'catch_statement':
+                names.update(c.value for c in node.children
+                             if isinstance(c, Token) and c.type == 'NAME')
+        return names
+
+    @classmethod
+    def barrier(cls, tree):
+        """
+        Checks whether a subtree calls a function or an impure mutation,
+        which might change any variable.
+        """
+        for node in cls.subtrees(tree):
+            if node.data == 'call_expression':
+                return True
+            if node.data == 'mutation_fragment' and \
+                    node.child(0).value in cls.impure:
+                return True
+        return False
+
+    @classmethod
+    def pure(cls, value):
+        """
+        Checks whether the value of a fake assignment can be reused.
+        """
+        expression = value.child(0)
+        if expression.data != 'mutation' and \
+                expression.data != 'expression':
+            return False
+        for node in cls.subtrees(expression):
+            if node.data == 'service' or node.data == 'call_expression':
+                return False
+            if node.data == 'mutation_fragment' and \
+                    node.child(0).value in cls.impure:
+                return False
+        return True
+
+    @staticmethod
+    def is_fake(node):
+        if node.data != 'assignment':
+            return False
+        return node.child(0).child(0).value.startswith(FakeTree.prefix)
+
+    def rename(self, node):
+        """
+        Replaces the removed fake paths of a subtree, except in its nested
+        blocks, which are renamed when they're visited.
+        """
+        for child in node.children:
+            if not isinstance(child, Tree) or child.data == 'nested_block':
+                continue
+            if child.data == 'path':
+                name = child.child(0)
+                if name.value in self.renames:
+                    child.children[0] = Token.new_borrow_pos(
+                        name.type, self.renames[name.value], name)
+            self.rename(child)
+
+    def visit(self, node, available):
+        """
+        Visits the nested blocks of a statement. Blocks nested in control
+        flow statements can reuse the `available` assignments.
+        """
+        for child in node.children:
+            if not isinstance(child, Tree):
+                continue
+            if child.data == 'nested_block':
+                inherited = {}
+                if node.data in self.flow:
+                    inherited = dict(available)
+                self.blocks(child, inherited)
+            else:
+                self.visit(child, available)
+
+    def blocks(self, node, available):
+        """
+        Visits a sequence of blocks, e.g. the blocks of a nested block.
+        """
+        for child in node.children:
+            if isinstance(child, Tree) and child.data == 'block':
+                self.block(child, available)
+
+    def block(self, block, available):
+        """
+        Eliminates the fake assignments of a block which are already
+        `available`, a mapping of keys to the path and the variables read
+        by the assignment.
+        """
+        children = []
+        for child in block.children:
+            if not isinstance(child, Tree):
+                children.append(child)
+                continue
+            self.rename(child)
+            if self.is_fake(child):
+                name = child.child(0).child(0).value
+                value = child.assignment_fragment.base_expression
+                if self.pure(value):
+                    key = self.key(value)
+                    if key in available:
+                        self.renames[name] = available[key][0]
+                        continue
+                    available[key] = (name, self.reads(value))
+                elif self.barrier(value):
+                    available.clear()
+                children.append(child)
+                continue
+
+            if self.barrier(child):
+                available.clear()
+            else:
+                writes = self.writes(child)
+                for key, (name, reads) in list(available.items()):
+                    if reads & writes:
+                        del available[key]
+            self.visit(child, available)
+            children.append(child)
+        block.children = children
+
+    @classmethod
+    def process(cls, tree):
+        cls().blocks(tree, {})
+        return tree
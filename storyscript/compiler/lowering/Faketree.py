@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from lark.lexer import Token
 
+from storyscript.Budget import Budget
+from storyscript.Profile import Profile
 from storyscript.parser import Tree
 
 
@@ -15,6 +17,10 @@ class FakeTree:
         self.block = block
         self.original_line = str(block.line())
         self.new_lines = {}
+        # the assignments to insert, by the node they're inserted before
+        self.insertions = {}
+        # the index of the first node of each line of the block
+        self.positions = None
         self._check_existing_fake_lines(block)
 
     def _check_existing_fake_lines(self, block):
@@ -29,6 +35,8 @@ class FakeTree:
         Creates fake line numbers. The strings are decreasingly sorted,
         so that the resulting tree is compiled correctly.
         """
+        Budget.add_fake_line()
+        Profile.count('fake_lines')
         line = self.original_line
         parts = line.split('.')
         if len(parts) > 1:
@@ -96,32 +104,46 @@ class FakeTree:
     def find_insert_pos(self, original_line):
         """
         Finds the insert position for a targeted line in the fake tree block.
+        The lines of the block are only looked up once.
         """
-        for i, n in enumerate(self.block.children):
-            line = n.line()
-            if line == original_line:
-                return i
+        if self.positions is None:
+            self.positions = {}
+            for i, n in enumerate(self.block.children):
+                self.positions.setdefault(n.line(), i)
         # use the last position as insert position by default
         # this inserts the new assignment node _before_ the last node
-        return -1
+        return self.positions.get(original_line,
+                                  len(self.block.children) - 1)
 
     def add_assignment(self, value, original_line):
         """
-        Creates an assignments and adds it to the current block
+        Creates an assignment and adds it to the current block once the
+        block is spliced.
         Returns a fake path reference to this assignment
         """
         assert len(self.block.children) >= 1
 
         insert_pos = self.find_insert_pos(original_line)
         assignment = self.assignment(value)
-
-        self.block.children = [
-            *self.block.children[:insert_pos],
-            assignment,
-            *self.block.children[insert_pos:],
-        ]
+        node = self.block.children[insert_pos]
+        self.insertions.setdefault(id(node), []).append(assignment)
 
         # we need a new node, s.t. already inserted fake node don't get changed
         name = Token('NAME', assignment.path.child(0), line=original_line)
         fake_path = Tree('path', [name])
         return fake_path
+
+    def splice(self):
+        """
+        Inserts the added assignments into the block, each before the node
+        of its line and in the order they were added.
+        """
+        if len(self.insertions) == 0:
+            return
+        children = []
+        for child in self.block.children:
+            children.extend(self.insertions.pop(id(child), ()))
+            children.append(child)
+        assert len(self.insertions) == 0
+        self.block.children = children
+        self.positions = None
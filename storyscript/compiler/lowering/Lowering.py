@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
+import re
 from enum import Enum
 
 from lark.lexer import Token
 
+from storyscript.Budget import Budget
+from storyscript.Profile import Profile
 from storyscript.compiler.lowering.Faketree import FakeTree
 from storyscript.compiler.lowering.utils import service_to_mutation, \
         unicode_escape
@@ -22,6 +25,10 @@ class Lowering:
     too complicated for the Transformer, before the tree is compiled.
     """
 
+    # the tokens of a string template: escape sequences (or a trailing
+    # backslash), braces and runs of other characters
+    template_tokens = re.compile(r'\\.?|[{}]|[^\\{}]+', re.DOTALL)
+
     def __init__(self, parser):
         """
         Saves the used parser as it might be used again for re-evaluation
@@ -67,6 +74,8 @@ class Lowering:
         if not hasattr(node, 'children') or len(node.children) == 0:
             return
 
+        Budget.check_time()
+
         if node.data == 'block':
             # only generate a fake_block once for every line
             # node: block in which the fake assignments should be inserted
@@ -92,6 +101,9 @@ class Lowering:
         for c in node.children:
             cls.visit(c, block, entity, pred, fun, parent=node)
 
+        if node.data == 'block':
+            block.splice()
+
         if pred(node):
             assert entity is not None
             assert block is not None
@@ -101,6 +113,8 @@ class Lowering:
 
             # Evaluate from leaf to the top
             fun(node, fake_tree, entity.path)
+            if fake_tree is not block:
+                fake_tree.splice()
 
             # split services into service calls and mutations
             if entity.data == 'service':
@@ -112,139 +126,103 @@ class Lowering:
         return hasattr(n, 'data') and n.data == 'inline_expression'
 
     @staticmethod
-    def add_strings(n1, *other_nodes):
-        """
-        Create an AST for concating two or more nodes.
-        """
-        # concatenation is currently defined as
-        # arith_expression = arith_expression arith_operator mul_expression
-        base_tree = Tree('arith_expression', [
-            Tree('arith_expression', [
-                Tree('mul_expression', [
-                    Tree('unary_expression', [
-                        Tree('pow_expression', [
-                            Tree('primary_expression', [
-                                Tree('entity', [
-                                    n1
-                                ])
-                            ])
-                        ])
-                    ])
-                ]),
-            ])
-        ])
-
-        # if we only got one node, no concatenation is required. return
-        # directly
-        if len(other_nodes) == 0:
-            return base_tree.children[0]
-
-        base_tree.children.append(
-            Tree('arith_operator', [Token('PLUS', '+')]),
-        )
-
-        # Technically, the grammar only supports binary expressions, but
-        # the compiler and engine can handle n-ary expressions, so we can
-        # directly flatten the tree and add all additional nodes as extra
-        # mul_expressions
-        for n2 in other_nodes:
-            base_tree.children.append(Tree('mul_expression', [
-                Tree('unary_expression', [
-                    Tree('pow_expression', [
-                        Tree('primary_expression', [
-                            Tree('entity', [
-                                n2
-                            ])
-                        ])
-                    ])
-                ])
-            ]))
-        return base_tree
+    def template_escape(token):
+        """
+        Returns the text of an escape sequence of a string template, and
+        whether it starts an escaped unicode name, e.g. \\N{DASH}.
+        """
+        if len(token) == 1:
+            # a trailing backslash
+            return token, False
+        c = token[1]
+        if c == '{' or c == '}' or c == "\'" or c == '"':
+            # custom escapes
+            return c, False
+        if c == ' ':
+            # avoid deprecation messages for invalid escape sequences
+            return '\\\\ ', False
+        return token, c == 'N'
 
     @staticmethod
-    def make_full_tree_from_cmp(expr):
+    def template_part(tree, buf, code):
         """
-        Builds a full tree from a cmp_expression node.
+        Builds a part of a string template from the buffered text: a string
+        or the code of an interpolation.
         """
-        return Tree('expression', [
-            Tree('or_expression', [
-                Tree('and_expression', [
-                    Tree('cmp_expression', [expr])
-                ])
-            ])
-        ])
+        if code:
+            tree.expect(len(buf) > 0, 'string_templates_empty')
+            return {
+                '$OBJECT': 'code',
+                'code': unicode_escape(tree, ''.join(buf))
+            }
+        return {
+            '$OBJECT': 'string',
+            'string': ''.join(buf)
+        }
+
+    @classmethod
+    def interpolate(cls, tree, token, buf, inside_interpolation):
+        """
+        Processes a token outside of escape sequences. Returns the finished
+        part of the template, if any, and whether the following tokens are
+        inside an interpolation.
+        """
+        if inside_interpolation:
+            if token == '}':
+                # end string interpolation
+                return cls.template_part(tree, buf, code=True), False
+            tree.expect(token != '{', 'string_templates_nested')
+            buf.append(token)
+            return None, True
+        if token == '{':
+            # string interpolation might be the start of the string.
+            # example: "{..}"
+            if len(buf) > 0:
+                return cls.template_part(tree, buf, code=False), True
+            return None, True
+        tree.expect(token != '}', 'string_templates_unopened')
+        buf.append(token)
+        return None, False
 
     @classmethod
     def flatten_template(cls, tree, text):
         """
-        Flattens a string template into concatenation
+        Flattens a string template into concatenation. The text is split
+        into runs of plain characters, escape sequences and braces, s.t. it's
+        scanned in a single pass.
         """
-        # the previously seen character (n-1)
-        preceding_slash = False
         # indicates whether we're inside of a string template
         inside_interpolation = False
         inside_unicode = UnicodeNameDecodeState.No
-        buf = ''
-        for c in text:
-            if preceding_slash:
-                if c == '{' or c == '}' or c == "\'" or c == '"':
-                    # custom escapes
-                    buf = f'{buf[:-1]}{c}'
-                else:
-                    # avoid deprecation messages for invalid escape sequences
-                    if c == ' ':
-                        buf += '\\'
-                    if c == 'N':
-                        # start unicode escaped name sequence
-                        inside_unicode = UnicodeNameDecodeState.Start
-                    buf += c
-                preceding_slash = False
+        buf = []
+        for match in cls.template_tokens.finditer(text):
+            token = match.group()
+            if inside_unicode == UnicodeNameDecodeState.Start:
+                # an escaped name must start with a brace, e.g. \N{DASH}
+                tree.expect(token == '{', 'string_templates_nested')
+                inside_unicode = UnicodeNameDecodeState.Running
+                buf.append(token)
+            elif token[0] == '\\':
+                escaped, unicode_name = cls.template_escape(token)
+                if unicode_name:
+                    # start unicode escaped name sequence
+                    inside_unicode = UnicodeNameDecodeState.Start
+                buf.append(escaped)
+            elif inside_unicode == UnicodeNameDecodeState.Running:
+                if token == '}':
+                    inside_unicode = UnicodeNameDecodeState.No
+                buf.append(token)
             else:
-                if inside_unicode != UnicodeNameDecodeState.No:
-                    if c == '{':
-                        inside_unicode = UnicodeNameDecodeState.Running
-                    tree.expect(inside_unicode ==
-                                UnicodeNameDecodeState.Running,
-                                'string_templates_nested')
-                    if c == '}':
-                        inside_unicode = UnicodeNameDecodeState.No
-                    buf += c
-                elif inside_interpolation:
-                    if c == '}':
-                        # end string interpolation
-                        inside_interpolation = False
-                        tree.expect(len(buf) > 0, 'string_templates_empty')
-                        yield {
-                            '$OBJECT': 'code',
-                            'code': unicode_escape(tree, buf)
-                        }
-                        buf = ''
-                    else:
-                        tree.expect(c != '{', 'string_templates_nested')
-                        buf += c
-                elif c == '{':
-                    # string interpolation might be the start of the string.
-                    # example: "{..}"
-                    if len(buf) > 0:
-                        yield {
-                            '$OBJECT': 'string',
-                            'string': buf
-                        }
-                        buf = ''
-                    inside_interpolation = True
-                elif c == '}':
-                    tree.expect(0, 'string_templates_unopened')
-                else:
-                    buf += c
-                preceding_slash = c == '\\'
+                part, inside_interpolation = cls.interpolate(
+                    tree, token, buf, inside_interpolation)
+                if part is not None:
+                    yield part
+                    buf = []
 
         # emit remaining string in the buffer
         tree.expect(not inside_interpolation, 'string_templates_unclosed')
         if len(buf) > 0:
-            yield {
-                '$OBJECT': 'string',
-                'string': buf
-            }
+            yield cls.template_part(tree, buf, code=False)
 
     def eval(self, orig_node, code_string, fake_tree):
         """
@@ -257,6 +235,7 @@ class Lowering:
         # add whitespace as padding to fixup the column location of the
         # resulting tokens.
         from storyscript.Story import Story
+        Profile.count('template_parses')
         story = Story(' ' * column + code_string)
         story.parse(self.parser)
         new_node = story.tree
@@ -285,106 +264,47 @@ class Lowering:
         # the new assignment should be inserted at the top of the current block
         return fake_tree.add_assignment(new_node, original_line=line)
 
-    @classmethod
-    def build_string_value(cls, text):
+    @staticmethod
+    def build_string_value(text):
         """
         Returns the AST for a plain string AST node with 'text'
         """
-        return Tree('values', [
-            Tree('string', [
-                Token('DOUBLE_QUOTED', text)
-            ])
-        ])
+        return Tree('string', [Token('DOUBLE_QUOTED', text)])
 
-    def concat_string_templates(self, fake_tree, orig_node, string_objs):
+    def build_string_template(self, fake_tree, orig_node, string_objs):
         """
-        Concatenes the to-be-inserted string templates.
+        Builds a string template node from the flattened template.
         For example, a string template like "a{exp}b" gets flatten to:
-            "a" + fake_path_to_exp + "b"
+            string_template("a", fake_path_to_exp, "b")
 
         Strings can be inserted directly, but string templates must be
         evaluated to new AST nodes and the reference to their fake_node
         assignment should be used instead.
         """
-        ks = []
+        parts = []
         for s in string_objs:
             if s['$OBJECT'] == 'string':
                 # plain string -> insert directly
-                ks.append(self.build_string_value(s['string']))
+                parts.append(self.build_string_value(s['string']))
             else:
                 assert s['$OBJECT'] == 'code'
                 # string template -> eval
                 # ignore newlines in string interpolation
                 code = ''.join(s['code'].split('\n'))
-                ks.append(self.eval(orig_node, code, fake_tree))
-
-        return ks
+                parts.append(self.eval(orig_node, code, fake_tree))
+        return Tree('string_template', parts)
 
-    def insert_string_template_concat(self, fake_tree, new_node):
-        """
-        If the string concatenation has only one child, its returned directly.
-        Otherwise, the string template concatenation gets inserted into the
-        FakeTree.
-        Returns: a path reference to newly inserted assignment.
-        """
-        line = new_node.line()
-
-        # shortcut for single-child code like '${a}'
-        if len(new_node.children) == 1:
-            return new_node.mul_expression.unary_expression.pow_expression. \
-                    primary_expression.entity.path
-
-        assert len(new_node.children) >= 2
-
-        # Otherwise we need to insert a new fake node with the concatenation
-        new_node = self.make_full_tree_from_cmp(new_node)
-        # The new concatenation node needs to be inserted below the
-        # evaluated line
-        return fake_tree.add_assignment(new_node, original_line=line)
-
-    @staticmethod
-    def resolve_cmp_expr_to_string(cmp_expr):
-        """
-        Checks whether cmp_expression has only a string as a child.
-        """
-        if cmp_expr is None:
-            return None
-
-        return cmp_expr.follow_node_chain([
-            'cmp_expression',
-            'arith_expression', 'mul_expression', 'unary_expression',
-            'pow_expression', 'primary_expression', 'entity', 'values',
-            'string'])
-
-    def resolve_string_nodes(self, node, cmp_expr):
-        """
-        Searches for string nodes in the cmp_expression and given node.
-        Cmp_expression has a higher priority than the given node, but
-        will only be used if the found string node is the only node
-        in cmp_expr.
-
-        Returns: [<found string node>, <search node>]
-            where <search node> is either `cmp_expr` (when the
-            string node was a single leaf) or `node` otherwise.
-        """
-        only_cmp_expr = self.resolve_cmp_expr_to_string(cmp_expr)
-        if only_cmp_expr is not None:
-            # cmp_expression has only one leaf (the string), so we
-            # can directly replace its children
-            return only_cmp_expr, cmp_expr
-
-        return node.follow_node_chain(['entity', 'values', 'string']), node
-
-    def inline_string_templates(self, node, block, parent, cmp_expr):
+    def inline_string_templates(self, node, block, fake_trees):
         """
         String templates generate fake_nodes in the AST before their block
-        and are replaced with a reference to their fake_nodes.
+        for their expressions and are replaced with a `string_template` of
+        their strings and the references to the fake_nodes, s.t. the string
+        is built in one go.
 
-        If the string expression is the only node in its cmp_expression, it
-        will be directly inserted in the AST.
-        Otherwise, the string concatenation will be inserted as a new AST node.
+        A string template of a single expression, e.g. "{a}", is replaced
+        with the reference to its expression.
         """
-        string_node, node = self.resolve_string_nodes(node, cmp_expr)
+        string_node = node.follow_node_chain(['entity', 'values', 'string'])
         if string_node is None:
             return
 
@@ -402,34 +322,34 @@ class Lowering:
             # no further AST modifications required
             return
 
-        fake_tree = self.fake_tree(block)
-        children = self.concat_string_templates(fake_tree, string_node,
-                                                string_objs)
-        new_node = self.add_strings(*children)
-        # if there is more than one node in cmp_expression, node will point
-        # to the only the string entity and thus we can't insert string
-        # concatenation directly, but must insert it as a new fake node
-        # assignment.
-        if node.data != 'cmp_expression':
-            new_node = self.insert_string_template_concat(fake_tree, new_node)
-        node.children = [new_node]
+        fake_tree = fake_trees.get(id(block))
+        if fake_tree is None:
+            fake_tree = self.fake_tree(block)
+            fake_trees[id(block)] = fake_tree
+        template = self.build_string_template(fake_tree, string_node,
+                                              string_objs)
+        if len(template.children) == 1:
+            # shortcut for single-child code like '{a}'
+            node.children = [template.child(0)]
+            return
+        node.values.children = [template]
 
-    def visit_string_templates(self, node, block, parent, cmp_expr):
+    def visit_string_templates(self, node, block, fake_trees):
         """
-        Iterates the AST and evaluates string templates.
+        Iterates the AST and evaluates string templates. The fake trees of
+        the blocks are kept in `fake_trees` until all templates are
+        evaluated.
         """
         if not hasattr(node, 'children'):
             return
 
         if node.data == 'block':
             block = node
-        if node.data == 'cmp_expression':
-            cmp_expr = node
         elif node.data == 'entity':
-            self.inline_string_templates(node, block, parent, cmp_expr)
+            self.inline_string_templates(node, block, fake_trees)
 
         for c in node.children:
-            self.visit_string_templates(c, block, node, cmp_expr=cmp_expr)
+            self.visit_string_templates(c, block, fake_trees)
 
     def visit_concise_when(self, node):
         """
@@ -564,6 +484,9 @@ class Lowering:
             for c in node.children:
                 self.visit_assignment(c, block, parent=node)
 
+        if node.data == 'block':
+            block.splice()
+
     @staticmethod
     def create_unary_operation(child):
         op = Tree('unary_operator', [child.create_token('NOT', '!')])
@@ -676,8 +599,10 @@ class Lowering:
         self.visit_as_expr(tree, block=None)
         self.visit_arguments(tree)
         self.visit_assignment(tree, block=None, parent=None)
-        self.visit_string_templates(tree, block=None, parent=None,
-                                    cmp_expr=None)
+        fake_trees = {}
+        self.visit_string_templates(tree, block=None, fake_trees=fake_trees)
+        for fake_tree in fake_trees.values():
+            fake_tree.splice()
         self.visit(tree, None, None, pred,
                    self.replace_expression, parent=None)
         return tree
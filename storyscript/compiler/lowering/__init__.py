@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
+from storyscript.compiler.lowering.Compactor import Compactor
+from storyscript.compiler.lowering.Deduplicator import Deduplicator
 from storyscript.compiler.lowering.Faketree import FakeTree
 from storyscript.compiler.lowering.Lowering import Lowering
 
-__all__ = ['FakeTree', 'Lowering']
+__all__ = ['Compactor', 'Deduplicator', 'FakeTree', 'Lowering']
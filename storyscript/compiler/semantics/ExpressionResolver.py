@@ -151,6 +151,20 @@ class ExpressionResolver:
         assert tree.data == 'string'
         return StringType.instance()
 
+    def string_template(self, tree):
+        """
+        Compiles a string template tree. Its expressions must be
+        stringifiable.
+        """
+        assert tree.data == 'string_template'
+        string = StringType.instance()
+        for child in tree.children:
+            if child.data == 'path':
+                type_ = self.path(child)
+                child.expect(type_.string(), 'type_operation_incompatible',
+                             left=string, right=type_, op='+')
+        return string
+
     def boolean(self, tree):
         """
         Compiles a boolean tree.
@@ -294,6 +308,8 @@ class ExpressionResolver:
         if hasattr(subtree, 'data'):
             if subtree.data == 'string':
                 return self.string(subtree)
+            elif subtree.data == 'string_template':
+                return self.string_template(subtree)
             elif subtree.data == 'boolean':
                 return self.boolean(subtree)
             elif subtree.data == 'list':
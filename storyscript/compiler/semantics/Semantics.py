@@ -10,7 +10,10 @@ class Semantics:
 
     visitors = [TypeResolver]
 
+    def __init__(self, mutation_table=None):
+        self.mutation_table = mutation_table
+
     def process(self, tree):
         for visitor in self.visitors:
-            visitor().visit(tree)
+            visitor(mutation_table=self.mutation_table).visit(tree)
         return tree
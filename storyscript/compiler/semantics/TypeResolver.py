@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from storyscript.Budget import Budget
 from storyscript.compiler.semantics.types.Types import AnyType, NoneType, \
     ObjectType
 from storyscript.parser import Tree
@@ -19,6 +20,7 @@ class ScopeSelectiveVisitor:
     visit_children must be called explicitly.
     """
     def visit(self, tree, scope=None):
+        Budget.check_time()
         if hasattr(self, tree.data):
             return getattr(self, tree.data)(tree, scope)
 
@@ -32,10 +34,12 @@ class TypeResolver(ScopeSelectiveVisitor):
     """
     Tries to resolve the type of a variable or function call.
     """
-    def __init__(self):
+    def __init__(self, mutation_table=None):
+        if mutation_table is None:
+            mutation_table = MutationTable.init()
         self.symbol_resolver = SymbolResolver(scope=None)
         self.function_table = FunctionTable()
-        self.mutation_table = MutationTable.init()
+        self.mutation_table = mutation_table
         self.resolver = ExpressionResolver(
             symbol_resolver=self.symbol_resolver,
             function_table=self.function_table,
@@ -1,5 +1,7 @@
-from storyscript.compiler.semantics.functions.MutationBuilder import \
-    mutation_builder
+from os import path
+
+from storyscript.compiler.semantics.functions.MutationCatalogue import \
+    MutationCatalogue
 
 mutations = """
 List[A] length -> int
@@ -72,20 +74,68 @@ float sqrt -> float
 class Hub:
     """
     A representation of a Storyscript Engine and Hub.
-    Assumed to be Asyncy Engine for now.
+    Assumed to be Asyncy Engine for now. Additional catalogues of mutations,
+    e.g. of other engines, can be loaded from files.
     """
-    def __init__(self):
-        self._mutations = []
-        for m in mutations.split('\n'):
-            if len(m.strip()) == 0 or m.startswith('#'):
-                continue
-            self._mutations.append(mutation_builder(m))
-
-    def mutations(self):
+    # the precompiled form of `mutations`
+    compiled = path.join(path.dirname(__file__), 'hub.json')
+
+    def __init__(self, catalogues=None):
+        if catalogues is None:
+            catalogues = []
+        self.catalogues = catalogues
+        self._loaded = None
+        self._mutations = {}
+
+    @classmethod
+    def catalogue(cls):
+        """
+        Returns the catalogue of the Hub, which is precompiled unless the
+        compiled file is missing.
+        """
+        if path.exists(cls.compiled):
+            return MutationCatalogue.load(cls.compiled)
+        return MutationCatalogue.from_signatures(mutations)
+
+    def add_catalogue(self, catalogue_path):
+        """
+        Adds the mutations of a catalogue file.
+        """
+        self.catalogues.append(catalogue_path)
+        self._loaded = None
+        self._mutations = {}
+
+    def load(self):
+        """
+        Returns all catalogues. They are loaded on first use.
+        """
+        if self._loaded is None:
+            loaded = [self.catalogue()]
+            for catalogue_path in self.catalogues:
+                loaded.append(MutationCatalogue.load(catalogue_path))
+            self._loaded = loaded
+        return self._loaded
+
+    def build(self, name=None):
+        """
+        Builds the mutations of all catalogues, optionally only those named
+        `name`.
+        """
+        result = []
+        for catalogue in self.load():
+            result += catalogue.mutations(name)
+        return result
+
+    def mutations(self, name=None):
         """
-        Return all mutations supported by this hub.
+        Return the mutations supported by this hub, optionally only those
+        named `name`. They are built on first use.
         """
-        return self._mutations
+        result = self._mutations.get(name)
+        if result is None:
+            result = self.build(name)
+            self._mutations[name] = result
+        return result
 
 
 hub = Hub()
@@ -49,6 +49,18 @@ class Mutation:
         """
         return self._ti
 
+    def args(self):
+        """
+        The arguments of this mutation and their types.
+        """
+        return self._args
+
+    def output(self):
+        """
+        The output type of this mutation.
+        """
+        return self._output
+
     def base_type(self):
         """
         The base type that this mutation can mutation, e.g. IntType or ListType
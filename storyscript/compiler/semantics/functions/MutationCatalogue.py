@@ -0,0 +1,134 @@
+import io
+import json
+
+from storyscript.compiler.semantics.functions.Mutation import Mutation
+from storyscript.compiler.semantics.functions.MutationBuilder import \
+    mutation_builder
+from storyscript.compiler.semantics.types.GenericTypes import \
+    GenericType, ListGenericType, MapGenericType, TypeSymbol
+from storyscript.compiler.semantics.types.Types import AnyType, \
+    BooleanType, FloatType, IntType, NoneType, RegExpType, StringType, \
+    TimeType
+from storyscript.exceptions import StoryError
+
+
+class MutationCatalogue:
+    """
+    A catalogue of mutations, indexed by their base type and name.
+    Catalogues are compiled from mutation signatures, e.g.
+    `List[A] append item:A -> List[A]`, into a compact form which is stored
+    as JSON and loaded without parsing any signature.
+    """
+    format = 1
+    generics = {'List': ListGenericType, 'Map': MapGenericType}
+    base_types = {str(t): t for t in [
+        BooleanType.instance(), IntType.instance(), FloatType.instance(),
+        StringType.instance(), TimeType.instance(), NoneType.instance(),
+        RegExpType.instance(), AnyType.instance()]}
+
+    def __init__(self, index=None):
+        if index is None:
+            index = {}
+        # base type -> name -> [[type, {argument: type}, output]]
+        self.index = index
+
+    @staticmethod
+    def encode_type(type_):
+        """
+        Returns the compact form of a type: a string for base types and type
+        symbols, and a `[base type, [symbols]]` list for generic types.
+        """
+        if isinstance(type_, GenericType):
+            symbols = [MutationCatalogue.encode_type(s)
+                       for s in type_.symbols]
+            return [type_.base_type_name(), symbols]
+        if isinstance(type_, TypeSymbol):
+            return type_.name()
+        return str(type_)
+
+    @classmethod
+    def decode_type(cls, data):
+        """
+        Builds a type from its compact form.
+        """
+        if isinstance(data, list):
+            name, symbols = data
+            return cls.generics[name]([cls.decode_type(s) for s in symbols])
+        base_type = cls.base_types.get(data)
+        if base_type is not None:
+            return base_type
+        return TypeSymbol(data)
+
+    def add(self, mutation):
+        """
+        Adds a mutation to the catalogue.
+        """
+        base_type = mutation.base_type().__name__
+        names = self.index.setdefault(base_type, {})
+        arguments = {name: self.encode_type(type_)
+                     for name, type_ in mutation.args().items()}
+        entry = [self.encode_type(mutation.type()), arguments,
+                 self.encode_type(mutation.output())]
+        names.setdefault(mutation.name(), []).append(entry)
+
+    def mutations(self, name=None):
+        """
+        Builds the mutations of the catalogue, optionally only those named
+        `name`, which are looked up in the index.
+        """
+        result = []
+        for names in self.index.values():
+            if name is None:
+                selected = names.items()
+            else:
+                selected = [(name, names.get(name, []))]
+            for mutation_name, entries in selected:
+                for type_, arguments, output in entries:
+                    args = {arg: self.decode_type(arg_type)
+                            for arg, arg_type in arguments.items()}
+                    result.append(Mutation(ti=self.decode_type(type_),
+                                           name=mutation_name, args=args,
+                                           output=self.decode_type(output)))
+        return result
+
+    @classmethod
+    def from_signatures(cls, text):
+        """
+        Compiles a catalogue from mutation signatures, one per line. Empty
+        lines and comments are skipped.
+        """
+        catalogue = cls()
+        for line in text.split('\n'):
+            if len(line.strip()) == 0 or line.startswith('#'):
+                continue
+            catalogue.add(mutation_builder(line))
+        return catalogue
+
+    def dumps(self):
+        return json.dumps({'format': self.format, 'mutations': self.index},
+                          sort_keys=True, separators=(',', ':'))
+
+    @classmethod
+    def loads(cls, text):
+        data = json.loads(text)
+        if data.get('format') != cls.format:
+            raise StoryError.create_error('catalogue_format',
+                                          format=data.get('format'),
+                                          expected=cls.format)
+        return cls(data['mutations'])
+
+    def write(self, path):
+        with io.open(path, 'w', encoding='utf8') as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a catalogue from a file: a compiled catalogue if it's a `.json`
+        file, otherwise mutation signatures.
+        """
+        with io.open(path, 'r', encoding='utf8') as f:
+            text = f.read()
+        if path.endswith('.json'):
+            return cls.loads(text)
+        return cls.from_signatures(text)
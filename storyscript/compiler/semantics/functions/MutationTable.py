@@ -1,6 +1,6 @@
 from itertools import chain
 
-from storyscript.compiler.semantics.functions.HubMutations import hub
+from storyscript.compiler.semantics.functions.HubMutations import Hub, hub
 from storyscript.compiler.semantics.functions.Mutation import Mutation
 from storyscript.compiler.semantics.types.Types import AnyType
 
@@ -73,10 +73,12 @@ class MutationOverloads:
 
 class MutationTable:
     """
-    A table of all available mutation inside a story.
+    A table of all available mutation inside a story. Mutations of a `hub`
+    are looked up in its catalogues by name on first use.
     """
-    def __init__(self):
+    def __init__(self, hub=None):
         self.mutations = {}
+        self.hub = hub
 
     def insert(self, mutation):
         """
@@ -114,12 +116,27 @@ class MutationTable:
             mo.add_overloads(overloads)
         return mo
 
+    def lookup(self, name):
+        """
+        Returns the mutations `name` by type. The mutations of the hub are
+        inserted into a table of their own first, s.t. tables shared by
+        threads are only ever extended by complete entries.
+        """
+        muts = self.mutations.get(name, None)
+        if muts is None and self.hub is not None:
+            table = MutationTable()
+            for m in self.hub.mutations(name):
+                table.insert(m)
+            muts = table.mutations.get(name, {})
+            self.mutations[name] = muts
+        return muts
+
     def resolve(self, type_, name):
         """
         Returns the mutation `name` or `None`.
         """
-        muts = self.mutations.get(name, None)
-        if muts is None:
+        muts = self.lookup(name)
+        if not muts:
             return None
 
         if type_ == AnyType.instance():
@@ -135,11 +152,11 @@ class MutationTable:
         return mo
 
     @classmethod
-    def init(cls):
+    def init(cls, catalogues=None):
         """
-        Builds a list of all mutations of the Hub.
+        Builds a table of the mutations of the Hub and of additional
+        catalogue files.
         """
-        mi = cls()
-        for m in hub.mutations():
-            mi.insert(m)
-        return mi
+        if catalogues:
+            return cls(hub=Hub(catalogues=list(catalogues)))
+        return cls(hub=hub)
@@ -1,16 +1,20 @@
 # -*- coding: utf-8 -*-
+import threading
 
 
 def singleton(fn):
     """
-    Lazily instantiate a type
+    Lazily instantiate a type. Concurrent first calls get the same instance.
     """
     _instance = None
+    lock = threading.Lock()
 
     def wrapped():
         nonlocal _instance
         if _instance is None:
-            _instance = fn()
+            with lock:
+                if _instance is None:
+                    _instance = fn()
         return _instance
     return wrapped
 
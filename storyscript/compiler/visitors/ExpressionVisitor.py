@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
+from lark.lexer import Token
 
 
 class ExpressionVisitor:
     """
-    Visit an entire expression.
+    Visit an entire expression. Both the expressions of the grammar and
+    compacted expressions (see `Compactor`) are supported.
     """
 
     def nary_expression(self, tree):
@@ -28,8 +30,42 @@ class ExpressionVisitor:
         if tree.child(0).data == 'entity':
             return self.entity(tree.entity)
         else:
-            assert tree.child(0).data == 'or_expression'
-            return self.or_expression(tree.child(0))
+            return self.operand(tree.child(0))
+
+    def operation(self, tree):
+        """
+        Compiles a compacted operation with the given tree.
+        """
+        op = None
+        values = []
+        for child in tree.children:
+            if isinstance(child, Token):
+                op = child
+            else:
+                values.append(self.operand(child))
+        assert op is not None
+        return self.nary_expression(tree, op, values)
+
+    def cast_expression(self, tree):
+        """
+        Compiles a compacted cast with the given tree.
+        """
+        assert tree.child(1).data == 'as_operator'
+        return self.as_expression(tree, self.operand(tree.child(0)))
+
+    def operand(self, tree):
+        """
+        Compiles an operand of a compacted expression with the given tree.
+        """
+        if tree.data == 'entity':
+            return self.entity(tree)
+        elif tree.data == 'operation':
+            return self.operation(tree)
+        elif tree.data == 'cast_expression':
+            return self.cast_expression(tree)
+        else:
+            assert tree.data == 'or_expression'
+            return self.or_expression(tree)
 
     def pow_expression(self, tree):
         """
@@ -145,5 +181,4 @@ class ExpressionVisitor:
         if child.data == 'as_expression':
             return self.as_expression(child)
         else:
-            assert child.data == 'or_expression'
-            return self.or_expression(child)
+            return self.operand(child)
@@ -11,6 +11,8 @@ class ConstDict:
         self._data = data
 
     def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
         return self._data[attr]
 
     def __getitem__(self, item):
@@ -53,6 +55,9 @@ class ProcessingError(Exception):
             self.column = tree.column()
             self.end_column = tree.end_column()
 
+    def __reduce__(self):
+        return (self.__class__, (self.error,), self.__dict__)
+
     def message(self):
         if ErrorCodes.is_error(self.error):
             return ErrorCodes.get_error(self.error)[1].format(
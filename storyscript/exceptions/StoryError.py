@@ -3,8 +3,6 @@ import os
 
 import click
 
-from lark.exceptions import UnexpectedCharacters, UnexpectedToken
-
 from .CompilerError import CompilerError
 from .ProcessingError import ProcessingError
 from ..ErrorCodes import ErrorCodes
@@ -26,6 +24,28 @@ class StoryError(SyntaxError):
         self.with_color = True
         self.tabwidth = 2
 
+    def __reduce__(self):
+        """
+        Pickles the error, e.g. to send it from a worker process. Lark errors
+        and internal errors can't be pickled, so they are replaced with their
+        identified form.
+        """
+        error = self.error
+        if not isinstance(error, ProcessingError):
+            self.process()
+            if self.error_tuple == ErrorCodes.unidentified_error:
+                error = Exception(str(error))
+            else:
+                name = ErrorCodes.get_name(self.error_tuple)
+                error = CompilerError(name, format=getattr(self, '_format',
+                                                           None))
+            for attr in ['line', 'column', 'end_column']:
+                if hasattr(self.error, attr):
+                    setattr(error, attr, getattr(self.error, attr))
+        state = self.__dict__.copy()
+        state['error'] = error
+        return (self.__class__, (error, self.story, self.path), state)
+
     def name(self):
         """
         Extracts the name of the story from the path.
@@ -190,6 +210,8 @@ class StoryError(SyntaxError):
         """
         Identifies the error.
         """
+        # lark is only loaded by stories that are parsed
+        from lark.exceptions import UnexpectedCharacters, UnexpectedToken
         if hasattr(self.error, 'error'):
             if not isinstance(self.error.error, str):
                 return ErrorCodes.unidentified_error
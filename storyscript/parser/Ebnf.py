@@ -70,6 +70,14 @@ class Ebnf:
             rule = '{} {}'.format(rule, self.resolve(shard))
         self._rules[name] = rule.strip()
 
+    def rule_definitions(self):
+        """
+        Returns the definitions of the registered rules by name, without the
+        modifiers of their names (e.g. `!list` is returned as `list`).
+        """
+        return {name.lstrip('!?'): value
+                for name, value in self._rules.items()}
+
     def ignore(self, terminal):
         self._ignores.append('%ignore {}'.format(terminal))
 
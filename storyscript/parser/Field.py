@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from .Tree import Tree
+
+
+class Field:
+    """
+    A named field of a node: its first child subtree with the given rule, or
+    `None`. Like the generic attribute lookup of Tree, a field can be
+    overridden on a node by assigning it.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, tree, owner=None):
+        if tree is None:
+            return self
+        name = self.name
+        for child in tree.children:
+            if isinstance(child, Tree) and child.data == name:
+                return child
+        return None
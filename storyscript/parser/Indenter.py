@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from lark.lexer import Token
 
+from ..Budget import Budget
+
 # Improved from https://github.com/lark-parser/lark/
 # blob/9b0672fda646c6bbe662e4e51d2d5e3bdc700d77/lark/indenter.py
 
@@ -44,6 +46,7 @@ class Indenter:
         self.reset()
         for token in stream:
             if token.type == self.NL_type:
+                Budget.check_time()
                 for t in self.handle_nl(token):
                     yield t
             else:
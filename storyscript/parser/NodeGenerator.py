@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import io
+import re
+import textwrap
+from os import path
+
+from .Grammar import Grammar
+from .Tree import Tree
+
+
+class NodeGenerator:
+    """
+    Generates the node classes of the grammar (see `Nodes`). There's a class
+    per rule, e.g. `ServiceBlock` for `service_block`, with a `Field` for
+    each rule it refers to. The classes are slotted subclasses of Tree, s.t.
+    code that still uses the generic Tree interface keeps working.
+    """
+    # attributes of Tree instances
+    reserved = {'data', 'children'}
+    target = path.join(path.dirname(__file__), 'Nodes.py')
+
+    header = ('# -*- coding: utf-8 -*-\n'
+              '# Generated from the grammar by NodeGenerator, do not edit.\n'
+              '# Regenerate with `NodeGenerator.from_grammar().write()`.\n'
+              'from .Field import Field\n'
+              'from .Tree import Tree\n')
+
+    footer = ('\n\n'
+              'def node(data, children):\n'
+              '    """\n'
+              '    Creates the node of a rule, or a generic Tree for other '
+              'nodes.\n'
+              '    """\n'
+              '    return nodes.get(data, Tree)(data, children)\n')
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    @classmethod
+    def from_grammar(cls):
+        grammar = Grammar()
+        grammar.build()
+        return cls(grammar.ebnf.rule_definitions())
+
+    @staticmethod
+    def class_name(rule):
+        return ''.join(part.capitalize() for part in rule.split('_'))
+
+    def fields(self, rule):
+        """
+        Returns the rules a rule refers to, in order of appearance. Names
+        that would hide an attribute of Tree aren't fields.
+        """
+        fields = []
+        for name in re.findall(r'\b[a-z][a-z_]*\b', self.rules[rule]):
+            if name in self.rules and name not in fields and \
+                    name not in self.reserved and not hasattr(Tree, name):
+                fields.append(name)
+        return fields
+
+    @staticmethod
+    def field_tuple(fields):
+        """
+        Returns the lines of the `fields` attribute of a class.
+        """
+        items = ', '.join(f"'{field}'" for field in fields)
+        if len(fields) == 1:
+            items += ','
+        line = f'    fields = ({items})'
+        if len(line) <= 79:
+            return [line]
+        return ['    fields = (',
+                *(f'        {chunk}' for chunk in textwrap.wrap(items, 70)),
+                '    )']
+
+    def node_class(self, rule):
+        definition = textwrap.wrap(f'{rule}: {self.rules[rule]}', width=72)
+        lines = [
+            f'class {self.class_name(rule)}(Tree):',
+            '    """',
+            *(f'    {line}' for line in definition),
+            '    """',
+            '    __slots__ = ()',
+            *self.field_tuple(self.fields(rule)),
+        ]
+        for field in self.fields(rule):
+            lines.append(f"    {field} = Field('{field}')")
+        return '\n'.join(lines) + '\n'
+
+    def generate(self):
+        """
+        Returns the source of the node classes.
+        """
+        classes = [self.node_class(rule) for rule in sorted(self.rules)]
+        mapping = ''.join(f"    '{rule}': {self.class_name(rule)},\n"
+                          for rule in sorted(self.rules))
+        return '{}\n\n{}\n\nnodes = {{\n{}}}\n{}'.format(
+            self.header, '\n\n'.join(classes), mapping, self.footer)
+
+    def write(self, target=None):
+        if target is None:
+            target = self.target
+        with io.open(target, 'w', encoding='utf8') as f:
+            f.write(self.generate())
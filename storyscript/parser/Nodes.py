@@ -0,0 +1,972 @@
+# -*- coding: utf-8 -*-
+# Generated from the grammar by NodeGenerator, do not edit.
+# Regenerate with `NodeGenerator.from_grammar().write()`.
+from .Field import Field
+from .Tree import Tree
+
+
+class AbsoluteExpression(Tree):
+    """
+    absolute_expression: expression
+    """
+    __slots__ = ()
+    fields = ('expression',)
+    expression = Field('expression')
+
+
+class AndExpression(Tree):
+    """
+    and_expression: (and_expression AND)? cmp_expression
+    """
+    __slots__ = ()
+    fields = ('and_expression', 'cmp_expression')
+    and_expression = Field('and_expression')
+    cmp_expression = Field('cmp_expression')
+
+
+class Arguments(Tree):
+    """
+    arguments: NAME? _COLON expression
+    """
+    __slots__ = ()
+    fields = ('expression',)
+    expression = Field('expression')
+
+
+class ArithExpression(Tree):
+    """
+    arith_expression: (arith_expression arith_operator)? mul_expression
+    """
+    __slots__ = ()
+    fields = ('arith_expression', 'arith_operator', 'mul_expression')
+    arith_expression = Field('arith_expression')
+    arith_operator = Field('arith_operator')
+    mul_expression = Field('mul_expression')
+
+
+class ArithOperator(Tree):
+    """
+    arith_operator: PLUS| DASH
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class AsOperator(Tree):
+    """
+    as_operator: _AS (types | output_names)
+    """
+    __slots__ = ()
+    fields = ('types', 'output_names')
+    types = Field('types')
+    output_names = Field('output_names')
+
+
+class Assignment(Tree):
+    """
+    assignment: types? (path | assignment_destructoring )
+    assignment_fragment
+    """
+    __slots__ = ()
+    fields = (
+        'types', 'path', 'assignment_destructoring', 'assignment_fragment'
+    )
+    types = Field('types')
+    path = Field('path')
+    assignment_destructoring = Field('assignment_destructoring')
+    assignment_fragment = Field('assignment_fragment')
+
+
+class AssignmentDestructoring(Tree):
+    """
+    assignment_destructoring: _OCB (_NL _INDENT)? (path (_COMMA _NL?
+    path)*)? (_NL _DEDENT)? _CCB
+    """
+    __slots__ = ()
+    fields = ('path',)
+    path = Field('path')
+
+
+class AssignmentFragment(Tree):
+    """
+    assignment_fragment: EQUALS base_expression
+    """
+    __slots__ = ()
+    fields = ('base_expression',)
+    base_expression = Field('base_expression')
+
+
+class BaseExpression(Tree):
+    """
+    base_expression: (expression| inline_service| mutation)
+    """
+    __slots__ = ()
+    fields = ('expression', 'inline_service', 'mutation')
+    expression = Field('expression')
+    inline_service = Field('inline_service')
+    mutation = Field('mutation')
+
+
+class BaseType(Tree):
+    """
+    base_type: INT_TYPE| FLOAT_TYPE| STRING_TYPE| OBJECT_TYPE| REGEXP_TYPE|
+    FUNCTION_TYPE| ANY_TYPE| BOOLEAN_TYPE| TIME_TYPE
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class Block(Tree):
+    """
+    block: rules _NL| if_block| foreach_block| function_block| arguments|
+    indented_chain| chained_mutation| mutation_block| service_block|
+    when_block| try_block| indented_arguments| while_block
+    """
+    __slots__ = ()
+    fields = (
+        'rules', 'if_block', 'foreach_block', 'function_block', 'arguments',
+        'indented_chain', 'chained_mutation', 'mutation_block',
+        'service_block', 'when_block', 'try_block', 'indented_arguments',
+        'while_block'
+    )
+    rules = Field('rules')
+    if_block = Field('if_block')
+    foreach_block = Field('foreach_block')
+    function_block = Field('function_block')
+    arguments = Field('arguments')
+    indented_chain = Field('indented_chain')
+    chained_mutation = Field('chained_mutation')
+    mutation_block = Field('mutation_block')
+    service_block = Field('service_block')
+    when_block = Field('when_block')
+    try_block = Field('try_block')
+    indented_arguments = Field('indented_arguments')
+    while_block = Field('while_block')
+
+
+class Boolean(Tree):
+    """
+    boolean: TRUE| FALSE
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class BreakStatement(Tree):
+    """
+    break_statement: BREAK
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class CallExpression(Tree):
+    """
+    call_expression: path _OP arguments* _CP
+    """
+    __slots__ = ()
+    fields = ('path', 'arguments')
+    path = Field('path')
+    arguments = Field('arguments')
+
+
+class CatchBlock(Tree):
+    """
+    catch_block: catch_statement _NL nested_block
+    """
+    __slots__ = ()
+    fields = ('catch_statement', 'nested_block')
+    catch_statement = Field('catch_statement')
+    nested_block = Field('nested_block')
+
+
+class CatchStatement(Tree):
+    """
+    catch_statement: _CATCH _AS NAME
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class ChainedMutation(Tree):
+    """
+    chained_mutation: _THEN mutation_fragment
+    """
+    __slots__ = ()
+    fields = ('mutation_fragment',)
+    mutation_fragment = Field('mutation_fragment')
+
+
+class CmpExpression(Tree):
+    """
+    cmp_expression: (cmp_expression cmp_operator)? arith_expression
+    """
+    __slots__ = ()
+    fields = ('cmp_expression', 'cmp_operator', 'arith_expression')
+    cmp_expression = Field('cmp_expression')
+    cmp_operator = Field('cmp_operator')
+    arith_expression = Field('arith_expression')
+
+
+class CmpOperator(Tree):
+    """
+    cmp_operator: GREATER| GREATER_EQUAL| LESSER| LESSER_EQUAL| NOT_EQUAL|
+    EQUAL
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class Command(Tree):
+    """
+    command: NAME
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class ElseBlock(Tree):
+    """
+    else_block: else_statement _NL nested_block
+    """
+    __slots__ = ()
+    fields = ('else_statement', 'nested_block')
+    else_statement = Field('else_statement')
+    nested_block = Field('nested_block')
+
+
+class ElseStatement(Tree):
+    """
+    else_statement: _ELSE
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class ElseifBlock(Tree):
+    """
+    elseif_block: elseif_statement _NL nested_block
+    """
+    __slots__ = ()
+    fields = ('elseif_statement', 'nested_block')
+    elseif_statement = Field('elseif_statement')
+    nested_block = Field('nested_block')
+
+
+class ElseifStatement(Tree):
+    """
+    elseif_statement: _ELSE _IF base_expression
+    """
+    __slots__ = ()
+    fields = ('base_expression',)
+    base_expression = Field('base_expression')
+
+
+class Entity(Tree):
+    """
+    entity: values| path
+    """
+    __slots__ = ()
+    fields = ('values', 'path')
+    values = Field('values')
+    path = Field('path')
+
+
+class Expression(Tree):
+    """
+    expression: or_expression
+    """
+    __slots__ = ()
+    fields = ('or_expression',)
+    or_expression = Field('or_expression')
+
+
+class FinallyBlock(Tree):
+    """
+    finally_block: finally_statement _NL nested_block
+    """
+    __slots__ = ()
+    fields = ('finally_statement', 'nested_block')
+    finally_statement = Field('finally_statement')
+    nested_block = Field('nested_block')
+
+
+class FinallyStatement(Tree):
+    """
+    finally_statement: FINALLY
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class ForeachBlock(Tree):
+    """
+    foreach_block: foreach_statement _NL nested_block
+    """
+    __slots__ = ()
+    fields = ('foreach_statement', 'nested_block')
+    foreach_statement = Field('foreach_statement')
+    nested_block = Field('nested_block')
+
+
+class ForeachStatement(Tree):
+    """
+    foreach_statement: _FOREACH base_expression output?
+    """
+    __slots__ = ()
+    fields = ('base_expression', 'output')
+    base_expression = Field('base_expression')
+    output = Field('output')
+
+
+class FunctionBlock(Tree):
+    """
+    function_block: function_statement _NL (indented_typed_arguments? block+
+    _DEDENT | nested_block)
+    """
+    __slots__ = ()
+    fields = (
+        'function_statement', 'indented_typed_arguments', 'block',
+        'nested_block'
+    )
+    function_statement = Field('function_statement')
+    indented_typed_arguments = Field('indented_typed_arguments')
+    block = Field('block')
+    nested_block = Field('nested_block')
+
+
+class FunctionOutput(Tree):
+    """
+    function_output: _RETURNS types
+    """
+    __slots__ = ()
+    fields = ('types',)
+    types = Field('types')
+
+
+class FunctionStatement(Tree):
+    """
+    function_statement: FUNCTION_TYPE NAME typed_argument* function_output?
+    """
+    __slots__ = ()
+    fields = ('typed_argument', 'function_output')
+    typed_argument = Field('typed_argument')
+    function_output = Field('function_output')
+
+
+class IfBlock(Tree):
+    """
+    if_block: if_statement _NL nested_block elseif_block* else_block?
+    """
+    __slots__ = ()
+    fields = ('if_statement', 'nested_block', 'elseif_block', 'else_block')
+    if_statement = Field('if_statement')
+    nested_block = Field('nested_block')
+    elseif_block = Field('elseif_block')
+    else_block = Field('else_block')
+
+
+class IfStatement(Tree):
+    """
+    if_statement: _IF base_expression
+    """
+    __slots__ = ()
+    fields = ('base_expression',)
+    base_expression = Field('base_expression')
+
+
+class Imports(Tree):
+    """
+    imports: _IMPORT string _AS NAME
+    """
+    __slots__ = ()
+    fields = ('string',)
+    string = Field('string')
+
+
+class IndentedArguments(Tree):
+    """
+    indented_arguments: _INDENT (arguments _NL)+ _DEDENT
+    """
+    __slots__ = ()
+    fields = ('arguments',)
+    arguments = Field('arguments')
+
+
+class IndentedChain(Tree):
+    """
+    indented_chain: _INDENT (chained_mutation _NL)+ _DEDENT
+    """
+    __slots__ = ()
+    fields = ('chained_mutation',)
+    chained_mutation = Field('chained_mutation')
+
+
+class IndentedTypedArguments(Tree):
+    """
+    indented_typed_arguments: _INDENT (typed_argument+ _NL)+ _DEDENT
+    _DOUBLE_DEDENT
+    """
+    __slots__ = ()
+    fields = ('typed_argument',)
+    typed_argument = Field('typed_argument')
+
+
+class InlineExpression(Tree):
+    """
+    inline_expression: _OP inline_service _CP| call_expression| _OP mutation
+    _CP
+    """
+    __slots__ = ()
+    fields = ('inline_service', 'call_expression', 'mutation')
+    inline_service = Field('inline_service')
+    call_expression = Field('call_expression')
+    mutation = Field('mutation')
+
+
+class InlineService(Tree):
+    """
+    inline_service: path inline_service_fragment chained_mutation*
+    """
+    __slots__ = ()
+    fields = ('path', 'inline_service_fragment', 'chained_mutation')
+    path = Field('path')
+    inline_service_fragment = Field('inline_service_fragment')
+    chained_mutation = Field('chained_mutation')
+
+
+class InlineServiceFragment(Tree):
+    """
+    inline_service_fragment: (command arguments*|arguments+)
+    """
+    __slots__ = ()
+    fields = ('command', 'arguments')
+    command = Field('command')
+    arguments = Field('arguments')
+
+
+class KeyValue(Tree):
+    """
+    key_value: (string| path| number| boolean) _COLON base_expression
+    """
+    __slots__ = ()
+    fields = ('string', 'path', 'number', 'boolean', 'base_expression')
+    string = Field('string')
+    path = Field('path')
+    number = Field('number')
+    boolean = Field('boolean')
+    base_expression = Field('base_expression')
+
+
+class List(Tree):
+    """
+    list: _OSB (_NL _INDENT)? (base_expression (_COMMA _NL?
+    base_expression)*)? (_NL _DEDENT)? _CSB
+    """
+    __slots__ = ()
+    fields = ('base_expression',)
+    base_expression = Field('base_expression')
+
+
+class ListType(Tree):
+    """
+    list_type: _LIST_KEYWORD _OSB types _CSB
+    """
+    __slots__ = ()
+    fields = ('types',)
+    types = Field('types')
+
+
+class Map(Tree):
+    """
+    map: _OCB (_NL _INDENT)? (key_value (_COMMA _NL? key_value)*)? (_NL
+    _DEDENT)? _CCB
+    """
+    __slots__ = ()
+    fields = ('key_value',)
+    key_value = Field('key_value')
+
+
+class MapType(Tree):
+    """
+    map_type: _MAP_KEYWORD _OSB base_type _COMMA types _CSB
+    """
+    __slots__ = ()
+    fields = ('base_type', 'types')
+    base_type = Field('base_type')
+    types = Field('types')
+
+
+class MulExpression(Tree):
+    """
+    mul_expression: (mul_expression mul_operator)? unary_expression
+    """
+    __slots__ = ()
+    fields = ('mul_expression', 'mul_operator', 'unary_expression')
+    mul_expression = Field('mul_expression')
+    mul_operator = Field('mul_operator')
+    unary_expression = Field('unary_expression')
+
+
+class MulOperator(Tree):
+    """
+    mul_operator: MULTIPLIER| BSLASH| MODULUS
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class Mutation(Tree):
+    """
+    mutation: primary_expression (mutation_fragment (chained_mutation)*)
+    """
+    __slots__ = ()
+    fields = ('primary_expression', 'mutation_fragment', 'chained_mutation')
+    primary_expression = Field('primary_expression')
+    mutation_fragment = Field('mutation_fragment')
+    chained_mutation = Field('chained_mutation')
+
+
+class MutationBlock(Tree):
+    """
+    mutation_block: mutation _NL (nested_block)?
+    """
+    __slots__ = ()
+    fields = ('mutation', 'nested_block')
+    mutation = Field('mutation')
+    nested_block = Field('nested_block')
+
+
+class MutationFragment(Tree):
+    """
+    mutation_fragment: NAME arguments*
+    """
+    __slots__ = ()
+    fields = ('arguments',)
+    arguments = Field('arguments')
+
+
+class NestedBlock(Tree):
+    """
+    nested_block: _INDENT block+ _DEDENT
+    """
+    __slots__ = ()
+    fields = ('block',)
+    block = Field('block')
+
+
+class Number(Tree):
+    """
+    number: INT| FLOAT
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class OrExpression(Tree):
+    """
+    or_expression: (or_expression OR)? and_expression
+    """
+    __slots__ = ()
+    fields = ('or_expression', 'and_expression')
+    or_expression = Field('or_expression')
+    and_expression = Field('and_expression')
+
+
+class Output(Tree):
+    """
+    output: (_AS NAME (_COMMA NAME)*)
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class OutputNames(Tree):
+    """
+    output_names: NAME (_COMMA NAME)*
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class Path(Tree):
+    """
+    path: NAME (path_fragment)* | inline_expression (path_fragment)*
+    """
+    __slots__ = ()
+    fields = ('path_fragment', 'inline_expression')
+    path_fragment = Field('path_fragment')
+    inline_expression = Field('inline_expression')
+
+
+class PathFragment(Tree):
+    """
+    path_fragment: _DOT NAME| _OSB INT _CSB| _OSB string _CSB| _OSB path
+    _CSB| _OSB boolean _CSB
+    """
+    __slots__ = ()
+    fields = ('string', 'path', 'boolean')
+    string = Field('string')
+    path = Field('path')
+    boolean = Field('boolean')
+
+
+class PowExpression(Tree):
+    """
+    pow_expression: primary_expression ((pow_operator unary_expression) |
+    as_operator)?
+    """
+    __slots__ = ()
+    fields = (
+        'primary_expression', 'pow_operator', 'unary_expression',
+        'as_operator'
+    )
+    primary_expression = Field('primary_expression')
+    pow_operator = Field('pow_operator')
+    unary_expression = Field('unary_expression')
+    as_operator = Field('as_operator')
+
+
+class PowOperator(Tree):
+    """
+    pow_operator: POWER
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class PrimaryExpression(Tree):
+    """
+    primary_expression: entity | _OP or_expression _CP
+    """
+    __slots__ = ()
+    fields = ('entity', 'or_expression')
+    entity = Field('entity')
+    or_expression = Field('or_expression')
+
+
+class RegularExpression(Tree):
+    """
+    regular_expression: REGEXP
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class ReturnStatement(Tree):
+    """
+    return_statement: RETURN base_expression?
+    """
+    __slots__ = ()
+    fields = ('base_expression',)
+    base_expression = Field('base_expression')
+
+
+class Rules(Tree):
+    """
+    rules: absolute_expression| assignment| imports| return_statement|
+    throw_statement| break_statement| block
+    """
+    __slots__ = ()
+    fields = (
+        'absolute_expression', 'assignment', 'imports', 'return_statement',
+        'throw_statement', 'break_statement', 'block'
+    )
+    absolute_expression = Field('absolute_expression')
+    assignment = Field('assignment')
+    imports = Field('imports')
+    return_statement = Field('return_statement')
+    throw_statement = Field('throw_statement')
+    break_statement = Field('break_statement')
+    block = Field('block')
+
+
+class Service(Tree):
+    """
+    service: path service_fragment chained_mutation*
+    """
+    __slots__ = ()
+    fields = ('path', 'service_fragment', 'chained_mutation')
+    path = Field('path')
+    service_fragment = Field('service_fragment')
+    chained_mutation = Field('chained_mutation')
+
+
+class ServiceBlock(Tree):
+    """
+    service_block: service _NL (nested_block)?
+    """
+    __slots__ = ()
+    fields = ('service', 'nested_block')
+    service = Field('service')
+    nested_block = Field('nested_block')
+
+
+class ServiceFragment(Tree):
+    """
+    service_fragment: (command arguments*|arguments+) output?
+    """
+    __slots__ = ()
+    fields = ('command', 'arguments', 'output')
+    command = Field('command')
+    arguments = Field('arguments')
+    output = Field('output')
+
+
+class Start(Tree):
+    """
+    start: _NL? block*
+    """
+    __slots__ = ()
+    fields = ('block',)
+    block = Field('block')
+
+
+class String(Tree):
+    """
+    string: SINGLE_QUOTED| DOUBLE_QUOTED| SINGLE_QUOTED_HEREDOC|
+    DOUBLE_QUOTED_HEREDOC
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class ThrowStatement(Tree):
+    """
+    throw_statement: THROW entity?
+    """
+    __slots__ = ()
+    fields = ('entity',)
+    entity = Field('entity')
+
+
+class Time(Tree):
+    """
+    time: RAW_TIME
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class TryBlock(Tree):
+    """
+    try_block: try_statement _NL nested_block catch_block? finally_block?
+    """
+    __slots__ = ()
+    fields = ('try_statement', 'nested_block', 'catch_block', 'finally_block')
+    try_statement = Field('try_statement')
+    nested_block = Field('nested_block')
+    catch_block = Field('catch_block')
+    finally_block = Field('finally_block')
+
+
+class TryStatement(Tree):
+    """
+    try_statement: TRY
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class TypedArgument(Tree):
+    """
+    typed_argument: NAME _COLON types
+    """
+    __slots__ = ()
+    fields = ('types',)
+    types = Field('types')
+
+
+class Types(Tree):
+    """
+    types: list_type | map_type| base_type
+    """
+    __slots__ = ()
+    fields = ('list_type', 'map_type', 'base_type')
+    list_type = Field('list_type')
+    map_type = Field('map_type')
+    base_type = Field('base_type')
+
+
+class UnaryExpression(Tree):
+    """
+    unary_expression: unary_operator unary_expression | pow_expression
+    """
+    __slots__ = ()
+    fields = ('unary_operator', 'unary_expression', 'pow_expression')
+    unary_operator = Field('unary_operator')
+    unary_expression = Field('unary_expression')
+    pow_expression = Field('pow_expression')
+
+
+class UnaryOperator(Tree):
+    """
+    unary_operator: NOT
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class Values(Tree):
+    """
+    values: number| string| boolean| void| list| map| regular_expression|
+    time
+    """
+    __slots__ = ()
+    fields = (
+        'number', 'string', 'boolean', 'void', 'list', 'map',
+        'regular_expression', 'time'
+    )
+    number = Field('number')
+    string = Field('string')
+    boolean = Field('boolean')
+    void = Field('void')
+    list = Field('list')
+    map = Field('map')
+    regular_expression = Field('regular_expression')
+    time = Field('time')
+
+
+class Void(Tree):
+    """
+    void: NULL
+    """
+    __slots__ = ()
+    fields = ()
+
+
+class WhenBlock(Tree):
+    """
+    when_block: _WHEN (when_service | NAME output?) _NL nested_block
+    """
+    __slots__ = ()
+    fields = ('when_service', 'output', 'nested_block')
+    when_service = Field('when_service')
+    output = Field('output')
+    nested_block = Field('nested_block')
+
+
+class WhenService(Tree):
+    """
+    when_service: NAME path (service_fragment | output?)
+    """
+    __slots__ = ()
+    fields = ('path', 'service_fragment', 'output')
+    path = Field('path')
+    service_fragment = Field('service_fragment')
+    output = Field('output')
+
+
+class WhileBlock(Tree):
+    """
+    while_block: while_statement _NL nested_block
+    """
+    __slots__ = ()
+    fields = ('while_statement', 'nested_block')
+    while_statement = Field('while_statement')
+    nested_block = Field('nested_block')
+
+
+class WhileStatement(Tree):
+    """
+    while_statement: _WHILE base_expression
+    """
+    __slots__ = ()
+    fields = ('base_expression',)
+    base_expression = Field('base_expression')
+
+
+nodes = {
+    'absolute_expression': AbsoluteExpression,
+    'and_expression': AndExpression,
+    'arguments': Arguments,
+    'arith_expression': ArithExpression,
+    'arith_operator': ArithOperator,
+    'as_operator': AsOperator,
+    'assignment': Assignment,
+    'assignment_destructoring': AssignmentDestructoring,
+    'assignment_fragment': AssignmentFragment,
+    'base_expression': BaseExpression,
+    'base_type': BaseType,
+    'block': Block,
+    'boolean': Boolean,
+    'break_statement': BreakStatement,
+    'call_expression': CallExpression,
+    'catch_block': CatchBlock,
+    'catch_statement': CatchStatement,
+    'chained_mutation': ChainedMutation,
+    'cmp_expression': CmpExpression,
+    'cmp_operator': CmpOperator,
+    'command': Command,
+    'else_block': ElseBlock,
+    'else_statement': ElseStatement,
+    'elseif_block': ElseifBlock,
+    'elseif_statement': ElseifStatement,
+    'entity': Entity,
+    'expression': Expression,
+    'finally_block': FinallyBlock,
+    'finally_statement': FinallyStatement,
+    'foreach_block': ForeachBlock,
+    'foreach_statement': ForeachStatement,
+    'function_block': FunctionBlock,
+    'function_output': FunctionOutput,
+    'function_statement': FunctionStatement,
+    'if_block': IfBlock,
+    'if_statement': IfStatement,
+    'imports': Imports,
+    'indented_arguments': IndentedArguments,
+    'indented_chain': IndentedChain,
+    'indented_typed_arguments': IndentedTypedArguments,
+    'inline_expression': InlineExpression,
+    'inline_service': InlineService,
+    'inline_service_fragment': InlineServiceFragment,
+    'key_value': KeyValue,
+    'list': List,
+    'list_type': ListType,
+    'map': Map,
+    'map_type': MapType,
+    'mul_expression': MulExpression,
+    'mul_operator': MulOperator,
+    'mutation': Mutation,
+    'mutation_block': MutationBlock,
+    'mutation_fragment': MutationFragment,
+    'nested_block': NestedBlock,
+    'number': Number,
+    'or_expression': OrExpression,
+    'output': Output,
+    'output_names': OutputNames,
+    'path': Path,
+    'path_fragment': PathFragment,
+    'pow_expression': PowExpression,
+    'pow_operator': PowOperator,
+    'primary_expression': PrimaryExpression,
+    'regular_expression': RegularExpression,
+    'return_statement': ReturnStatement,
+    'rules': Rules,
+    'service': Service,
+    'service_block': ServiceBlock,
+    'service_fragment': ServiceFragment,
+    'start': Start,
+    'string': String,
+    'throw_statement': ThrowStatement,
+    'time': Time,
+    'try_block': TryBlock,
+    'try_statement': TryStatement,
+    'typed_argument': TypedArgument,
+    'types': Types,
+    'unary_expression': UnaryExpression,
+    'unary_operator': UnaryOperator,
+    'values': Values,
+    'void': Void,
+    'when_block': WhenBlock,
+    'when_service': WhenService,
+    'while_block': WhileBlock,
+    'while_statement': WhileStatement,
+}
+
+
+def node(data, children):
+    """
+    Creates the node of a rule, or a generic Tree for other nodes.
+    """
+    return nodes.get(data, Tree)(data, children)
@@ -7,6 +7,7 @@ from .Grammar import Grammar
 from .Indenter import CustomIndenter
 from .Transformer import Transformer
 from .Tree import Tree
+from ..Budget import Budget
 
 
 class Parser:
@@ -54,6 +55,7 @@ class Parser:
         source = '{}\n'.format(source)
         lark = self.lark
         tree = lark.parse(source)
+        Budget.check_tree(tree)
         result = self.transformer().transform(tree)
         result.parser = self
         return result
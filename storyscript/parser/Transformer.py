@@ -2,6 +2,7 @@
 from lark import Transformer as LarkTransformer
 from lark.lexer import Token
 
+from .Nodes import node
 from .Tree import Tree
 from ..exceptions import StorySyntaxError
 
@@ -10,8 +11,9 @@ class Transformer(LarkTransformer):
 
     """
     Performs transformations on the tree before it's parsed.
-    All trees are transformed to Storyscript's custom tree. In some cases,
-    additional transformations or checks are performed.
+    All trees are transformed to Storyscript's custom tree, using the node
+    class of their rule (see `Nodes`). In some cases, additional
+    transformations or checks are performed.
     """
     reserved_keywords = ['function', 'if', 'else', 'foreach', 'return',
                          'returns', 'try', 'catch', 'finally', 'when', 'as',
@@ -51,17 +53,17 @@ class Transformer(LarkTransformer):
         if isinstance(token, Tree):
             matches[0].expect(token.data != 'inline_expression',
                               'assignment_inline_expression')
-        return Tree('assignment', matches)
+        return node('assignment', matches)
 
     @classmethod
     def command(cls, matches):
         cls.is_keyword(matches[0])
-        return Tree('command', matches)
+        return node('command', matches)
 
     @classmethod
     def path(cls, matches):
         cls.is_keyword(matches[0])
-        return Tree('path', matches)
+        return node('path', matches)
 
     @classmethod
     def inline_service(cls, matches):
@@ -69,7 +71,7 @@ class Transformer(LarkTransformer):
         Transforms an inline service back into a normal service.
         """
         matches[1].data = 'service_fragment'
-        return Tree('service', matches)
+        return node('service', matches)
 
     @staticmethod
     def filter_nested_block(nested_block, nodes):
@@ -86,7 +88,7 @@ class Transformer(LarkTransformer):
         node.
         """
         if len(matches) == 1:
-            return Tree('service_block', matches)
+            return node('service_block', matches)
 
         if matches[1].block.rules:
             args = [*cls.filter_nested_block(
@@ -96,9 +98,9 @@ class Transformer(LarkTransformer):
             if len(args) > 0:
                 for arg in args:
                     matches[0].service_fragment.children.append(arg)
-                return Tree('service_block', [matches[0]])
+                return node('service_block', [matches[0]])
 
-        return Tree('service_block', matches)
+        return node('service_block', matches)
 
     @staticmethod
     def create_when_block(service_name, block, command=None, output=None,
@@ -114,11 +116,11 @@ class Transformer(LarkTransformer):
                 block=block
             )
 
-        service_fragment = Tree('service_fragment', [])
+        service_fragment = node('service_fragment', [])
         if command:
             assert isinstance(command, Token)
             assert command.type == 'NAME'
-            service_fragment.children.append(Tree('command', [command]))
+            service_fragment.children.append(node('command', [command]))
 
         if output:
             assert output.data == 'output'
@@ -134,11 +136,11 @@ class Transformer(LarkTransformer):
         """
         Creates a when_block tree node from its building blocks.
         """
-        service = Tree('service', [
-            Tree('path', [service_name]),
+        service = node('service', [
+            node('path', [service_name]),
             fragment,
         ])
-        return Tree('when_block', [service, block])
+        return node('when_block', [service, block])
 
     @classmethod
     def when_block(cls, matches):
@@ -192,7 +194,7 @@ class Transformer(LarkTransformer):
                 # the parser parsed the first argument as `:<or_expression>`
                 first_arg.children = [path_token, first_arg.last_child()]
             else:
-                command = Tree('command', [path_token])
+                command = node('command', [path_token])
                 when.service_fragment.children.insert(0, command)
             return cls.create_when_block(
                 service_name=name_token,
@@ -202,9 +204,9 @@ class Transformer(LarkTransformer):
         # concise when which needs to wrapped in a service block
         when.children.pop(0)
         when.data = 'service'
-        return Tree('concise_when_block', [
+        return node('concise_when_block', [
             name_token, path_token,
-            Tree('when_block', [when, nested_block]),
+            node('when_block', [when, nested_block]),
         ])
 
     @classmethod
@@ -220,10 +222,10 @@ class Transformer(LarkTransformer):
                 'entity', 'path'
             ])
             if path is not None:
-                service_fragment = Tree('service_fragment', [])
-                service = Tree('service', [path, service_fragment])
-                return Tree('service_block', [service])
-        return Tree('absolute_expression', matches)
+                service_fragment = node('service_fragment', [])
+                service = node('service', [path, service_fragment])
+                return node('service_block', [service])
+        return node('absolute_expression', matches)
 
     @classmethod
     def function_block(cls, matches):
@@ -235,9 +237,9 @@ class Transformer(LarkTransformer):
             if matches[1].data == 'indented_typed_arguments':
                 for argument in matches.pop(1).find_data('typed_argument'):
                     matches[0].children.append(argument)
-                matches[-1] = Tree('nested_block', [matches[-1]])
+                matches[-1] = node('nested_block', [matches[-1]])
 
-        return Tree('function_block', matches)
+        return node('function_block', matches)
 
     @staticmethod
     def multi_line_string(text):
@@ -278,7 +280,7 @@ class Transformer(LarkTransformer):
         else:
             text = matches[0].value[3:-3]
         matches[0].value = text
-        return Tree('string', matches)
+        return node('string', matches)
 
     @staticmethod
     def argument_shorthand(tree):
@@ -298,4 +300,4 @@ class Transformer(LarkTransformer):
                 tree.children = [path.child(0), tree.children[0]]
 
     def __getattr__(self, attribute, *args):
-        return lambda matches: Tree(attribute, matches)
+        return lambda matches: node(attribute, matches)
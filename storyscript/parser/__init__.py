@@ -1,10 +1,12 @@
 from .Ebnf import Ebnf
+from .Field import Field
 from .Grammar import Grammar
 from .Indenter import CustomIndenter
+from .NodeGenerator import NodeGenerator
 from .Parser import Parser
 from .Transformer import Transformer
 from .Tree import Tree
 
 
-__all__ = ['CustomIndenter', 'Ebnf', 'Grammar', 'Parser', 'Transformer',
-           'Tree']
+__all__ = ['CustomIndenter', 'Ebnf', 'Field', 'Grammar', 'NodeGenerator',
+           'Parser', 'Transformer', 'Tree']
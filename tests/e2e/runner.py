@@ -7,15 +7,19 @@ from os import path
 
 from click import unstyle
 
-from pytest import mark
+from pytest import mark, raises
 
 from storyscript.Api import Api
-from storyscript.App import _clean_dict
+from storyscript.App import App, _clean_dict
+from storyscript.exceptions import StoryError
 
 test_dir = path.dirname(path.realpath(__file__))
 # make the test_file paths relative, s.t. test paths are nice to read
 test_files = list(map(lambda e: path.relpath(e, test_dir),
                   glob(path.join(test_dir, '**', '*.story'), recursive=True)))
+error_files = [f for f in test_files
+               if path.isfile(path.join(test_dir, path.splitext(f)[0]) +
+                              '.error')]
 
 
 # compile a story and compare its tree with the expected tree
@@ -79,3 +83,16 @@ def run_test(story_path):
 def test_story(test_file):
     test_file = path.join(test_dir, test_file)
     run_test(test_file)
+
+
+@mark.parametrize('test_file', error_files)
+def test_check_story(test_file):
+    """
+    Ensures checking the semantics reports the errors of a compilation
+    """
+    test_file = path.join(test_dir, test_file)
+    with raises(StoryError) as compiled:
+        App.compile(test_file)
+    with raises(StoryError) as checked:
+        App.check(test_file, stage='semantics')
+    assert checked.value.message() == compiled.value.message()
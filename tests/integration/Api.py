@@ -1,10 +1,21 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import io
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from glob import glob
+from os import path
 from unittest.mock import patch
 
+from click import unstyle
+
 from pytest import raises
 
 from storyscript.Api import Api
+from storyscript.Budget import Budget
 from storyscript.Bundle import Bundle
+from storyscript.Profile import Profile
 from storyscript.Story import Story
 from storyscript.exceptions import StoryError
 
@@ -100,3 +111,267 @@ def test_compiler_only_comments():
     result = api_result['stories']['a.story']
     assert result['tree'] == {}
     assert result['entrypoint'] is None
+
+
+def test_api_session_matches_api():
+    """
+    Ensures sessions compile stories exactly like the stateless functions
+    """
+    session = Api.session()
+    for source in ['a = 1 + 2', 'a = [1, 2]\nb = a.length()', 'foo =']:
+        expected = Api.loads(source)
+        for i in range(2):
+            result = session.loads(source)
+            assert result.result() == expected.result()
+            assert [e.short_message() for e in result.errors()] == \
+                [e.short_message() for e in expected.errors()]
+    files = {'a.story': "import 'b' as b\nx = 0", 'b.story': 'y = 1'}
+    assert session.load_map(files).result() == \
+        Api.load_map(dict(files)).result()
+
+
+def compile_e2e_story(path, api=Api):
+    with io.open(path, 'r') as f:
+        result = api.loads(f.read())
+    if result.result() is None:
+        return [unstyle(e.message()) for e in result.errors()]
+    return result.result()
+
+
+def test_api_loads_threads():
+    """
+    Ensures compiling the e2e stories from 16 threads, with and without a
+    shared session, gives the same output as compiling them sequentially
+    """
+    e2e_dir = path.join(path.dirname(path.dirname(__file__)), 'e2e')
+    stories = sorted(glob(path.join(e2e_dir, '**', '*.story'),
+                          recursive=True))
+    expected = [compile_e2e_story(story) for story in stories]
+    session = Api.session()
+
+    def compile(story):
+        return compile_e2e_story(story), compile_e2e_story(story, session)
+
+    # switch threads often, s.t. compilations interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(compile, stories))
+    finally:
+        sys.setswitchinterval(interval)
+    for story, result, sequential in zip(stories, results, expected):
+        assert result == (sequential, sequential), story
+
+
+def test_api_loads_errors_pickle():
+    """
+    Ensures the errors of the e2e stories survive pickling, e.g. when they
+    are sent from a worker process
+    """
+    e2e_dir = path.join(path.dirname(path.dirname(__file__)), 'e2e')
+    for story in glob(path.join(e2e_dir, '**', '*.story'), recursive=True):
+        with io.open(story, 'r') as f:
+            result = Api.loads(f.read())
+        copy = pickle.loads(pickle.dumps(result))
+        assert [e.message() for e in copy.errors()] == \
+            [e.message() for e in result.errors()], story
+        assert copy.result() == result.result()
+
+
+def test_api_load_unnamed():
+    """
+    Ensures streams without a name compile like in a session
+    """
+    result = Api.load(io.StringIO('a = 1'))
+    assert result.success()
+    assert result.result() == \
+        Api.session().load(io.StringIO('a = 1')).result()
+    assert list(result.result()) == ['<stream>', 'services']
+    loop = asyncio.new_event_loop()
+    coroutine = Api.aload(io.StringIO('a = 1'))
+    assert loop.run_until_complete(coroutine).result() == result.result()
+    loop.close()
+
+
+def test_api_aloads_process_pool():
+    loop = asyncio.new_event_loop()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for source in ['a = 1 + 2', 'foo =']:
+            coroutine = Api.aloads(source, executor=executor, timeout=30)
+            result = loop.run_until_complete(coroutine)
+            expected = Api.loads(source)
+            assert result.result() == expected.result()
+            assert [e.message() for e in result.errors()] == \
+                [e.message() for e in expected.errors()]
+        files = {'a.story': 'x = 0'}
+        coroutine = Api.aload_map(files, executor=executor)
+        assert loop.run_until_complete(coroutine).result() == \
+            Api.load_map(files).result()
+    loop.close()
+
+
+def test_api_loads_many():
+    """
+    Ensures every story of a batch gets its own result, even if some fail
+    """
+    sources = ['a = 1', 'foo =', 'b = [1, 2]', 'c = d']
+    expected = [Api.loads(source) for source in sources]
+    for jobs in [1, 2]:
+        results = list(Api.loads_many(iter(sources), jobs=jobs))
+        assert [r.result() for r in results] == [r.result() for r in expected]
+        assert [[e.message() for e in r.errors()] for r in results] == \
+            [[e.message() for e in r.errors()] for r in expected]
+        results = dict(Api.loads_many(sources, jobs=jobs, ordered=False))
+        assert [results[i].result() for i in range(len(sources))] == \
+            [r.result() for r in expected]
+
+
+def test_api_loads_budget_depth():
+    """
+    Ensures deeply nested stories are rejected before they exhaust the stack
+    """
+    story = 'a = {}{}'.format('[' * 1000, ']' * 1000)
+    e = Api.loads(story, budget=Budget(depth=100)).errors()[0]
+    assert e.short_message() == ('E0127: Compilation stopped: the story '
+                                 'exceeds the nesting depth limit of 100')
+
+
+def test_api_loads_budget_depth_nesting():
+    """
+    Ensures the depth counts nesting levels, not levels of the parse tree
+    """
+    assert Api.loads('a = 1', budget=Budget(depth=0)).success()
+    story = 'if true\n    a = [(1 + 2)]'
+    assert Api.loads(story, budget=Budget(depth=3)).success()
+    e = Api.loads(story, budget=Budget(depth=2)).errors()[0]
+    assert e.short_message() == ('E0127: Compilation stopped: the story '
+                                 'exceeds the nesting depth limit of 2')
+
+
+def test_api_loads_budget_nodes():
+    story = 'a = [{}]'.format(', '.join(['1'] * 1000))
+    assert Api.loads(story, budget=Budget(nodes=100000)).success()
+    e = Api.loads(story, budget=Budget(nodes=1000)).errors()[0]
+    assert e.short_message() == ('E0127: Compilation stopped: the story '
+                                 'exceeds the limit of 1000 nodes')
+
+
+def test_api_loads_budget_fake_lines():
+    story = 'y = 2\n' + '\n'.join(f'a{i} = "{{y + 1}}"' for i in range(50))
+    assert Api.loads(story, budget=Budget(fake_lines=50)).success()
+    e = Api.loads(story, budget=Budget(fake_lines=49)).errors()[0]
+    assert e.short_message() == ('E0127: Compilation stopped: the story '
+                                 'exceeds the limit of 49 generated lines')
+
+
+def test_api_loads_budget_time():
+    story = 'y = 2\n' + '\n'.join(f'a{i} = "{{y + 1}}"' for i in range(500))
+    e = Api.loads(story, budget=Budget(time=0)).errors()[0]
+    assert e.short_message() == ('E0127: Compilation stopped: the story '
+                                 'exceeds the time limit of 0 seconds')
+
+
+def test_api_load_map_budget():
+    """
+    Ensures the stories of a bundle share their budget
+    """
+    files = {'a.story': 'y = 2\na = "{y + 1}"',
+             'b.story': 'y = 2\nb = "{y + 1}"'}
+    assert Api.load_map(files, budget=Budget(fake_lines=2)).success()
+    result = Api.load_map(files, budget=Budget(fake_lines=1))
+    assert result.errors()[0].error.error == 'budget_exceeded'
+
+
+def test_api_loads_stop_after():
+    """
+    Ensures checking a story up to a stage reports only the errors of the
+    stages that were run, exactly like a full compilation
+    """
+    assert Api.loads('a = b', stop_after='lower').success()
+    for stage in ['parse', 'lower', 'semantics', None]:
+        e = Api.loads('a = 1 +', stop_after=stage).errors()[0]
+        assert e.message() == Api.loads('a = 1 +').errors()[0].message()
+    e = Api.loads('a = b', stop_after='semantics').errors()[0]
+    assert e.message() == Api.loads('a = b').errors()[0].message()
+
+
+def test_api_load_map_stop_after():
+    files = {'a.story': "import 'b' as b\nx = b.y", 'b.story': 'y = 0'}
+    result = Api.load_map(files, stop_after='parse').result()
+    assert sorted(result['stories']) == ['a.story', 'b.story']
+    assert result['stories']['b.story'].data == 'start'
+
+
+def test_api_session_catalogues(tmpdir):
+    """
+    Ensures sessions can use the mutations of additional catalogues
+    """
+    catalogue = tmpdir.join('engine.mutations')
+    catalogue.write('string shout -> string\n')
+    assert Api.loads('a = "x" shout').success() is False
+    session = Api.session(catalogues=[str(catalogue)])
+    result = session.loads('a = "x" shout').result()
+    args = result['tree']['1']['args']
+    assert args[1]['mutation'] == 'shout'
+
+
+def test_api_load_map_profile():
+    """
+    Ensures profiles measure every story of a bundle once
+    """
+    files = {'a.story': "import 'b' as b\ny = 1\nx = \"{y} {y + 1}\"",
+             'b.story': 'y = 0'}
+    profile = Profile()
+    assert Api.load_map(files, profile=profile).success()
+    assert sorted(profile.stories) == ['a.story', 'b.story']
+    a = profile.stories['a.story']
+    assert a['template_parses'] == 2
+    # a path in a template doesn't need a fake line
+    assert a['fake_lines'] == 1
+    assert a['nodes'] > 0 and a['lowered_nodes'] > 0
+    assert a['peak_memory'] > 0
+    for phase in ['parse', 'lower', 'semantics', 'json']:
+        assert a[phase] > 0
+    assert profile.stories['b.story']['template_parses'] == 0
+    assert Profile.current() is None
+
+
+def test_api_loads_profile():
+    profile = Profile(memory=False)
+    assert Api.loads('a = 1 + 2', profile=profile).success()
+    assert list(profile.stories) == ['<string>']
+    assert profile.stories['<string>']['peak_memory'] == 0
+
+
+def test_api_loads_metrics():
+    """
+    Ensures every compilation has metrics
+    """
+    metrics = Api.loads('a = 1 + 2\nalpine echo\n').metrics()
+    assert metrics['source_size'] == 22
+    assert metrics['nodes'] > metrics['lowered_nodes'] > 0
+    assert metrics['output_lines'] == 2
+    assert metrics['services'] == 1
+    assert metrics['cache_hits'] is None
+    assert all(metrics['phases'][phase] > 0
+               for phase in ['parse', 'lower', 'semantics', 'json'])
+
+
+def test_api_load_map_metrics():
+    files = {'a.story': "import 'b' as b\nx = 0",
+             'b.story': 'function f\n    return'}
+    metrics = Api.load_map(files).metrics()
+    assert metrics['stories'] == 2
+    assert metrics['functions'] == 1
+
+
+def test_api_loads_metrics_profile():
+    """
+    Ensures the metrics only count the compilation of a result, even with a
+    profile that measured other compilations
+    """
+    profile = Profile(memory=False)
+    first = Api.loads('a = 1', profile=profile).metrics()
+    second = Api.loads('a = 1', profile=profile).metrics()
+    assert first['nodes'] == second['nodes']
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+from pytest import fixture
+
+from storyscript.Batch import Batch, start_pool
+
+
+def compile(source, debug):
+    """
+    Compiles a fake story, killing the worker on `crash`
+    """
+    if source == 'crash':
+        os._exit(1)
+    return source
+
+
+def crashed(result):
+    errors = result.errors()
+    return len(errors) == 1 and isinstance(errors[0].error, BrokenProcessPool)
+
+
+@fixture
+def batch():
+    batch = Batch(start_pool(2), 4, factory=lambda: start_pool(2))
+    yield batch
+    batch.executor.shutdown()
+
+
+def test_batch_worker_crash(batch):
+    """
+    Ensures a dying worker only fails its own story
+    """
+    sources = ['a', 'b', 'crash', 'c', 'd', 'e', 'f']
+    results = list(batch.run(compile, sources))
+    assert results[:2] == ['a', 'b']
+    assert crashed(results[2])
+    assert results[3:] == ['c', 'd', 'e', 'f']
+
+
+def test_batch_worker_crash_completed(batch):
+    sources = ['a', 'crash', 'b', 'c', 'crash', 'd']
+    results = dict(batch.run(compile, sources, ordered=False))
+    assert sorted(results) == [0, 1, 2, 3, 4, 5]
+    assert crashed(results[1])
+    assert crashed(results[4])
+    assert [results[index] for index in (0, 2, 3, 5)] == ['a', 'b', 'c', 'd']
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import tarfile
+
+from pytest import fixture
+
+from storyscript.Bundle import Bundle
+
+
+@fixture
+def stories(tmpdir, monkeypatch):
+    tmpdir.join('a.story').write("import 'lib/b' as b\nx = 0")
+    tmpdir.join('c.story').write("import 'lib/b' as b\nz = 1")
+    tmpdir.join('experiment.story').write('e = 0')
+    tmpdir.mkdir('lib').join('b.story').write("import 'lib/d' as d\ny = 1")
+    tmpdir.join('lib', 'd.story').write('w = 2')
+    monkeypatch.chdir(tmpdir)
+
+
+def test_bundle_from_entries(stories):
+    """
+    Ensures only the entrypoints and their imports are compiled
+    """
+    result = Bundle.from_entries(['./a.story']).bundle()
+    assert result['entrypoint'] == ['a.story']
+    assert sorted(result['stories']) == ['a.story', 'lib/b.story',
+                                         'lib/d.story']
+
+
+def test_bundle_from_entries_matches_from_path(stories):
+    """
+    Ensures the stories compiled from entrypoints are the same as when the
+    entire directory is compiled.
+    """
+    entries = Bundle.from_entries(['a.story', 'c.story']).bundle()
+    everything = Bundle.from_path('.').bundle()
+    assert sorted(entries['entrypoint']) == ['a.story', 'c.story']
+    assert 'experiment.story' not in entries['stories']
+    for path, story in entries['stories'].items():
+        assert story == everything['stories'][path]
+
+
+def test_bundle_from_path_archive(stories, tmpdir):
+    """
+    Ensures an archive compiles to the same bundle as its directory
+    """
+    path = str(tmpdir.join('release.tar.gz'))
+    with tarfile.open(path, 'w:gz') as archive:
+        for name in ['a.story', 'c.story', 'experiment.story', 'lib']:
+            archive.add(name)
+    result = Bundle.from_path(path).bundle()
+    everything = Bundle.from_path('.').bundle()
+    assert result == everything
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import io
+import json
+import sys
 from unittest import mock
 
 from click.testing import CliRunner
@@ -112,21 +114,15 @@ start
             and_expression
               cmp_expression
                 arith_expression
-                  arith_expression
-                    mul_expression
-                      unary_expression
-                        pow_expression
-                          primary_expression
-                            entity
-                              values
-                                string	.
-                  arith_operator	+
                   mul_expression
                     unary_expression
                       pow_expression
                         primary_expression
                           entity
-                            path	a
+                            values
+                              string_template
+                                string	.
+                                path	a
 
 """
     assert e.exit_code == 0
@@ -143,3 +139,40 @@ def test_cli_lex(mocker, runner):
 0 NAME foo
 """
     assert e.exit_code == 0
+
+
+def test_cli_check_stage(runner, tmpdir):
+    """
+    Ensures the check command only runs the requested stages
+    """
+    tmpdir.join('a.story').write('a = b')
+    with tmpdir.as_cwd():
+        e = runner.invoke(Cli.check, ['a.story', '--stage', 'lower'])
+        assert e.exit_code == 0
+        assert e.output == 'Script syntax passed!\n'
+        e = runner.invoke(Cli.check, ['a.story', '--stage', 'semantics'])
+        assert e.exit_code == 1
+        assert 'E0101: Variable `b` has not been defined.' in e.output
+        assert e.output == runner.invoke(Cli.compile, ['a.story']).output
+
+
+def test_cli_bench(runner, tmpdir):
+    """
+    Ensures the bench command times every phase of the given stories
+    """
+    tmpdir.join('a.story').write('a = 1 + 2')
+    tmpdir.join('error.story').write('a = ')
+    output = str(tmpdir.join('results.json'))
+    e = runner.invoke(Cli.bench, [str(tmpdir), '--repeat', '1', '--size',
+                                  '5', '-o', output])
+    assert e.exit_code == 0
+    with io.open(output, 'r') as f:
+        report = json.load(f)
+    corpus = report['suites']['corpus']
+    assert corpus['stories'] == 1
+    assert corpus['failed'] == ['error.story']
+    assert set(corpus['results']['a.story']) == {
+        'lex', 'parse', 'transform', 'lower', 'semantics', 'json', 'lines'}
+    assert report['suites']['synthetic']['failed'] == []
+    if sys.version_info >= (3, 7):
+        assert set(report['imports']) == {'package', 'cli', 'compiler'}
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import sys
+
+from pytest import mark
+
+from storyscript.Benchmark import Benchmark
+
+
+pytestmark = mark.skipif(sys.version_info < (3, 7),
+                         reason='-X importtime needs Python 3.7')
+
+# modules which only the compiler needs
+heavy = ['lark', 'pkg_resources', 'asyncio', 'concurrent.futures',
+         'storyscript.Story', 'storyscript.compiler']
+
+
+def importtime(statement):
+    """
+    Returns the cumulative import time of the modules a statement imports
+    in a fresh interpreter, in microseconds.
+    """
+    return {module: cumulative for module, cumulative, depth
+            in Benchmark.importtime(statement)}
+
+
+@mark.parametrize('statement', ['import storyscript',
+                                'import storyscript.Cli'])
+def test_importtime_lazy(statement):
+    """
+    Ensures the package and the command line don't import the compiler
+    """
+    times = importtime(statement)
+    for module in heavy:
+        assert module not in times
+
+
+def test_importtime_loads():
+    times = importtime('import storyscript; storyscript.loads')
+    assert 'storyscript.Api' in times
+    assert 'pkg_resources' not in times
+    assert 'asyncio' not in times
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import sys
+
+from pytest import mark
+
+from storyscript.Api import Api
+from storyscript.StoryGenerator import StoryGenerator
+from storyscript.compiler import Compiler
+
+
+# growth of the input between the two runs of a shape
+factor = 4
+
+
+def calls(compile):
+    """
+    Counts the function calls of each pass of a compilation, which grow
+    like its time but don't depend on the load of the machine. Calls
+    outside the passes are counted as parsing.
+    """
+    counts = {}
+    current = ['parse']
+
+    def before(name, story, tree):
+        current[0] = name
+
+    def after(name, story, tree, elapsed):
+        current[0] = 'parse'
+
+    def count(frame, event, arg):
+        if event == 'call':
+            counts[current[0]] = counts.get(current[0], 0) + 1
+
+    Compiler.passes.add_hook(before=before, after=after)
+    sys.setprofile(count)
+    try:
+        compile()
+    finally:
+        sys.setprofile(None)
+        Compiler.passes.remove_hook(before=before, after=after)
+    return counts
+
+
+@mark.parametrize('shape, size', [
+    ('lines', 100),
+    ('templates', 60),
+    ('ladder', 60),
+    ('list_literal', 500),
+    ('nesting', 8),
+    ('inline', 200),
+])
+def test_scaling_phases(shape, size):
+    """
+    Ensures every pass grows about linearly with the size of a story,
+    catching quadratic regressions: a linear pass grows by `factor`, a
+    quadratic one by `factor ** 2`.
+    """
+    generate = getattr(StoryGenerator(), shape)
+    # the first compilation builds the parser
+    Api.loads(generate(size))
+    small = calls(lambda: Api.loads(generate(size)))
+    large = calls(lambda: Api.loads(generate(size * factor)))
+    for name, count in large.items():
+        assert count / small[name] < factor * 2, name
+
+
+@mark.parametrize('shape, size', [
+    ('lines', 200),
+    ('nesting', 30),
+    ('ladder', 200),
+    ('list_literal', 2000),
+    ('templates', 200),
+    ('inline', 200),
+])
+def test_scaling_shapes_compile(shape, size):
+    """
+    Ensures the generated stories compile
+    """
+    story = getattr(StoryGenerator(), shape)(size)
+    assert Api.loads(story).errors() == []
+
+
+def test_scaling_bundle():
+    """
+    Ensures compiling a bundle grows about linearly with its stories, even
+    if they import each other a lot
+    """
+    counts = []
+    for count in (25, 25 * factor):
+        files = StoryGenerator().bundle(count, fan_in=10)
+        results = []
+        counts.append(calls(lambda: results.append(Api.load_map(files))))
+        assert results[0].errors() == []
+        assert len(results[0].result()['stories']) == count
+    for name, count in counts[1].items():
+        assert count / counts[0][name] < factor * 2, name
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import socket
+import stat
+import threading
+
+from pytest import fixture, raises
+
+from storyscript.App import App
+from storyscript.Client import Client, RemoteError
+from storyscript.Server import Server
+from storyscript.exceptions import StoryError
+from storyscript.parser import Parser
+
+
+@fixture
+def server(tmpdir):
+    path = str(tmpdir.join('storyscript.sock'))
+    unix_server = Server().unix_server(path)
+    thread = threading.Thread(target=unix_server.serve_forever)
+    thread.start()
+    yield path
+    unix_server.shutdown()
+    unix_server.server_close()
+    thread.join()
+
+
+@fixture
+def stories(tmpdir, monkeypatch):
+    tmpdir.join('a.story').write("import 'b' as b\nx = 0")
+    tmpdir.join('b.story').write('y = 1')
+    monkeypatch.chdir(tmpdir)
+
+
+def test_server_compile(server, stories):
+    """
+    Ensures stories compiled by the server match the ones compiled locally
+    """
+    client = Client.connect(server)
+    assert client.call('compile', path='.') == App.compile('.')
+    assert client.call('check', path='a.story') is True
+    client.close()
+
+
+def test_server_socket_private(server):
+    assert stat.S_IMODE(os.stat(server).st_mode) == 0o600
+    assert Client.trusted(server)
+
+
+def test_server_socket_running(server):
+    """
+    Ensures a second server doesn't replace the socket of a running one
+    """
+    with raises(StoryError) as e:
+        Server().unix_server(server)
+    assert e.value.error.error == 'socket_in_use'
+    client = Client.connect(server)
+    assert client.call('version') == Server.version()
+    client.close()
+
+
+def test_server_socket_stale(tmpdir):
+    """
+    Ensures the socket of a stopped server is replaced
+    """
+    path = str(tmpdir.join('storyscript.sock'))
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    unix_server = Server().unix_server(path)
+    assert Server.listening(path)
+    unix_server.server_close()
+
+
+def test_server_socket_file(tmpdir):
+    """
+    Ensures files which aren't sockets are never removed
+    """
+    path = tmpdir.join('storyscript.sock')
+    path.write('data')
+    with raises(StoryError):
+        Server().unix_server(str(path))
+    assert path.read() == 'data'
+
+
+def test_server_socket_untrusted(server):
+    """
+    Ensures clients don't use sockets that other users can access
+    """
+    os.chmod(server, 0o666)
+    assert Client.connect(server) is None
+
+
+def test_server_lex(server, stories):
+    client = Client.connect(server)
+    tokens = client.call('lex', path='b.story')['b.story']
+    assert tokens[0] == ['NAME', 'y']
+    client.close()
+
+
+def test_server_error(server, stories, tmpdir):
+    tmpdir.join('c.story').write('x = ')
+    client = Client.connect(server)
+    with raises(RemoteError) as e:
+        client.call('compile', path='c.story')
+    assert 'E0' in e.value.message()
+    client.close()
+
+
+def test_server_parser(server, stories, monkeypatch):
+    """
+    Ensures connections share the parser of the server
+    """
+    parsers = []
+
+    class Recorded(Parser):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            parsers.append(self)
+
+    monkeypatch.setattr('storyscript.Story.Parser', Recorded)
+    for i in range(2):
+        client = Client.connect(server)
+        assert client.call('check', path='.') is True
+        client.close()
+    assert len(parsers) == 1
+
+
+def test_server_concurrent_clients(server, stories):
+    """
+    Ensures several clients can be served at once
+    """
+    first = Client.connect(server)
+    second = Client.connect(server)
+    result = json.loads(second.call('compile', path='.'))
+    assert sorted(result['stories']) == ['a.story', 'b.story']
+    assert first.call('check', path='.') is True
+    first.close()
+    second.close()
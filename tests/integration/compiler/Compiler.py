@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
+from lark.lexer import Token
+
 from pytest import mark
 
 from storyscript.Api import Api
+from storyscript.compiler import Compiler, Pass
 
 
 @mark.parametrize('source', [
@@ -103,3 +106,104 @@ def test_compiler_expression_whitespace(source_pair):
         args = result['tree'][index]['args'][0]['values'][0]
         assert args['expression'] == expression[1]
         assert args['values'] == values
+
+
+def test_compiler_compacted_expression():
+    """
+    Ensures that lowered expressions are compacted
+    """
+    tree = Api.loads('a = (1 + b) * 2 as int', stop_after='lower').result()
+    expression = tree.find('expression')[0]
+    mul = expression.child(0)
+    assert mul.data == 'operation'
+    assert mul.child(1).type == 'MULTIPLIER'
+    assert mul.child(0).data == 'operation'
+    assert [c.data for c in mul.child(0).children[::2]] == ['entity',
+                                                            'entity']
+    assert mul.child(2).data == 'cast_expression'
+    assert tree.find('or_expression') == []
+
+
+def test_compiler_pass_hooks():
+    """
+    Ensures hooks observe every pass of a compilation
+    """
+    calls = []
+
+    def before(name, story, tree):
+        calls.append(('before', name, story.story))
+
+    def after(name, story, tree, elapsed):
+        assert elapsed >= 0
+        calls.append(('after', name, story.story))
+
+    Compiler.passes.add_hook(before=before, after=after)
+    try:
+        assert Api.loads('a = 1', stop_after='semantics').success()
+    finally:
+        Compiler.passes.remove_hook(before=before, after=after)
+    names = Compiler.passes.names()[:-1]
+    assert calls[::2] == [('before', name, 'a = 1') for name in names]
+    assert calls[1::2] == [('after', name, 'a = 1') for name in names]
+
+
+def test_compiler_pass_custom():
+    """
+    Ensures registered passes take part in compilations
+    """
+    def fold(tree, story, **options):
+        for number in tree.find_data('number'):
+            token = number.children[0]
+            number.children[0] = Token(token.type, '2', line=token.line,
+                                       column=token.column)
+        return tree
+
+    Compiler.passes.register(Pass('fold', 'lower', fold), after='compact')
+    try:
+        result = Api.loads('a = 1').result()
+    finally:
+        Compiler.passes.unregister('fold')
+    assert result['tree']['1']['args'] == [{'$OBJECT': 'int', 'int': 2}]
+
+
+def deduplicated(source):
+    """
+    Compiles a story with the common subexpression elimination
+    """
+    deduplicate = Pass('deduplicate', 'semantics', Compiler.deduplicate)
+    Compiler.passes.register(deduplicate, after='semantics')
+    try:
+        return Api.loads(source).result()
+    finally:
+        Compiler.passes.unregister('deduplicate')
+
+
+def test_compiler_deduplicate():
+    source = ('l = [1]\n'
+              'if (l length) > 0\n'
+              '    x = (l length) + (l length)\n'
+              '    y = "{l length}"\n')
+    tree = deduplicated(source)['tree']
+    assert list(tree) == ['1', '2.1', '2', '3', '4']
+    assert tree['3']['args'][0]['values'] == [path('__p-2.1'),
+                                              path('__p-2.1')]
+    assert tree['4']['args'] == [path('__p-2.1')]
+
+
+def test_compiler_deduplicate_services():
+    """
+    Ensures service calls are never merged
+    """
+    tree = deduplicated('x = (alpine echo) + (alpine echo)')['tree']
+    assert list(tree) == ['1.1', '1.2', '1']
+
+
+def test_compiler_deduplicate_assigned():
+    """
+    Ensures mutations aren't merged once their variable is assigned again
+    """
+    source = ('l = [1]\n'
+              'x = (l length)\n'
+              'l = [1, 2]\n'
+              'y = (l length)\n')
+    assert deduplicated(source) == Api.loads(source).result()
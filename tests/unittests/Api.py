@@ -1,12 +1,90 @@
 # -*- coding: utf-8 -*-
-from pytest import raises
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+from pytest import fixture, raises
+
+import storyscript.Batch as BatchModule
 from storyscript.Api import Api
+from storyscript.Batch import Batch
+from storyscript.Budget import Budget
 from storyscript.Bundle import Bundle
+from storyscript.CompilationResult import StoryscriptCompilationResult
+from storyscript.CompilerSession import CompilerSession
+from storyscript.Profile import Profile
 from storyscript.Story import Story
 from storyscript.exceptions import StoryError
 
 
+@fixture
+def bundle(patch):
+    """
+    Patches the bundles of Api.load_map
+    """
+    patch.init(Bundle)
+    patch.object(Bundle, 'bundle')
+    patch.object(Bundle, 'story_files', {}, create=True)
+
+
+def test_api_profile():
+    profile, baseline = Api.profile(None)
+    assert isinstance(profile, Profile)
+    assert profile.memory is False
+    assert baseline == profile.totals()
+
+
+def test_api_profile_given(patch):
+    profile = Profile()
+    patch.object(Profile, 'totals')
+    assert Api.profile(profile) == (profile, Profile.totals())
+
+
+def test_api_loads_metrics(patch, magic):
+    patch.init(Story)
+    patch.object(Story, 'process')
+    patch.object(Profile, 'metrics')
+    patch.object(Api, 'profile', return_value=(Profile(), 'baseline'))
+    result = Api.loads('string')
+    Profile.metrics.assert_called_with(['string'],
+                                       {'<string>': Story.process()},
+                                       baseline='baseline')
+    assert result.metrics() == Profile.metrics()
+
+
+def test_api_loads_metrics_error(patch):
+    patch.init(Story)
+    patch.object(Story, 'process', side_effect=StoryError(None, None))
+    patch.object(Profile, 'metrics')
+    result = Api.loads('string')
+    assert Profile.metrics.call_args[0][1] == {'<string>': None}
+    assert result.metrics() == Profile.metrics()
+
+
+def test_api_load_metrics(patch, magic):
+    patch.object(Story, 'from_stream')
+    patch.object(Profile, 'metrics')
+    stream = magic()
+    result = Api.load(stream)
+    story = Story.from_stream().process()
+    Profile.metrics.assert_called_with([Story.from_stream().story],
+                                       {stream.name: story},
+                                       baseline=Profile().totals())
+    assert result.metrics() == Profile.metrics()
+
+
+def test_api_load_map_metrics(patch, bundle):
+    patch.object(Profile, 'metrics')
+    Bundle.story_files = {'a.story': 'a = 0'}
+    Bundle.bundle.return_value = {'stories': 'stories'}
+    result = Api.load_map({'a.story': 'a = 0'})
+    sources, stories = Profile.metrics.call_args[0]
+    assert list(sources) == ['a = 0']
+    assert stories == 'stories'
+    assert result.metrics() == Profile.metrics()
+
+
 def test_api_loads(patch):
     """
     Ensures Api.loads can compile a story from a string
@@ -15,7 +93,22 @@ def test_api_loads(patch):
     patch.object(Story, 'process')
     result = Api.loads('string').result()
     Story.__init__.assert_called_with('string')
-    Story.process.assert_called_with()
+    Story.process.assert_called_with(budget=None, stop_after=None)
+    assert result == Story.process()
+
+
+def test_api_loads_budget(patch):
+    patch.init(Story)
+    patch.object(Story, 'process')
+    Api.loads('string', budget='budget')
+    Story.process.assert_called_with(budget='budget', stop_after=None)
+
+
+def test_api_loads_stop_after(patch):
+    patch.init(Story)
+    patch.object(Story, 'process')
+    result = Api.loads('string', stop_after='parse').result()
+    Story.process.assert_called_with(budget=None, stop_after='parse')
     assert result == Story.process()
 
 
@@ -32,19 +125,81 @@ def test_api_load(patch, magic):
     assert result == {stream.name: story, 'services': story['services']}
 
 
-def test_api_load_map(patch, magic):
+def test_api_load_stop_after(patch, magic):
+    patch.object(Story, 'from_stream')
+    stream = magic()
+    result = Api.load(stream, stop_after='lower').result()
+    Story.from_stream().process.assert_called_with(budget=None,
+                                                   stop_after='lower')
+    assert result == {stream.name: Story.from_stream().process()}
+
+
+def test_api_load_map(patch, bundle, magic):
     """
     Ensures Api.load_map can compile stories from a map
     """
-    patch.init(Bundle)
-    patch.object(Bundle, 'bundle')
     files = {'a.story': "import 'b' as b", 'b.story': 'x = 0'}
     result = Api.load_map(files).result()
     Bundle.__init__.assert_called_with(story_files=files)
-    Bundle.bundle.assert_called()
+    Bundle.bundle.assert_called_with(stop_after=None)
     assert result == Bundle.bundle()
 
 
+def test_api_load_map_stop_after(patch, bundle):
+    Api.load_map({'a.story': 'a = 0'}, stop_after='semantics')
+    Bundle.bundle.assert_called_with(stop_after='semantics')
+
+
+def test_api_load_map_budget(patch, bundle):
+    """
+    Ensures Api.load_map compiles all stories with the same budget
+    """
+    patch.object(Budget, 'use')
+    Api.load_map({'a.story': 'a = 0'}, budget='budget')
+    Budget.use.assert_called_with('budget')
+    Budget.use().__enter__.assert_called()
+
+
+def test_api_loads_profile(patch, magic):
+    patch.init(Story)
+    patch.object(Story, 'process')
+    patch.object(Profile, 'use')
+    profile = magic()
+    Api.loads('string', profile=profile)
+    Profile.use.assert_called_with(profile)
+    Profile.use().__enter__.assert_called()
+
+
+def test_api_load_profile(patch, magic):
+    """
+    Ensures Api.load measures the stream as a story of its name
+    """
+    patch.object(Story, 'from_stream')
+    patch.many(Profile, ['use', 'story', 'phase'])
+    stream = magic()
+    profile = magic()
+    Api.load(stream, profile=profile)
+    Profile.use.assert_called_with(profile)
+    Profile.story.assert_called_with(stream.name)
+    Profile.phase.assert_called_with('read')
+
+
+def test_api_load_map_profile(patch, bundle, magic):
+    patch.object(Profile, 'use')
+    profile = magic()
+    Api.load_map({'a.story': 'a = 0'}, profile=profile)
+    Profile.use.assert_called_with(profile)
+    Profile.use().__enter__.assert_called()
+
+
+def test_api_session(patch):
+    patch.init(CompilerSession)
+    session = Api.session(cache_size=4, catalogues=['engine.mutations'])
+    CompilerSession.__init__.assert_called_with(
+        cache_size=4, catalogues=['engine.mutations'])
+    assert isinstance(session, CompilerSession)
+
+
 def test_api_loads_internal_error(patch):
     """
     Ensures Api.loads handles unknown errors
@@ -121,12 +276,10 @@ def test_api_load_internal_error_debug(patch, magic):
     assert str(e.value) == 'An unknown error.'
 
 
-def test_api_load_map_internal_error(patch):
+def test_api_load_map_internal_error(patch, bundle):
     """
     Ensures Api.loads handles unknown errors
     """
-    patch.init(Bundle)
-    patch.object(Bundle, 'bundle')
     patch.object(StoryError, 'internal_error')
     StoryError.internal_error.return_value = Exception('ICE')
     Bundle.bundle.side_effect = Exception('An unknown error.')
@@ -136,12 +289,10 @@ def test_api_load_map_internal_error(patch):
     assert str(e) == 'ICE'
 
 
-def test_api_load_map_internal_error_debug(patch):
+def test_api_load_map_internal_error_debug(patch, bundle):
     """
     Ensures Api.loads handles unknown errors with debug=True
     """
-    patch.init(Bundle)
-    patch.object(Bundle, 'bundle')
     patch.object(StoryError, 'internal_error')
     StoryError.internal_error.return_value = Exception('ICE')
     Bundle.bundle.side_effect = Exception('An unknown error.')
@@ -149,3 +300,137 @@ def test_api_load_map_internal_error_debug(patch):
         Api.load_map({}, debug=True).check_success()
 
     assert str(e.value) == 'An unknown error.'
+
+
+@fixture
+def run():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+def returning(value):
+    """
+    Returns a coroutine function returning `value`, which mocks can use as
+    their side effect on every Python version.
+    """
+    async def coroutine(*args):
+        return value
+    return coroutine
+
+
+def test_api_run_async(run):
+    result = run(Api.run_async(None, None, lambda a, b: a + b, 1, 2))
+    assert result == 3
+
+
+def test_api_run_async_executor(run):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result = run(Api.run_async(executor, 1, lambda: 'done'))
+    assert result == 'done'
+
+
+def test_api_run_async_timeout(run):
+    with raises(asyncio.TimeoutError):
+        run(Api.run_async(None, 0.01, time.sleep, 0.2))
+
+
+def test_api_aloads(patch, run):
+    patch.object(Api, 'run_async', side_effect=returning('result'))
+    result = run(Api.aloads('string', executor='executor', timeout=1))
+    Api.run_async.assert_called_with('executor', 1, Api.loads, 'string',
+                                     False, None)
+    assert result == 'result'
+
+
+def test_api_aload(patch, magic, run):
+    compiled = StoryscriptCompilationResult.from_result({'services': []})
+    patch.object(Api, 'run_async', side_effect=returning(compiled))
+    stream = magic()
+    result = run(Api.aload(stream, debug=True))
+    Api.run_async.assert_called_with(None, None, Api.loads, stream.read(),
+                                     True, None)
+    assert result.result() == {stream.name: {'services': []},
+                               'services': []}
+
+
+def test_api_aload_error(patch, magic, run):
+    error = StoryscriptCompilationResult.from_error('error')
+    patch.object(Api, 'run_async', side_effect=returning(error))
+    assert run(Api.aload(magic())) == error
+
+
+def test_api_aload_internal_error(patch, magic, run):
+    patch.object(StoryError, 'internal_error', return_value='ICE')
+    stream = magic()
+    stream.read.side_effect = Exception('An unknown error.')
+    assert run(Api.aload(stream)).errors() == ['ICE']
+    with raises(Exception):
+        run(Api.aload(stream, debug=True))
+
+
+def test_api_aload_map(patch, run):
+    patch.object(Api, 'run_async', side_effect=returning('result'))
+    result = run(Api.aload_map({'a.story': 'a = 0'}, timeout=2))
+    Api.run_async.assert_called_with(None, 2, Api.load_map,
+                                     {'a.story': 'a = 0'}, False, None)
+    assert result == 'result'
+
+
+def test_api_loads_many_sequential(patch):
+    patch.object(Api, 'loads', side_effect=lambda s, debug: s.upper())
+    assert list(Api.loads_many(['a', 'b'], jobs=1)) == ['A', 'B']
+    Api.loads.assert_called_with('b', debug=False)
+
+
+def test_api_loads_many_sequential_unordered(patch):
+    patch.object(Api, 'loads', side_effect=lambda s, debug: s.upper())
+    results = Api.loads_many(['a', 'b'], jobs=1, ordered=False)
+    assert list(results) == [(0, 'A'), (1, 'B')]
+
+
+def test_api_loads_many_executor(patch, magic):
+    patch.init(Batch)
+    patch.object(Batch, 'run')
+    executor = magic()
+    result = Api.loads_many(['a'], jobs=2, executor=executor)
+    Batch.__init__.assert_called_with(executor, 4, debug=False)
+    Batch.run.assert_called_with(Api.loads, ['a'], ordered=True)
+    assert result == Batch.run()
+
+
+def test_api_loads_many_pool(patch):
+    patch.object(Api, 'loads_pool')
+    result = Api.loads_many(['a'], jobs=3, ordered=False, debug=True)
+    Api.loads_pool.assert_called_with(['a'], 3, False, True)
+    assert result == Api.loads_pool()
+
+
+def test_api_loads_many_jobs(patch):
+    patch.object(Api, 'loads_pool')
+    patch.object(os, 'cpu_count', return_value=8)
+    Api.loads_many(['a'])
+    Api.loads_pool.assert_called_with(['a'], 8, True, False)
+
+
+def test_api_loads_pool(patch, magic):
+    executor = magic()
+    patch.object(BatchModule, 'start_pool', return_value=executor)
+    batches = []
+
+    def run(self, compile, sources, ordered):
+        batches.append(self)
+        return iter(['result'])
+
+    patch.object(Batch, 'run', side_effect=run, autospec=True)
+    results = list(Api.loads_pool(['a'], 2, True, False))
+    BatchModule.start_pool.assert_called_with(2)
+    batch = batches[0]
+    assert batch.executor == executor
+    assert batch.window == 4
+    assert batch.debug is False
+    batch.factory()
+    assert BatchModule.start_pool.call_count == 2
+    Batch.run.assert_called_with(batch, Api.loads, ['a'], ordered=True)
+    assert results == ['result']
+    executor.shutdown.assert_called()
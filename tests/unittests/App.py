@@ -6,6 +6,8 @@ from pytest import fixture, raises
 import storyscript.App as AppModule
 from storyscript.App import App
 from storyscript.Bundle import Bundle
+from storyscript.FileSystem import FileSystem
+from storyscript.Shards import Shards
 from storyscript.exceptions import StoryError
 from storyscript.parser import Grammar
 
@@ -56,7 +58,8 @@ def test_app_parse_lower(patch, bundle, magic):
 def test_app_compile(patch, bundle):
     patch.object(json, 'dumps')
     result = App.compile('path')
-    Bundle.from_path.assert_called_with('path', ignored_path=None)
+    Bundle.from_path.assert_called_with('path', ignored_path=None,
+                                        index=None, excluded=None)
     Bundle.from_path().bundle.assert_called_with(ebnf=None)
     json.dumps.assert_called_with(Bundle.from_path().bundle(), indent=2)
     assert result == json.dumps()
@@ -66,7 +69,8 @@ def test_app_compile_concise(patch, bundle):
     patch.object(json, 'dumps')
     patch.object(AppModule, '_clean_dict')
     result = App.compile('path', concise=True)
-    Bundle.from_path.assert_called_with('path', ignored_path=None)
+    Bundle.from_path.assert_called_with('path', ignored_path=None,
+                                        index=None, excluded=None)
     Bundle.from_path().bundle.assert_called_with(ebnf=None)
     AppModule._clean_dict.assert_called_with(Bundle.from_path().bundle())
     json.dumps.assert_called_with(AppModule._clean_dict(), indent=2)
@@ -76,7 +80,8 @@ def test_app_compile_concise(patch, bundle):
 def test_app_compile_ignored_path(patch, bundle):
     patch.object(json, 'dumps')
     App.compile('path', ignored_path='ignored')
-    Bundle.from_path.assert_called_with('path', ignored_path='ignored')
+    Bundle.from_path.assert_called_with('path', ignored_path='ignored',
+                                        index=None, excluded=None)
 
 
 def test_app_compile_ebnf(patch, bundle):
@@ -95,7 +100,8 @@ def test_app_compile_first(patch, bundle):
     Bundle.from_path().bundle.return_value = {'stories': {'my_story': 42}}
     patch.object(json, 'dumps')
     result = App.compile('path', first=True)
-    Bundle.from_path.assert_called_with('path', ignored_path=None)
+    Bundle.from_path.assert_called_with('path', ignored_path=None,
+                                        index=None, excluded=None)
     Bundle.from_path().bundle.assert_called_with(ebnf=None)
     json.dumps.assert_called_with(42, indent=2)
     assert result == json.dumps()
@@ -113,8 +119,91 @@ def test_app_compile_first_error(patch, bundle):
         App.compile('path', first=True)
     assert e.value.message() == \
         'The option `--first`/-`f` can only be used if one story is complied.'
-    Bundle.from_path.assert_called_with('path', ignored_path=None)
+    Bundle.from_path.assert_called_with('path', ignored_path=None,
+                                        index=None, excluded=None)
+    Bundle.from_path().bundle.assert_called_with(ebnf=None)
+
+
+def test_app_bundle_index(patch, bundle):
+    result = App.bundle('path', index='index.json', excluded=['vendor'])
+    Bundle.from_path.assert_called_with('path', ignored_path=None,
+                                        index='index.json',
+                                        excluded=['vendor'])
+    assert result == Bundle.from_path()
+
+
+def test_app_bundle_entries(patch, bundle):
+    patch.object(Bundle, 'from_entries')
+    patch.object(FileSystem, 'from_path')
+    result = App.bundle('path', entries=['a.story'])
+    FileSystem.from_path.assert_called_with('path')
+    Bundle.from_entries.assert_called_with(
+        ['a.story'], filesystem=FileSystem.from_path())
+    Bundle.from_path.assert_not_called()
+    assert result == Bundle.from_entries()
+
+
+def test_app_compile_entries(patch, bundle):
+    patch.object(json, 'dumps')
+    patch.object(Bundle, 'from_entries')
+    patch.object(FileSystem, 'from_path')
+    App.compile('path', entries=['a.story'])
+    Bundle.from_entries.assert_called_with(
+        ['a.story'], filesystem=FileSystem.from_path())
+    Bundle.from_entries().bundle.assert_called_with(ebnf=None)
+    json.dumps.assert_called_with(Bundle.from_entries().bundle(), indent=2)
+
+
+def test_app_check(patch, bundle):
+    patch.object(App, 'bundle')
+    assert App.check('path', stage='lower') is None
+    App.bundle.assert_called_with('path', ignored_path=None, entries=None,
+                                  index=None, excluded=None)
+    App.bundle().bundle.assert_called_with(ebnf=None, stop_after='lower')
+
+
+def test_app_check_semantics(patch, bundle):
+    """
+    Ensures checking the semantics runs the checks of the JSON generation
+    """
+    patch.object(App, 'bundle')
+    App.check('path', stage='semantics')
+    App.bundle().bundle.assert_called_with(ebnf=None, stop_after=None)
+
+
+def test_app_check_full(patch, bundle):
+    App.check('path', ignored_path='ignored', ebnf='ebnf')
+    Bundle.from_path.assert_called_with('path', ignored_path='ignored',
+                                        index=None, excluded=None)
+    Bundle.from_path().bundle.assert_called_with(ebnf='ebnf', stop_after=None)
+
+
+def test_app_compile_shards(patch, bundle):
+    patch.init(Shards)
+    patch.object(Shards, 'write')
+    result = App.compile_shards('path', 'out')
+    Bundle.from_path.assert_called_with('path', ignored_path=None,
+                                        index=None, excluded=None)
     Bundle.from_path().bundle.assert_called_with(ebnf=None)
+    Shards.__init__.assert_called_with('out')
+    Shards.write.assert_called_with(Bundle.from_path().bundle())
+    assert result == Shards.write()
+
+
+def test_app_compile_shards_concise(patch, bundle):
+    patch.init(Shards)
+    patch.object(Shards, 'write')
+    Bundle.from_path().bundle.return_value = {
+        'stories': {'a.story': {'tree': {}, 'modules': {}, 'version': '1'}}
+    }
+    App.compile_shards('path', 'out', ignored_path='ignored', ebnf='ebnf',
+                       concise=True)
+    Bundle.from_path.assert_called_with('path', ignored_path='ignored',
+                                        index=None, excluded=None)
+    Bundle.from_path().bundle.assert_called_with(ebnf='ebnf')
+    Shards.write.assert_called_with({
+        'stories': {'a.story': {'version': '1'}}
+    })
 
 
 def test_app_lex(bundle):
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import Future, ProcessPoolExecutor, \
+    ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pytest import fixture, raises
+
+from storyscript.Batch import Batch, start_pool, warm_worker
+from storyscript.Story import Story
+from storyscript.exceptions import StoryError
+
+
+def compile(source, debug):
+    if source == 'fail':
+        raise ValueError('ICE')
+    return (source, debug)
+
+
+@fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+@fixture
+def batch(executor):
+    return Batch(executor, 2)
+
+
+def test_warm_worker(patch):
+    patch.init(Story)
+    patch.object(Story, 'process')
+    warm_worker()
+    Story.__init__.assert_called_with('a = 0')
+    Story.process.assert_called()
+
+
+def test_start_pool(patch):
+    patch.init(ProcessPoolExecutor)
+    patch.object(ProcessPoolExecutor, 'submit')
+    executor = start_pool(2)
+    ProcessPoolExecutor.__init__.assert_called_with(max_workers=2)
+    assert isinstance(executor, ProcessPoolExecutor)
+    assert ProcessPoolExecutor.submit.call_count == 2
+    ProcessPoolExecutor.submit.assert_called_with(warm_worker)
+
+
+def test_batch_init(executor):
+    batch = Batch(executor, 4, debug=True, factory=start_pool)
+    assert batch.executor == executor
+    assert batch.window == 4
+    assert batch.debug is True
+    assert batch.factory == start_pool
+
+
+def test_batch_submit(batch):
+    assert batch.submit(compile, 'a').result() == ('a', False)
+
+
+def test_batch_submit_broken(magic):
+    executor = magic()
+    executor.submit.side_effect = BrokenProcessPool()
+    future = Batch(executor, 2).submit(compile, 'a')
+    assert isinstance(future.exception(), BrokenProcessPool)
+
+
+def test_batch_submit_broken_factory(magic, executor):
+    broken = magic()
+    broken.submit.side_effect = BrokenProcessPool()
+    batch = Batch(broken, 2, factory=lambda: executor)
+    assert batch.submit(compile, 'a').result() == ('a', False)
+    broken.shutdown.assert_called_with(wait=False)
+    assert batch.executor == executor
+
+
+def test_batch_outcome(batch):
+    future = Future()
+    future.set_result('result')
+    assert batch.outcome(compile, 'a', future, []) == 'result'
+
+
+def test_batch_outcome_broken(patch, executor):
+    """
+    Ensures stories whose worker died are compiled again
+    """
+    future = Future()
+    future.set_exception(BrokenProcessPool())
+    batch = Batch(executor, 2, factory=lambda: executor)
+    assert batch.outcome(compile, 'a', future, []) == ('a', False)
+
+
+def test_batch_outcome_broken_no_factory(patch, batch):
+    patch.object(StoryError, 'internal_error', return_value='ICE')
+    future = Future()
+    future.set_exception(BrokenProcessPool())
+    assert batch.outcome(compile, 'a', future, []).errors() == ['ICE']
+
+
+def test_batch_result(batch):
+    future = Future()
+    future.set_result('result')
+    assert batch.result(future) == 'result'
+
+
+def test_batch_result_error(patch, batch):
+    patch.object(StoryError, 'internal_error', return_value='ICE')
+    future = Future()
+    future.set_exception(ValueError('error'))
+    assert batch.result(future).errors() == ['ICE']
+
+
+def test_batch_result_error_debug(batch):
+    batch.debug = True
+    future = Future()
+    future.set_exception(ValueError('error'))
+    with raises(ValueError):
+        batch.result(future)
+
+
+def test_batch_ordered(batch):
+    results = list(batch.run(compile, ['a', 'b', 'c', 'd', 'e']))
+    assert results == [('a', False), ('b', False), ('c', False),
+                       ('d', False), ('e', False)]
+
+
+def test_batch_ordered_failure(patch, batch):
+    """
+    Ensures a failing story doesn't abort the batch
+    """
+    patch.object(StoryError, 'internal_error', return_value='ICE')
+    results = list(batch.run(compile, ['a', 'fail', 'c']))
+    assert results[0] == ('a', False)
+    assert results[1].errors() == ['ICE']
+    assert results[2] == ('c', False)
+
+
+def test_batch_ordered_streams(batch):
+    """
+    Ensures sources are only consumed as results are needed
+    """
+    consumed = []
+
+    def sources():
+        for source in ['a', 'b', 'c', 'd', 'e']:
+            consumed.append(source)
+            yield source
+
+    results = batch.run(compile, sources())
+    next(results)
+    assert consumed == ['a', 'b']
+    results.close()
+
+
+def test_batch_completed(batch):
+    results = batch.run(compile, ['a', 'b', 'c', 'd', 'e'], ordered=False)
+    assert sorted(results) == [(0, ('a', False)), (1, ('b', False)),
+                               (2, ('c', False)), (3, ('d', False)),
+                               (4, ('e', False))]
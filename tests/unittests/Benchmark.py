@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import subprocess
+import sys
+
+from pytest import fixture, mark
+
+from storyscript import Version
+from storyscript.Benchmark import Benchmark
+from storyscript.Story import Story
+from storyscript.StoryGenerator import StoryGenerator
+from storyscript.parser import Parser
+
+
+@fixture
+def benchmark(patch):
+    patch.init(Parser)
+    return Benchmark(repeat=2)
+
+
+def test_benchmark_init(patch):
+    patch.init(Parser)
+    benchmark = Benchmark(ebnf='grammar.ebnf')
+    Parser.__init__.assert_called_with(ebnf='grammar.ebnf')
+    assert benchmark.repeat == 3
+    assert isinstance(benchmark.parser, Parser)
+
+
+def test_benchmark_corpus(tmpdir):
+    tmpdir.join('b.story').write('b = 1')
+    tmpdir.mkdir('sub').join('a.story').write('a = 1')
+    tmpdir.join('b.json').write('{}')
+    result = list(Benchmark.corpus(str(tmpdir)))
+    assert result == [('b.story', 'b = 1'),
+                      (os.path.join('sub', 'a.story'), 'a = 1')]
+
+
+def test_benchmark_corpus_file(patch):
+    patch.object(os.path, 'isfile', return_value=True)
+    patch.object(Story, 'read')
+    result = list(Benchmark.corpus('/stories/a.story'))
+    Story.read.assert_called_with('/stories/a.story')
+    assert result == [('a.story', Story.read())]
+
+
+def test_benchmark_synthetic(patch):
+    patch.init(StoryGenerator)
+    patch.many(StoryGenerator, ['lines', 'templates', 'ladder',
+                                'list_literal', 'nesting', 'inline'])
+    result = dict(Benchmark.synthetic(10, seed=1))
+    StoryGenerator.__init__.assert_called_with(1)
+    StoryGenerator.lines.assert_called_with(10)
+    StoryGenerator.templates.assert_called_with(10)
+    StoryGenerator.ladder.assert_called_with(5)
+    StoryGenerator.list_literal.assert_called_with(100)
+    StoryGenerator.nesting.assert_called_with(30)
+    StoryGenerator.inline.assert_called_with(1)
+    assert list(result) == ['lines', 'templates', 'ladder', 'list',
+                            'nesting', 'inline']
+
+
+def test_benchmark_time_story(patch, benchmark):
+    times = [{'lex': 2, 'parse': 1}, {'lex': 1, 'parse': 3}]
+    patch.object(Benchmark, 'time_phases', side_effect=times)
+    patch.object(Benchmark, 'phases', ['lex', 'parse'])
+    assert benchmark.time_story('source') == {'lex': 1, 'parse': 1}
+    Benchmark.time_phases.assert_called_with('source')
+
+
+def test_benchmark_run(patch, benchmark):
+    patch.object(Benchmark, 'phases', ['lex'])
+    patch.object(Benchmark, 'time_story', side_effect=[
+        {'lex': 1}, Exception(), {'lex': 2}])
+    stories = [('a', 'a = 1'), ('b', 'b ='), ('c', 'c = 1\nd = 2'),
+               ('empty', '\n')]
+    result = benchmark.run(stories)
+    assert result == {'stories': 2, 'failed': ['b'], 'totals': {'lex': 3},
+                      'results': {'a': {'lex': 1, 'lines': 1},
+                                  'c': {'lex': 2, 'lines': 2}}}
+
+
+def test_benchmark_report(patch, benchmark):
+    patch.many(Benchmark, ['run', 'time_imports'])
+    patch.object(Version, 'is_checkout', return_value=False)
+    patch.object(Benchmark, 'phases', ['lex'])
+    result = benchmark.report({'corpus': 'stories'})
+    Benchmark.run.assert_called_with('stories')
+    assert result['format'] == 1
+    assert result['revision'] is None
+    assert result['repeat'] == 2
+    assert result['phases'] == ['lex']
+    assert result['suites'] == {'corpus': Benchmark.run()}
+    assert result['imports'] == Benchmark.time_imports()
+
+
+def test_benchmark_report_no_imports(patch, benchmark):
+    patch.many(Benchmark, ['run', 'time_imports'])
+    patch.object(Version, 'is_checkout', return_value=False)
+    assert benchmark.report({}, imports=False)['imports'] is None
+    Benchmark.time_imports.assert_not_called()
+
+
+@mark.parametrize('baseline, ratios', [
+    ({'suites': {'corpus': {'totals': {'lex': 2, 'parse': 0}}}},
+     {'corpus': {'lex': 0.5}}),
+    ({'suites': {}}, {}),
+])
+def test_benchmark_compare(patch, baseline, ratios):
+    patch.object(Benchmark, 'phases', ['lex', 'parse'])
+    report = {'suites': {'corpus': {'totals': {'lex': 1, 'parse': 1}}}}
+    assert Benchmark.compare(baseline, report) == ratios
+
+
+@mark.parametrize('baseline, ratios', [
+    ({'suites': {}, 'imports': {'cli': 0.2, 'package': 0}},
+     {'imports': {'cli': 0.5}}),
+    ({'suites': {}, 'imports': None}, {}),
+    ({'suites': {}}, {}),
+])
+def test_benchmark_compare_imports(baseline, ratios):
+    report = {'suites': {}, 'imports': {'cli': 0.1, 'package': 0.1}}
+    assert Benchmark.compare(baseline, report) == ratios
+
+
+def test_benchmark_importtime(patch, magic):
+    patch.object(subprocess, 'run')
+    subprocess.run.return_value = magic(stderr=(
+        'import time: self [us] | cumulative | imported package\n'
+        'import time:        20 |         20 |   a.b\n'
+        'import time:        10 |         30 | a\n'
+        'other output'))
+    assert Benchmark.importtime('import a') == [('a.b', 20, 1),
+                                                ('a', 30, 0)]
+    command = subprocess.run.call_args[0][0]
+    assert command[1:] == ['-X', 'importtime', '-c', 'import a']
+
+
+def test_benchmark_time_imports(patch, benchmark):
+    """
+    Ensures imports are timed without the modules imported at startup,
+    keeping the best time of the top level imports
+    """
+    patch.object(Benchmark, 'imports', {'package': 'import a'})
+    patch.object(Benchmark, 'importtime', side_effect=[
+        [('site', 5, 0)],
+        [('site', 5, 0), ('a', 30, 0), ('a.b', 20, 1)],
+        [('a', 20, 0), ('c', 10, 0)],
+    ])
+    if sys.version_info < (3, 7):
+        assert benchmark.time_imports() is None
+        return
+    assert benchmark.time_imports() == {'package': 30 / 1e6}
+    Benchmark.importtime.assert_called_with('import a')
+
+
+def test_benchmark_write_load(tmpdir):
+    path = str(tmpdir.join('results.json'))
+    Benchmark.write({'format': 1}, path)
+    with io.open(path, 'r') as f:
+        assert f.read() == Benchmark.dumps({'format': 1})
+    assert Benchmark.load(path) == {'format': 1}
+
+
+def test_benchmark_report_revision(patch, benchmark):
+    patch.many(Benchmark, ['run', 'time_imports'])
+    patch.object(Version, 'is_checkout', return_value=True)
+    patch.object(Version, 'git_describe', return_value='0.1-2-gabc')
+    assert benchmark.report({})['revision'] == '0.1-2-gabc'
+
+
+def test_benchmark_report_revision_error(patch, benchmark):
+    patch.object(Benchmark, 'time_imports')
+    patch.object(Version, 'is_checkout', return_value=True)
+    patch.object(Version, 'git_describe', side_effect=OSError())
+    assert benchmark.report({})['revision'] is None
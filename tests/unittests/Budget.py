@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import time
+
+from lark.lexer import Token
+
+from pytest import fixture, mark, raises
+
+from storyscript.Budget import Budget
+from storyscript.exceptions import CompilerError
+from storyscript.parser import Tree
+
+
+@fixture
+def tree():
+    """
+    A tree with 5 nodes and a nesting depth of 2
+    """
+    return Tree('start', [Tree('nested_block', [
+        Tree('list', [Token('NAME', 'a')])]), Tree('block', [])])
+
+
+def test_budget_init():
+    budget = Budget()
+    assert budget.time is None
+    assert budget.nodes is None
+    assert budget.depth is None
+    assert budget.fake_lines is None
+    assert budget.deadline is None
+    assert budget.fake_line_count == 0
+
+
+def test_budget_start(patch):
+    patch.object(time, 'monotonic', return_value=10)
+    budget = Budget(time=2, nodes=3, depth=4, fake_lines=5)
+    budget.fake_line_count = 1
+    started = budget.start()
+    assert started is not budget
+    assert started.deadline == 12
+    assert started.fake_line_count == 0
+    assert (started.nodes, started.depth, started.fake_lines) == (3, 4, 5)
+
+
+def test_budget_start_no_time():
+    assert Budget().start().deadline is None
+
+
+def test_budget_current():
+    assert Budget.current() is None
+
+
+def test_budget_use():
+    budget = Budget(nodes=1)
+    with Budget.use(budget):
+        assert Budget.current().nodes == 1
+        assert Budget.current() is not budget
+    assert Budget.current() is None
+
+
+def test_budget_use_none():
+    with Budget.use(Budget(nodes=1)):
+        with Budget.use(None):
+            assert Budget.current().nodes == 1
+
+
+def test_budget_use_nested():
+    with Budget.use(Budget(nodes=1)):
+        with Budget.use(Budget(nodes=2)):
+            assert Budget.current().nodes == 2
+        assert Budget.current().nodes == 1
+
+
+def test_budget_use_error():
+    with raises(ValueError):
+        with Budget.use(Budget(nodes=1)):
+            raise ValueError()
+    assert Budget.current() is None
+
+
+def test_budget_exceeded():
+    error = Budget.exceeded('limit')
+    assert isinstance(error, CompilerError)
+    assert error.error == 'budget_exceeded'
+    assert error.message() == ('Compilation stopped: the story exceeds the '
+                               'limit')
+
+
+def test_budget_check_time():
+    with Budget.use(Budget(time=10)):
+        Budget.check_time()
+
+
+def test_budget_check_time_exceeded():
+    with Budget.use(Budget(time=0)):
+        time.sleep(0.001)
+        with raises(CompilerError) as e:
+            Budget.check_time()
+    assert e.value.format.limit == 'time limit of 0 seconds'
+
+
+def test_budget_check_time_no_budget():
+    Budget.check_time()
+
+
+@mark.parametrize('node, expected', [
+    (Tree('nested_block', []), True),
+    (Tree('list', []), True),
+    (Tree('map', []), True),
+    (Tree('primary_expression', [Tree('or_expression', [])]), True),
+    (Tree('primary_expression', [Tree('entity', [])]), False),
+    (Tree('block', []), False),
+])
+def test_budget_nests(node, expected):
+    assert Budget.nests(node) is expected
+
+
+def test_budget_check_tree(tree):
+    with Budget.use(Budget(nodes=5, depth=2)):
+        Budget.check_tree(tree)
+
+
+def test_budget_check_tree_nodes(tree):
+    with Budget.use(Budget(nodes=4)):
+        with raises(CompilerError) as e:
+            Budget.check_tree(tree)
+    assert e.value.format.limit == 'limit of 4 nodes'
+
+
+def test_budget_check_tree_depth(tree):
+    with Budget.use(Budget(depth=1)):
+        with raises(CompilerError) as e:
+            Budget.check_tree(tree)
+    assert e.value.format.limit == 'nesting depth limit of 1'
+
+
+def test_budget_check_tree_deep():
+    """
+    Ensures trees deeper than the recursion limit can be checked
+    """
+    tree = Tree('leaf', [])
+    for _ in range(5000):
+        tree = Tree('list', [tree])
+    with Budget.use(Budget(depth=5000)):
+        Budget.check_tree(tree)
+
+
+def test_budget_check_tree_time(patch, tree):
+    patch.object(Budget, 'check_time')
+    with Budget.use(Budget(nodes=5)):
+        Budget.check_tree(tree)
+    Budget.check_time.assert_called()
+
+
+def test_budget_add_fake_line():
+    with Budget.use(Budget(fake_lines=2)):
+        Budget.add_fake_line()
+        Budget.add_fake_line()
+        with raises(CompilerError) as e:
+            Budget.add_fake_line()
+    assert e.value.format.limit == 'limit of 2 generated lines'
+
+
+def test_budget_add_fake_line_unlimited():
+    with Budget.use(Budget()):
+        Budget.add_fake_line()
+        assert Budget.current().fake_line_count == 1
@@ -5,6 +5,8 @@ import subprocess
 from pytest import fixture
 
 from storyscript.Bundle import Bundle
+from storyscript.FileSystem import FileSystem, LocalFileSystem, \
+    MemoryFileSystem
 from storyscript.Story import Story
 from storyscript.parser import Parser
 
@@ -17,6 +19,12 @@ def bundle(patch):
 def test_bundle_init(bundle):
     assert bundle.stories == {}
     assert bundle.story_files == {}
+    assert isinstance(bundle.filesystem, LocalFileSystem)
+
+
+def test_bundle_init_filesystem():
+    filesystem = MemoryFileSystem()
+    assert Bundle(filesystem=filesystem).filesystem == filesystem
 
 
 def test_bundle_init_files():
@@ -32,7 +40,7 @@ def test_bundle_gitignores(patch):
     subprocess.run().returncode = 0
     result = Bundle.gitignores()
     command = ['git', 'ls-files', '--others', '--ignored',
-               '--exclude-standard']
+               '--exclude-standard', '--directory']
     subprocess.run.assert_called_with(command, encoding='utf8',
                                       stderr=subprocess.DEVNULL,
                                       stdout=subprocess.PIPE)
@@ -53,10 +61,10 @@ def test_bundle_gitignores_failed(patch):
 
 def test_bundle_ignores(patch):
     patch.object(os.path, 'isdir')
-    patch.object(os, 'walk', return_value=[('root', [], ['one.story', 'two'])])
+    patch.object(os.path, 'relpath', return_value='root')
     result = Bundle.ignores('path')
-    os.walk.assert_called_with('path')
-    assert result == ['root/one.story']
+    os.path.relpath.assert_called_with('path')
+    assert result == ['root/']
 
 
 def test_bundle_ignores_not_dir(patch):
@@ -67,46 +75,30 @@ def test_bundle_ignores_not_dir(patch):
     assert result == [os.path.relpath()]
 
 
-def test_bundle_filter_path(patch):
-    patch.object(os.path, 'relpath')
-    result = Bundle.filter_path('./root', 'one.story', [])
-    os.path.relpath.assert_called_with('./root/one.story')
-    assert result == os.path.relpath()
-
-
-def test_bundle_filter_path_ignores():
-    result = Bundle.filter_path('./root', 'one.story', ['root/one.story'])
-    assert result is None
+def test_bundle_directory_ignores(patch):
+    patch.many(Bundle, ['gitignores', 'ignores'])
+    Bundle.gitignores.return_value = ['a.story']
+    Bundle.ignores.return_value = ['ignored/']
+    assert Bundle.directory_ignores() == ['a.story']
+    assert Bundle.directory_ignores('ignored') == ['a.story', 'ignored/']
+    Bundle.ignores.assert_called_with('ignored')
 
 
 def test_bundle_parse_directory(patch, bundle):
     """
     Ensures parse_directory can parse a directory
     """
-    patch.object(os, 'walk', return_value=[('root', [], ['one.story', 'two'])])
-    patch.object(Bundle, 'gitignores')
-    result = Bundle.parse_directory('dir')
-    assert Bundle.gitignores.call_count == 1
-    os.walk.assert_called_with('dir')
-    assert result == ['root/one.story']
-
-
-def test_bundle_parse_directory_gitignored(patch, bundle):
-    """
-    Ensures parse_directory does not return gitignored files
-    """
-    patch.object(os, 'walk', return_value=[('./root', [], ['one.story'])])
-    patch.object(Bundle, 'gitignores')
-    Bundle.gitignores.return_value = ['root/one.story']
-    assert Bundle.parse_directory('dir') == []
-
-
-def test_bundle_parse_directory_ignored_path(patch, bundle):
-    patch.object(os, 'walk', return_value=[('./root', [], ['one.story'])])
-    patch.many(Bundle, ['gitignores', 'ignores'])
-    Bundle.gitignores.return_value = []
-    Bundle.parse_directory('dir', ignored_path='ignored')
-    Bundle.ignores.assert_called_with('ignored')
+    patch.init(LocalFileSystem)
+    patch.object(LocalFileSystem, 'stories')
+    patch.object(Bundle, 'directory_ignores')
+    result = Bundle.parse_directory('dir', ignored_path='ignored',
+                                    index='index.json', excluded=['vendor'])
+    LocalFileSystem.__init__.assert_called_with('dir', excluded=['vendor'],
+                                                index='index.json')
+    Bundle.directory_ignores.assert_called_with('ignored')
+    LocalFileSystem.stories.assert_called_with(
+        ignores=Bundle.directory_ignores())
+    assert result == LocalFileSystem.stories()
 
 
 def test_bundle_from_path(patch):
@@ -114,35 +106,69 @@ def test_bundle_from_path(patch):
     Ensures Bundle.from_path can create a Bundle from a filepath
     """
     patch.object(os.path, 'isdir', return_value=False)
-    patch.init(Bundle)
-    patch.object(Bundle, 'load_story')
+    patch.object(Bundle, 'directory_ignores')
+    patch.object(LocalFileSystem, 'read', return_value='a = 0')
     result = Bundle.from_path('path')
-    Bundle.load_story.assert_called_with('path')
-    assert isinstance(result, Bundle)
+    Bundle.directory_ignores.assert_not_called()
+    assert isinstance(result.filesystem, LocalFileSystem)
+    assert result.story_files == {'path': 'a = 0'}
 
 
-def test_bundle_from_path_directory(patch):
+def test_bundle_from_path_directory(patch, magic):
     """
-    Ensures Bundle.from_path can create a Bundle from a directory path
+    Ensures Bundle.from_path loads the stories of a directory
     """
     patch.object(os.path, 'isdir')
-    patch.init(Bundle)
-    patch.many(Bundle, ['load_story', 'parse_directory'])
-    Bundle.parse_directory.return_value = ['one.story']
-    Bundle.from_path('path')
-    Bundle.parse_directory.assert_called_with('path', ignored_path=None)
+    patch.object(FileSystem, 'from_path')
+    patch.many(Bundle, ['load_story', 'directory_ignores'])
+    filesystem = FileSystem.from_path()
+    filesystem.stories.return_value = ['one.story']
+    result = Bundle.from_path('path', ignored_path='ignored',
+                              index='index.json', excluded=['vendor'])
+    FileSystem.from_path.assert_called_with('path', excluded=['vendor'],
+                                            index='index.json')
+    Bundle.directory_ignores.assert_called_with('ignored')
+    filesystem.stories.assert_called_with(ignores=Bundle.directory_ignores())
     Bundle.load_story.assert_called_with('one.story')
+    assert result.filesystem == filesystem
 
 
-def test_bundle_from_path_directory_ignored(patch):
+def test_bundle_from_path_archive(patch):
     """
-    Ensures Bundle.from_path accepts an ignored_path keyword argument
+    Ensures Bundle.from_path loads all the stories of an archive
+    """
+    filesystem = MemoryFileSystem({'a.story': 'x = 0', 'b.story': 'y = 1'})
+    patch.object(FileSystem, 'from_path', return_value=filesystem)
+    patch.object(Bundle, 'directory_ignores')
+    result = Bundle.from_path('release.tar.gz')
+    FileSystem.from_path.assert_called_with('release.tar.gz', excluded=None,
+                                            index=None)
+    Bundle.directory_ignores.assert_not_called()
+    assert result.filesystem == filesystem
+    assert result.story_files == {'a.story': 'x = 0', 'b.story': 'y = 1'}
+
+
+def test_bundle_from_entries(patch):
+    """
+    Ensures Bundle.from_entries loads only the given entrypoints
     """
-    patch.object(os.path, 'isdir')
     patch.init(Bundle)
-    patch.many(Bundle, ['load_story', 'parse_directory'])
-    Bundle.from_path('path', ignored_path='ignored')
-    Bundle.parse_directory.assert_called_with('path', ignored_path='ignored')
+    patch.object(Bundle, 'load_story')
+    patch.object(os.path, 'relpath', side_effect=lambda p: p[2:])
+    result = Bundle.from_entries(['./a.story', './b.story'])
+    assert Bundle.load_story.call_count == 2
+    Bundle.load_story.assert_called_with('b.story')
+    assert isinstance(result, Bundle)
+
+
+def test_bundle_from_entries_filesystem():
+    """
+    Ensures Bundle.from_entries looks up entrypoints in the given filesystem
+    """
+    filesystem = MemoryFileSystem({'a.story': 'x = 0', 'b.story': 'y = 1'})
+    result = Bundle.from_entries(['./a.story'], filesystem=filesystem)
+    assert result.filesystem == filesystem
+    assert result.story_files == {'a.story': 'x = 0'}
 
 
 def test_bundle_load_story(patch, bundle):
@@ -161,11 +187,11 @@ def test_bundle_load_story_not_read(patch, bundle):
     Ensures Bundle.load_story reads a story before loading it
     """
     patch.init(Story)
-    patch.object(Story, 'read')
+    patch.object(LocalFileSystem, 'read')
     bundle.story_files = {}
     bundle.load_story('one.story')
-    Story.read.assert_called_with('one.story')
-    assert bundle.story_files['one.story'] == Story.read()
+    LocalFileSystem.read.assert_called_with('one.story')
+    assert bundle.story_files['one.story'] == LocalFileSystem.read()
 
 
 def test_bundle_find_stories(patch, bundle):
@@ -207,28 +233,93 @@ def test_bundle_compile(mocker, patch, bundle):
     Bundle.load_story.assert_called_with('one.story')
 
     story = Bundle.load_story()
-    Bundle.compile.assert_called_with(story.modules(), parser=None)
-    story.compile.assert_called()
+    Bundle.compile.assert_called_with(story.modules(), parser=None,
+                                      mutation_table=None, stop_after=None)
+    story.compile.assert_called_with(mutation_table=None, stop_after=None)
     assert bundle.stories['one.story'] == story.compiled
 
 
+def test_bundle_compile_stop_after_parse(patch, bundle):
+    compile = bundle.compile
+    patch.many(Bundle, ['compile', 'load_story'])
+    compile(['one.story'], parser=None, stop_after='parse')
+    story = Bundle.load_story()
+    Bundle.compile.assert_called_with(story.modules(), parser=None,
+                                      mutation_table=None, stop_after='parse')
+    story.compile.assert_not_called()
+    assert bundle.stories['one.story'] == story.tree
+
+
+def test_bundle_compile_stop_after(patch, bundle):
+    compile = bundle.compile
+    patch.many(Bundle, ['compile', 'load_story'])
+    compile(['one.story'], parser=None, stop_after='semantics')
+    story = Bundle.load_story()
+    story.compile.assert_called_with(mutation_table=None,
+                                     stop_after='semantics')
+    assert bundle.stories['one.story'] == story.tree
+
+
+def test_bundle_compile_once(patch, bundle):
+    """
+    Ensures Bundle.compile compiles modules imported by several stories only
+    once
+    """
+    patch.object(Bundle, 'load_story')
+    bundle.stories['one.story'] = 'compiled'
+    bundle.compile(['one.story'], parser=None)
+    Bundle.load_story.assert_not_called()
+
+
+def test_bundle_parse_once(patch, bundle):
+    patch.object(Bundle, 'load_story')
+    bundle.stories['one.story'] = 'tree'
+    bundle.parse(['one.story'], parser=None, lower=False)
+    Bundle.load_story.assert_not_called()
+
+
 def test_bundle_bundle(patch, bundle):
     patch.many(Bundle, ['find_stories', 'services', 'compile', 'parser'])
     result = bundle.bundle()
     Bundle.parser.assert_called_with(None)
     Bundle.compile.assert_called_with(Bundle.find_stories(),
-                                      parser=Bundle.parser())
+                                      parser=Bundle.parser(),
+                                      mutation_table=None, stop_after=None)
     expected = {'stories': bundle.stories, 'services': Bundle.services(),
                 'entrypoint': Bundle.find_stories()}
     assert result == expected
 
 
+def test_bundle_bundle_stop_after(patch, bundle):
+    patch.many(Bundle, ['find_stories', 'services', 'compile', 'parser'])
+    result = bundle.bundle(stop_after='lower')
+    Bundle.compile.assert_called_with(Bundle.find_stories(),
+                                      parser=Bundle.parser(),
+                                      mutation_table=None, stop_after='lower')
+    Bundle.services.assert_not_called()
+    assert result == {'stories': bundle.stories,
+                      'entrypoint': Bundle.find_stories()}
+
+
 def test_bundle_bundle_ebnf(patch, bundle):
     patch.many(Bundle, ['find_stories', 'services', 'compile', 'parser'])
     bundle.bundle(ebnf='ebnf')
     Bundle.parser.assert_called_with('ebnf')
     Bundle.compile.assert_called_with(Bundle.find_stories(),
-                                      parser=Bundle.parser())
+                                      parser=Bundle.parser(),
+                                      mutation_table=None, stop_after=None)
+
+
+def test_bundle_bundle_parser(patch, magic, bundle):
+    """
+    Ensures Bundle.bundle can use a given parser and mutation table
+    """
+    patch.many(Bundle, ['find_stories', 'services', 'compile', 'parser'])
+    parser = magic()
+    bundle.bundle(parser=parser, mutation_table='table')
+    Bundle.parser.assert_not_called()
+    Bundle.compile.assert_called_with(Bundle.find_stories(), parser=parser,
+                                      mutation_table='table', stop_after=None)
 
 
 def test_bundle_bundle_trees(patch, bundle):
@@ -254,26 +345,26 @@ def test_bundle_lex(patch, bundle):
     """
     Ensures Bundle.lex can lex a bundle
     """
-    patch.object(Story, 'from_file')
+    patch.object(Bundle, 'load_story')
     patch.object(Bundle, 'find_stories', return_value=['story'])
     patch.object(Bundle, 'parser')
     result = bundle.lex()
-    Story.from_file.assert_called_with('story')
+    Bundle.load_story.assert_called_with('story')
     Bundle.parser.assert_called_with(None)
-    Story.from_file().lex.assert_called_with(parser=Bundle.parser())
-    assert result['story'] == Story.from_file().lex()
+    Bundle.load_story().lex.assert_called_with(parser=Bundle.parser())
+    assert result['story'] == Bundle.load_story().lex()
 
 
 def test_bundle_lex_ebnf(patch, bundle):
     """
     Ensures Bundle.lex supports specifying an ebnf file
     """
-    patch.object(Story, 'from_file')
+    patch.object(Bundle, 'load_story')
     patch.object(Bundle, 'find_stories', return_value=['story'])
     patch.object(Bundle, 'parser')
     bundle.lex(ebnf='ebnf')
     Bundle.parser.assert_called_with('ebnf')
-    Story.from_file().lex.assert_called_with(parser=Bundle.parser())
+    Bundle.load_story().lex.assert_called_with(parser=Bundle.parser())
 
 
 def test_bundle_bundle_lower(patch, bundle, magic):
@@ -8,13 +8,23 @@ from click.testing import CliRunner
 from pytest import fixture, mark
 
 from storyscript.App import App
+from storyscript.Benchmark import Benchmark
 from storyscript.Cli import Cli
+from storyscript.Client import Client, RemoteError
+from storyscript.Profile import Profile
 from storyscript.Project import Project
+from storyscript.Server import Server
 from storyscript.Version import version
+from storyscript.compiler import Compiler
 from storyscript.exceptions.CompilerError import CompilerError
 from storyscript.exceptions.StoryError import StoryError
 
 
+@fixture(autouse=True)
+def client(patch):
+    patch.object(Client, 'connect', return_value=None)
+
+
 @fixture
 def runner():
     return CliRunner()
@@ -98,7 +108,8 @@ def test_cli_compile_with_ignore_option(runner, app):
                                 '--ignore', 'path/sub_dir/my_fake.story'])
     App.compile.assert_called_with('path/fake.story', ebnf=None,
                                    ignored_path='path/sub_dir/my_fake.story',
-                                   concise=False, first=False)
+                                   concise=False, first=False, entries=None,
+                                   index=None, excluded=None)
 
 
 def test_cli_parse_with_ignore_option(runner, app):
@@ -214,7 +225,8 @@ def test_cli_compile(patch, runner, echo, app):
     runner.invoke(Cli.compile, [])
     App.compile.assert_called_with(os.getcwd(), ebnf=None,
                                    ignored_path=None, concise=False,
-                                   first=False)
+                                   first=False, entries=None,
+                                   index=None, excluded=None)
     click.style.assert_called_with('Script syntax passed!', fg='green')
     click.echo.assert_called_with(click.style())
 
@@ -226,7 +238,8 @@ def test_cli_compile_path(patch, runner, app):
     runner.invoke(Cli.compile, ['/path'])
     App.compile.assert_called_with('/path', ebnf=None,
                                    ignored_path=None, concise=False,
-                                   first=False)
+                                   first=False, entries=None,
+                                   index=None, excluded=None)
 
 
 def test_cli_compile_output_file(patch, runner, app):
@@ -239,6 +252,57 @@ def test_cli_compile_output_file(patch, runner, app):
     io.open().__enter__().write.assert_called_with(App.compile())
 
 
+def test_cli_compile_output_dir(patch, runner, echo, app):
+    """
+    Ensures the compile command can write one file per story
+    """
+    patch.object(App, 'compile_shards', return_value=['out/a.json'])
+    runner.invoke(Cli.compile, ['/path', '--output-dir', 'out'])
+    App.compile_shards.assert_called_with('/path', 'out', ignored_path=None,
+                                          ebnf=None, concise=False,
+                                          entries=None,
+                                          index=None, excluded=None)
+    App.compile.assert_not_called()
+    click.echo.assert_called_with('out/a.json')
+
+
+def test_cli_compile_output_dir_silent(patch, runner, echo, app):
+    patch.object(App, 'compile_shards', return_value=['out/a.json'])
+    runner.invoke(Cli.compile, ['--output-dir', 'out', '-s', '-c'])
+    App.compile_shards.assert_called_with(os.getcwd(), 'out',
+                                          ignored_path=None, ebnf=None,
+                                          concise=True, entries=None,
+                                          index=None, excluded=None)
+    assert click.echo.call_count == 0
+
+
+@mark.parametrize('option', ['--entry', '-e'])
+def test_cli_compile_entries(runner, echo, app, option):
+    """
+    Ensures the compile command supports explicit entrypoints
+    """
+    runner.invoke(Cli.compile, [option, 'a.story', option, 'b.story'])
+    App.compile.assert_called_with(os.getcwd(), ebnf=None,
+                                   ignored_path=None, concise=False,
+                                   first=False,
+                                   entries=['a.story', 'b.story'],
+                                   index=None, excluded=None)
+
+
+def test_cli_compile_index(runner, echo, app):
+    """
+    Ensures the compile command scans directories with an index, skipping
+    excluded directories
+    """
+    runner.invoke(Cli.compile, ['--index', 'index.json', '--exclude',
+                                'node_modules', '--exclude', 'vendor'])
+    App.compile.assert_called_with(os.getcwd(), ebnf=None,
+                                   ignored_path=None, concise=False,
+                                   first=False, entries=None,
+                                   index='index.json',
+                                   excluded=['node_modules', 'vendor'])
+
+
 @mark.parametrize('option', ['--silent', '-s'])
 def test_cli_compile_silent(runner, echo, app, option):
     """
@@ -247,7 +311,8 @@ def test_cli_compile_silent(runner, echo, app, option):
     result = runner.invoke(Cli.compile, [option])
     App.compile.assert_called_with(os.getcwd(), ebnf=None,
                                    ignored_path=None, concise=False,
-                                   first=False)
+                                   first=False, entries=None,
+                                   index=None, excluded=None)
     assert result.output == ''
     assert click.echo.call_count == 0
 
@@ -260,7 +325,8 @@ def test_cli_compile_concise(runner, echo, app, option):
     runner.invoke(Cli.compile, [option])
     App.compile.assert_called_with(os.getcwd(), ebnf=None,
                                    ignored_path=None, concise=True,
-                                   first=False)
+                                   first=False, entries=None,
+                                   index=None, excluded=None)
 
 
 @mark.parametrize('option', ['--first', '-f'])
@@ -271,14 +337,16 @@ def test_cli_compile_first(runner, echo, app, option):
     runner.invoke(Cli.compile, [option])
     App.compile.assert_called_with(os.getcwd(), ebnf=None,
                                    ignored_path=None, concise=False,
-                                   first=True)
+                                   first=True, entries=None,
+                                   index=None, excluded=None)
 
 
 def test_cli_compile_debug(runner, echo, app):
     runner.invoke(Cli.compile, ['--debug'])
     App.compile.assert_called_with(os.getcwd(), ebnf=None,
                                    ignored_path=None, concise=False,
-                                   first=False)
+                                   first=False, entries=None,
+                                   index=None, excluded=None)
 
 
 @mark.parametrize('option', ['--json', '-j'])
@@ -289,7 +357,8 @@ def test_cli_compile_json(runner, echo, app, option):
     runner.invoke(Cli.compile, [option])
     App.compile.assert_called_with(os.getcwd(), ebnf=None,
                                    ignored_path=None, concise=False,
-                                   first=False)
+                                   first=False, entries=None,
+                                   index=None, excluded=None)
     click.echo.assert_called_with(App.compile())
 
 
@@ -297,7 +366,8 @@ def test_cli_compile_ebnf(runner, echo, app):
     runner.invoke(Cli.compile, ['--ebnf', 'test.ebnf'])
     App.compile.assert_called_with(os.getcwd(), ebnf='test.ebnf',
                                    ignored_path=None, concise=False,
-                                   first=False)
+                                   first=False, entries=None,
+                                   index=None, excluded=None)
 
 
 def test_cli_compile_ice(runner, echo, app):
@@ -347,6 +417,117 @@ def test_cli_compile_not_found_debug(runner, echo, app):
     assert e.exception.message() == 'Unknown compiler error'
 
 
+def test_cli_check(patch, runner, echo):
+    """
+    Ensures the check command checks stories
+    """
+    patch.object(App, 'check')
+    patch.object(click, 'style')
+    runner.invoke(Cli.check, [])
+    App.check.assert_called_with(os.getcwd(), ignored_path=None, ebnf=None,
+                                 entries=None, stage=None,
+                                 index=None, excluded=None)
+    click.style.assert_called_with('Script syntax passed!', fg='green')
+    click.echo.assert_called_with(click.style())
+
+
+@mark.parametrize('stage', ['parse', 'lower', 'semantics'])
+def test_cli_check_stage(patch, runner, echo, stage):
+    patch.object(App, 'check')
+    runner.invoke(Cli.check, ['/path', '--stage', stage, '-e', 'a.story'])
+    App.check.assert_called_with('/path', ignored_path=None, ebnf=None,
+                                 entries=['a.story'], stage=stage,
+                                 index=None, excluded=None)
+
+
+def test_cli_check_index(patch, runner, echo):
+    patch.object(App, 'check')
+    runner.invoke(Cli.check, ['/path', '--index', 'index.json', '--exclude',
+                              'vendor'])
+    App.check.assert_called_with('/path', ignored_path=None, ebnf=None,
+                                 entries=None, stage=None,
+                                 index='index.json', excluded=['vendor'])
+
+
+def test_cli_bench(patch, runner, echo):
+    patch.init(Benchmark)
+    patch.many(Benchmark, ['corpus', 'synthetic', 'report', 'dumps'])
+    runner.invoke(Cli.bench, [])
+    Benchmark.__init__.assert_called_with(repeat=3, ebnf=None)
+    Benchmark.corpus.assert_called_with(os.getcwd())
+    Benchmark.synthetic.assert_called_with(1000)
+    Benchmark.report.assert_called_with({'corpus': Benchmark.corpus(),
+                                         'synthetic': Benchmark.synthetic()},
+                                        imports=True)
+    Benchmark.dumps.assert_called_with(Benchmark.report())
+    click.echo.assert_called_with(Benchmark.dumps())
+
+
+def test_cli_bench_options(patch, runner, echo):
+    patch.init(Benchmark)
+    patch.many(Benchmark, ['corpus', 'synthetic', 'report', 'write'])
+    options = ['/stories', '--repeat', '5', '--no-synthetic', '--ebnf',
+               'grammar.ebnf', '-o', 'results.json', '--no-imports']
+    runner.invoke(Cli.bench, options)
+    Benchmark.__init__.assert_called_with(repeat=5, ebnf='grammar.ebnf')
+    Benchmark.report.assert_called_with({'corpus': Benchmark.corpus()},
+                                        imports=False)
+    Benchmark.synthetic.assert_not_called()
+    Benchmark.write.assert_called_with(Benchmark.report(), 'results.json')
+    click.echo.assert_not_called()
+
+
+def test_cli_bench_baseline(patch, runner, echo):
+    patch.init(Benchmark)
+    patch.many(Benchmark, ['corpus', 'synthetic', 'report', 'write', 'load',
+                           'compare'])
+    Benchmark.compare.return_value = {'corpus': {'lex': 1.25}}
+    runner.invoke(Cli.bench, ['-o', 'new.json', '--baseline', 'old.json'])
+    Benchmark.load.assert_called_with('old.json')
+    Benchmark.compare.assert_called_with(Benchmark.load(), Benchmark.report())
+    click.echo.assert_called_with('corpus lex: 1.25x', err=True)
+
+
+def test_cli_stages():
+    assert Cli.stages == Compiler.stages
+
+
+def test_cli_check_stage_invalid(patch, runner, echo):
+    patch.object(App, 'check')
+    e = runner.invoke(Cli.check, ['--stage', 'json'])
+    assert e.exit_code == 2
+    App.check.assert_not_called()
+
+
+def test_cli_check_error(patch, runner, echo):
+    patch.object(App, 'check')
+    patch.object(StoryError, 'message', return_value='error')
+    App.check.side_effect = StoryError(CompilerError(None), None)
+    e = runner.invoke(Cli.check, ['/path'])
+    assert e.exit_code == 1
+    click.echo.assert_called_with('error')
+
+
+def test_cli_check_ice(patch, runner, echo):
+    patch.object(App, 'check', side_effect=Exception('ICE'))
+    e = runner.invoke(Cli.check, ['/path'])
+    assert e.exit_code == 1
+    click.echo.assert_called_with((
+        'Internal error occured: ICE\n'
+        'Please report at https://github.com/storyscript/storyscript/issues'))
+
+
+def test_cli_check_client(patch, magic, runner, echo):
+    patch.object(App, 'check')
+    client = magic()
+    Client.connect.return_value = client
+    runner.invoke(Cli.check, ['/path', '--stage', 'parse'])
+    client.call.assert_called_with('check', path='/path', ignored_path=None,
+                                   ebnf=None, entries=None, stage='parse',
+                                   index=None, excluded=None)
+    App.check.assert_not_called()
+
+
 def test_cli_lex(patch, magic, runner, app, echo):
     """
     Ensures the lex command outputs lexer tokens
@@ -426,6 +607,113 @@ def test_cli_lex_not_found_debug(patch, runner, echo, app):
     assert e.exception.message() == 'Unknown compiler error'
 
 
+def test_cli_client(patch):
+    Client.connect.return_value = 'client'
+    assert Cli.client(False) == 'client'
+    assert Cli.client(True) is None
+
+
+def test_cli_parse_client(patch, magic, runner, echo, app):
+    """
+    Ensures the parse command uses the compile server when it's running
+    """
+    client = magic()
+    client.call.return_value = {'a.story': 'tree'}
+    Client.connect.return_value = client
+    runner.invoke(Cli.parse, ['/path', '--raw'])
+    client.call.assert_called_with('parse', path='/path', ignored_path=None,
+                                   ebnf=None, lower=False, raw=True)
+    App.parse.assert_not_called()
+    click.echo.assert_called_with('tree')
+
+
+def test_cli_compile_client(patch, magic, runner, echo, app):
+    client = magic()
+    Client.connect.return_value = client
+    runner.invoke(Cli.compile, ['/path', '-j'])
+    client.call.assert_called_with('compile', path='/path',
+                                   ignored_path=None, ebnf=None,
+                                   concise=False, first=False, entries=None,
+                                   index=None, excluded=None)
+    App.compile.assert_not_called()
+    click.echo.assert_called_with(client.call())
+
+
+def test_cli_compile_client_output_dir(patch, magic, runner, echo, app):
+    client = magic()
+    client.call.return_value = ['out/a.json']
+    Client.connect.return_value = client
+    runner.invoke(Cli.compile, ['/path', '--output-dir', 'out'])
+    client.call.assert_called_with('compile', path='/path', output_dir='out',
+                                   ignored_path=None, ebnf=None,
+                                   concise=False, entries=None,
+                                   index=None, excluded=None)
+    click.echo.assert_called_with('out/a.json')
+
+
+def test_cli_compile_client_error(patch, magic, runner, echo, app):
+    """
+    Ensures errors reported by the compile server are printed
+    """
+    client = magic()
+    client.call.side_effect = RemoteError(-32000, 'error')
+    Client.connect.return_value = client
+    e = runner.invoke(Cli.compile, ['/path'])
+    assert e.exit_code == 1
+    click.echo.assert_called_with('error')
+
+
+def test_cli_compile_debug_no_client(patch, runner, echo, app):
+    """
+    Ensures debugging doesn't use the compile server
+    """
+    runner.invoke(Cli.compile, ['/path', '--debug'])
+    Client.connect.assert_not_called()
+    assert App.compile.call_count == 1
+
+
+def test_cli_lex_client(patch, magic, runner, echo, app):
+    client = magic()
+    client.call.return_value = {'one.story': [['token', 'value']]}
+    Client.connect.return_value = client
+    runner.invoke(Cli.lex, ['/path'])
+    client.call.assert_called_with('lex', path='/path', ebnf=None)
+    click.echo.assert_called_with('0 token value')
+
+
+def test_cli_serve(patch, runner, echo):
+    patch.init(Server)
+    patch.object(Server, 'serve_socket')
+    patch.object(Client, 'socket_path', return_value='storyscript.sock')
+    runner.invoke(Cli.serve, [])
+    Server.serve_socket.assert_called_with('storyscript.sock')
+
+
+def test_cli_serve_socket(patch, runner, echo):
+    patch.init(Server)
+    patch.object(Server, 'serve_socket')
+    runner.invoke(Cli.serve, ['--socket', 'my.sock'])
+    Server.serve_socket.assert_called_with('my.sock')
+
+
+def test_cli_serve_error(patch, runner, echo):
+    patch.init(Server)
+    patch.object(Server, 'serve_socket')
+    patch.object(StoryError, 'echo')
+    Server.serve_socket.side_effect = StoryError(CompilerError(None), None)
+    e = runner.invoke(Cli.serve, ['--socket', 'my.sock'])
+    StoryError.echo.assert_called()
+    assert e.exit_code == 1
+
+
+def test_cli_serve_stdio(patch, runner):
+    patch.init(Server)
+    patch.many(Server, ['serve_socket', 'serve_stdio'])
+    runner.invoke(Cli.serve, ['--stdio'])
+    Server.serve_stdio.assert_called()
+    Server.serve_socket.assert_not_called()
+
+
 def test_cli_grammar(patch, runner, app, echo):
     patch.object(App, 'grammar')
     runner.invoke(Cli.grammar, [])
@@ -452,3 +740,104 @@ def test_cli_help(patch, runner, echo):
 def test_cli_version(patch, runner, echo):
     runner.invoke(Cli.version, [])
     click.echo.assert_called_with(version)
+
+
+def test_cli_compile_profile(patch, magic, runner, echo, app):
+    """
+    Ensures profiles are measured in-process and printed as a table
+    """
+    patch.init(Profile)
+    patch.object(Profile, 'use')
+    patch.object(Profile, 'table')
+    Client.connect.return_value = magic()
+    runner.invoke(Cli.compile, ['/path', '--profile', 'table'])
+    Client.connect.assert_not_called()
+    Profile.use.assert_called()
+    assert App.compile.call_count == 1
+    click.echo.assert_any_call(Profile.table(), err=True)
+
+
+def test_cli_compile_profile_json(patch, runner, echo, app):
+    patch.object(Profile, 'report', return_value={'stories': {}})
+    runner.invoke(Cli.compile, ['/path', '--profile', 'json'])
+    click.echo.assert_any_call('{\n  "stories": {}\n}', err=True)
+
+
+def test_cli_compile_profile_output_dir(patch, runner, echo, app):
+    patch.object(App, 'compile_shards', return_value=['out/a.json'])
+    patch.object(Profile, 'table')
+    runner.invoke(Cli.compile, ['--output-dir', 'out', '--profile', 'table'])
+    assert App.compile_shards.call_count == 1
+    click.echo.assert_any_call(Profile.table(), err=True)
+
+
+@mark.parametrize('options, measured', [
+    (['--cprofile', 'out.prof'], (None, 'out.prof', None)),
+    (['--tracemalloc', 'out.txt'], (None, None, 'out.txt')),
+])
+def test_cli_compile_measure(patch, magic, runner, echo, app, options,
+                             measured):
+    """
+    Ensures only the compilation is measured, in-process
+    """
+    patch.object(Cli, 'measure')
+    Client.connect.return_value = magic()
+    runner.invoke(Cli.compile, ['/path'] + options)
+    Client.connect.assert_not_called()
+    Cli.measure.assert_called_with(*measured)
+    Cli.measure().__enter__.assert_called()
+    assert App.compile.call_count == 1
+
+
+def test_cli_compile_measure_output_dir(patch, runner, echo, app):
+    patch.object(App, 'compile_shards', return_value=['out/a.json'])
+    patch.object(Cli, 'measure')
+    runner.invoke(Cli.compile, ['--output-dir', 'out', '--cprofile', 'p'])
+    Cli.measure.assert_called_with(None, 'p', None)
+    Cli.measure().__enter__.assert_called()
+
+
+def test_cli_measure(patch):
+    patch.many(Profile, ['use', 'cprofile', 'allocations'])
+    with Cli.measure('profiler', 'out.prof', 'out.txt'):
+        pass
+    Profile.use.assert_called_with('profiler')
+    Profile.cprofile.assert_called_with('out.prof')
+    Profile.allocations.assert_called_with('out.txt')
+
+
+def test_cli_measured(patch):
+    patch.many(Cli, ['measure', 'echo_profile'])
+    result = Cli.measured(lambda: 'compiled', 'profiler', 'table', 'p', 'a')
+    Cli.measure.assert_called_with('profiler', 'p', 'a')
+    Cli.echo_profile.assert_called_with('profiler', 'table')
+    assert result == 'compiled'
+
+
+def test_cli_compile_stories(patch, magic, app):
+    patch.object(Cli, 'measured')
+    options = {'ebnf': None}
+    result = Cli.compile_stories(None, '/path', True, (None,) * 4, options)
+    compile = Cli.measured.call_args[0][0]
+    compile()
+    App.compile.assert_called_with('/path', first=True, ebnf=None)
+    assert result == Cli.measured()
+
+
+def test_cli_compile_stories_client(magic):
+    client = magic()
+    result = Cli.compile_stories(client, '/path', False, (None,) * 4,
+                                 {'ebnf': None})
+    client.call.assert_called_with('compile', path='/path', first=False,
+                                   ebnf=None)
+    assert result == client.call()
+
+
+def test_cli_echo_results(echo):
+    Cli.echo_results('{}', True, None)
+    click.echo.assert_called_with('{}')
+
+
+def test_cli_echo_profile_none(echo):
+    Cli.echo_profile(None, None)
+    click.echo.assert_not_called()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import stat
+
+from pytest import fixture, mark, raises
+
+from storyscript.Client import Client, RemoteError
+from storyscript.Version import version
+
+
+@fixture
+def client(magic):
+    client = Client('storyscript.sock')
+    client.socket = magic()
+    client.reader = magic()
+    return client
+
+
+def test_remoteerror():
+    error = RemoteError(-32000, 'message')
+    assert error.code == -32000
+    assert error.message() == 'message'
+
+
+def test_client_init():
+    client = Client('storyscript.sock')
+    assert client.path == 'storyscript.sock'
+    assert client.socket is None
+    assert client.id == 0
+
+
+def test_client_socket_path(monkeypatch):
+    monkeypatch.setenv('STORYSCRIPT_SOCKET', 'my.sock')
+    assert Client.socket_path() == 'my.sock'
+
+
+def test_client_socket_path_default(monkeypatch):
+    monkeypatch.delenv('STORYSCRIPT_SOCKET', raising=False)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', '/run/user')
+    path = Client.socket_path()
+    assert path == f'/run/user/storyscript-{os.getuid()}.sock'
+
+
+def test_client_connect_no_server(tmpdir):
+    assert Client.connect(str(tmpdir.join('missing.sock'))) is None
+
+
+def test_client_trusted_missing(tmpdir):
+    assert Client.trusted(str(tmpdir.join('missing.sock'))) is False
+
+
+def test_client_trusted_not_socket(tmpdir):
+    path = tmpdir.join('storyscript.sock')
+    path.write('')
+    assert Client.trusted(str(path)) is False
+
+
+@mark.parametrize('uid, mode, expected', [
+    (1000, stat.S_IFSOCK | 0o600, True),
+    (1000, stat.S_IFSOCK | 0o700, True),
+    (1000, stat.S_IFSOCK | 0o666, False),
+    (1000, stat.S_IFSOCK | 0o620, False),
+    (0, stat.S_IFSOCK | 0o600, False),
+])
+def test_client_trusted(patch, magic, uid, mode, expected):
+    patch.object(os, 'stat', return_value=magic(st_uid=uid, st_mode=mode))
+    patch.object(os, 'getuid', return_value=1000)
+    assert Client.trusted('storyscript.sock') is expected
+    os.stat.assert_called_with('storyscript.sock')
+
+
+def test_client_connect_untrusted(patch):
+    patch.object(Client, 'trusted', return_value=False)
+    patch.object(Client, 'open')
+    assert Client.connect('storyscript.sock') is None
+    Client.open.assert_not_called()
+
+
+def test_client_connect(patch):
+    patch.object(Client, 'trusted', return_value=True)
+    patch.many(Client, ['open', 'close'])
+    patch.object(Client, 'call', return_value=version)
+    client = Client.connect('storyscript.sock')
+    Client.call.assert_called_with('version')
+    assert client.path == 'storyscript.sock'
+    Client.close.assert_not_called()
+
+
+def test_client_connect_other_version(patch):
+    """
+    Ensures servers of other versions are not used
+    """
+    patch.object(Client, 'trusted', return_value=True)
+    patch.many(Client, ['open', 'close'])
+    patch.object(Client, 'call', return_value='0.0.1-other')
+    assert Client.connect('storyscript.sock') is None
+    Client.close.assert_called()
+
+
+def test_client_connect_refused(patch):
+    patch.object(Client, 'trusted', return_value=True)
+    patch.object(Client, 'open', side_effect=ConnectionRefusedError())
+    assert Client.connect('storyscript.sock') is None
+
+
+def test_client_close(client):
+    socket = client.socket
+    client.close()
+    socket.close.assert_called()
+    assert client.socket is None
+    assert client.reader is None
+
+
+def test_client_call(client):
+    client.reader.readline.return_value = b'{"id": 1, "result": "a"}'
+    assert client.call('compile', path='a') == 'a'
+    request = json.loads(client.socket.sendall.call_args[0][0])
+    assert request == {'jsonrpc': '2.0', 'id': 1, 'method': 'compile',
+                       'params': {'path': 'a', 'cwd': os.getcwd()}}
+
+
+def test_client_call_error(client):
+    response = {'id': 1, 'error': {'code': -32000, 'message': 'error'}}
+    client.reader.readline.return_value = json.dumps(response).encode()
+    with raises(RemoteError) as e:
+        client.call('compile', path='a')
+    assert e.value.code == -32000
+    assert e.value.message() == 'error'
+
+
+def test_client_call_closed(client):
+    client.reader.readline.return_value = b''
+    with raises(ConnectionError):
+        client.call('version')
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+from storyscript.CompilationResult import StoryscriptCompilationResult
+
+
+def test_compilationresult_init():
+    result = StoryscriptCompilationResult('result', ['error'])
+    assert result.result() == 'result'
+    assert result.errors() == ['error']
+    assert result.warnings() == []
+    assert result.deprecations() == []
+    assert result.metrics() == {}
+
+
+def test_compilationresult_measured():
+    result = StoryscriptCompilationResult.from_result('result')
+    assert result.measured({'stories': 1}) is result
+    assert result.metrics() == {'stories': 1}
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+import io
+
+from pytest import fixture, raises
+
+from storyscript.Bundle import Bundle
+from storyscript.CompilerSession import CompilerSession
+from storyscript.Story import Story
+from storyscript.compiler.semantics.functions.MutationTable import \
+    MutationTable
+from storyscript.exceptions import StoryError
+
+
+@fixture
+def session(patch):
+    patch.object(MutationTable, 'init')
+    return CompilerSession(cache_size=2)
+
+
+@fixture
+def story():
+    """
+    A compiled story
+    """
+    return {'tree': {'1': {}}, 'services': ['alpine'], 'functions': {}}
+
+
+def test_compilersession_init(session):
+    MutationTable.init.assert_called_with(catalogues=None)
+    assert session.mutation_table == MutationTable.init()
+    assert session.cache_size == 2
+    assert len(session.cache) == 0
+
+
+def test_compilersession_init_catalogues(patch):
+    patch.object(MutationTable, 'init')
+    CompilerSession(catalogues=['engine.mutations'])
+    MutationTable.init.assert_called_with(catalogues=['engine.mutations'])
+
+
+def test_compilersession_key():
+    key = CompilerSession.key('a', 'b')
+    assert key == CompilerSession.key('a', 'b')
+    assert key != CompilerSession.key('ab')
+    assert key != CompilerSession.key('a', 'c')
+
+
+def test_compilersession_store(session):
+    session.store('a', 1)
+    session.store('b', 2)
+    assert session.cached('a') == 1
+    session.store('c', 3)
+    assert list(session.cache) == ['a', 'c']
+    assert session.cached('b') is None
+
+
+def test_compilersession_store_disabled(session):
+    session.cache_size = 0
+    session.store('a', 1)
+    assert session.cached('a') is None
+
+
+def test_compilersession_result(session):
+    story = {'tree': {}}
+    result = session.result(story).result()
+    assert result == story
+    assert result is not story
+
+
+def test_compilersession_result_error(session):
+    error = StoryError(None, None)
+    assert session.result(error).errors() == [error]
+
+
+def test_compilersession_process(patch, session):
+    patch.object(Story, 'process')
+    result = session.process(Story('a = 0'))
+    Story.process.assert_called_with(mutation_table=session.mutation_table)
+    assert result == Story.process()
+
+
+def test_compilersession_loads(patch, session, story):
+    patch.object(CompilerSession, 'process', return_value=story)
+    result = session.loads('a = 0')
+    assert result.result() == story
+    assert session.process.call_count == 1
+    assert session.loads('a = 0').result() == story
+    assert session.process.call_count == 1
+
+
+def test_compilersession_loads_metrics(patch, session, story):
+    patch.object(CompilerSession, 'process', return_value=story)
+    metrics = session.loads('a = 0').metrics()
+    assert metrics['cache_hits'] == 0
+    assert metrics['source_size'] == 5
+    assert metrics['stories'] == 1
+    assert metrics['output_lines'] == 1
+    cached = session.loads('a = 0').metrics()
+    assert cached['cache_hits'] == 1
+    assert cached['phases']['parse'] == 0
+    assert cached['output_lines'] == 1
+
+
+def test_compilersession_loads_metrics_no_cache(patch, session, story):
+    patch.object(CompilerSession, 'process', return_value=story)
+    session.cache_size = 0
+    assert session.loads('a = 0').metrics()['cache_hits'] is None
+
+
+def test_compilersession_loads_metrics_error(patch, session):
+    patch.object(CompilerSession, 'process',
+                 side_effect=StoryError(None, None))
+    metrics = session.loads('a =').metrics()
+    assert metrics['stories'] == 0
+    assert metrics['source_size'] == 3
+
+
+def test_compilersession_loads_error(patch, session):
+    """
+    Ensures story errors are cached too
+    """
+    error = StoryError(None, None)
+    patch.object(CompilerSession, 'process', side_effect=error)
+    assert session.loads('a =').errors() == [error]
+    assert session.loads('a =').errors() == [error]
+    assert session.process.call_count == 1
+
+
+def test_compilersession_loads_internal_error(patch, session):
+    patch.object(CompilerSession, 'process', side_effect=Exception('ICE'))
+    patch.object(StoryError, 'internal_error', return_value='ICE')
+    assert session.loads('a = 0').errors() == ['ICE']
+    assert len(session.cache) == 0
+
+
+def test_compilersession_loads_internal_error_debug(patch, session):
+    patch.object(CompilerSession, 'process', side_effect=Exception('ICE'))
+    with raises(Exception) as e:
+        session.loads('a = 0', debug=True)
+    assert str(e.value) == 'ICE'
+
+
+def test_compilersession_load(patch, session, story):
+    patch.object(CompilerSession, 'process', return_value=story)
+    stream = io.StringIO('a = 0')
+    stream.name = 'a.story'
+    result = session.load(stream)
+    assert result.result() == {'a.story': story, 'services': ['alpine']}
+    assert result.metrics()['services'] == 1
+
+
+def test_compilersession_load_unnamed(patch, session, story):
+    """
+    Ensures streams without a name can be loaded, like with Api.load
+    """
+    patch.object(CompilerSession, 'process', return_value=story)
+    result = session.load(io.StringIO('a = 0'))
+    assert result.result() == {'<stream>': story, 'services': ['alpine']}
+
+
+def test_compilersession_load_map(patch, session):
+    patch.object(Bundle, 'bundle', return_value={'stories': {}})
+    files = {'a.story': 'a = 0'}
+    result = session.load_map(files)
+    assert result.result() == {'stories': {}}
+    assert result.metrics()['source_size'] == 5
+    Bundle.bundle.assert_called_with(mutation_table=session.mutation_table)
+    session.load_map(files)
+    assert Bundle.bundle.call_count == 1
+
+
+def test_compilersession_load_map_disk_imports(patch, session):
+    """
+    Ensures bundles which imported stories from the disk are not cached
+    """
+    def bundle(self, **kwargs):
+        self.story_files['b.story'] = 'b = 0'
+        return {'stories': {}}
+
+    patch.object(Bundle, 'bundle', side_effect=bundle, autospec=True)
+    files = {'a.story': "import 'b' as b"}
+    session.load_map(files)
+    session.load_map(files)
+    assert Bundle.bundle.call_count == 2
+    assert files == {'a.story': "import 'b' as b"}
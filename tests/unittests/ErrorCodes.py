@@ -57,3 +57,8 @@ def test_errorcodes_is_error_string():
 def test_errorcodes_get_error():
     ErrorCodes.mock = 'value'
     assert ErrorCodes.get_error('mock') == 'value'
+
+
+def test_errorcodes_get_name():
+    assert ErrorCodes.get_name(ErrorCodes.service_name) == 'service_name'
+    assert ErrorCodes.get_name(('E9999', 'unknown')) is None
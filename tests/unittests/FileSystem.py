@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import tarfile
+import zipfile
+
+from pytest import fixture, mark, raises
+
+from storyscript.FileSystem import ArchiveFileSystem, FileSystem, \
+    LocalFileSystem, MemoryFileSystem, TarFileSystem, ZipFileSystem
+from storyscript.Scanner import Scanner
+from storyscript.Story import Story
+from storyscript.exceptions import StoryError
+
+
+files = {'a.story': "import 'lib/b' as b", 'lib/b.story': 'x = 0',
+         'README.md': 'readme'}
+
+
+@fixture
+def zip_archive(tmpdir):
+    path = str(tmpdir.join('release.zip'))
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('lib/', '')
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return path
+
+
+@fixture
+def tar_archive(tmpdir):
+    path = str(tmpdir.join('release.tar.gz'))
+    with tarfile.open(path, 'w:gz') as archive:
+        archive.addfile(tarfile.TarInfo('lib'))
+        for name, content in files.items():
+            data = content.encode('utf8')
+            info = tarfile.TarInfo(f'./{name}')
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+@mark.parametrize('path, archive', [
+    ('release.zip', 'zip'),
+    ('release.tar', 'tar'),
+    ('release.tar.gz', 'tar'),
+    ('release.TGZ', 'tar'),
+    ('release.tar.bz2', 'tar'),
+    ('release.tar.xz', 'tar'),
+    ('release.story', None),
+    ('release', None),
+])
+def test_filesystem_archive_type(path, archive):
+    assert FileSystem.archive_type(path) == archive
+
+
+def test_filesystem_from_path(zip_archive, tar_archive):
+    assert isinstance(FileSystem.from_path(zip_archive), ZipFileSystem)
+    assert isinstance(FileSystem.from_path(tar_archive), TarFileSystem)
+    assert isinstance(FileSystem.from_path('.'), LocalFileSystem)
+
+
+def test_filesystem_from_path_local():
+    filesystem = FileSystem.from_path('dir', excluded=['vendor'],
+                                      index='index.json')
+    assert filesystem.path == 'dir'
+    assert filesystem.excluded == ['vendor']
+    assert filesystem.index == 'index.json'
+
+
+def test_localfilesystem_init():
+    filesystem = LocalFileSystem()
+    assert filesystem.path == '.'
+    assert filesystem.excluded is None
+    assert filesystem.index is None
+
+
+def test_localfilesystem_stories(patch):
+    patch.object(os.path, 'isdir', return_value=True)
+    patch.init(Scanner)
+    patch.object(Scanner, 'scan')
+    filesystem = LocalFileSystem('dir', excluded=['vendor'],
+                                 index='index.json')
+    result = filesystem.stories(ignores=['a.story'])
+    Scanner.__init__.assert_called_with(ignores=['a.story'],
+                                        excluded=['vendor'],
+                                        index='index.json')
+    Scanner.scan.assert_called_with('dir')
+    assert result == Scanner.scan()
+
+
+def test_localfilesystem_stories_file(patch):
+    """
+    Ensures a file is a story on its own
+    """
+    patch.object(os.path, 'isdir', return_value=False)
+    assert LocalFileSystem('a.story').stories() == ['a.story']
+
+
+def test_filesystem_from_path_missing_archive():
+    """
+    Ensures paths which only look like archives are read from the disk
+    """
+    assert isinstance(FileSystem.from_path('missing.zip'), LocalFileSystem)
+
+
+def test_localfilesystem_read(patch):
+    patch.object(Story, 'read')
+    result = LocalFileSystem().read('a.story')
+    Story.read.assert_called_with('a.story')
+    assert result == Story.read()
+
+
+def test_localfilesystem_normalize(patch):
+    patch.object(os.path, 'relpath')
+    result = LocalFileSystem().normalize('./a.story')
+    os.path.relpath.assert_called_with('./a.story')
+    assert result == os.path.relpath()
+
+
+def test_memoryfilesystem_init():
+    assert MemoryFileSystem().files == {}
+    assert MemoryFileSystem(files).files == files
+
+
+def test_memoryfilesystem_read():
+    assert MemoryFileSystem(files).read('lib/b.story') == 'x = 0'
+
+
+def test_memoryfilesystem_read_missing():
+    with raises(StoryError) as e:
+        MemoryFileSystem(files).read('c.story')
+    assert e.value.error.error == 'file_not_found'
+
+
+def test_memoryfilesystem_stories():
+    filesystem = MemoryFileSystem(files)
+    assert filesystem.stories() == ['a.story', 'lib/b.story']
+    assert filesystem.stories(ignores=['a.story']) == ['lib/b.story']
+
+
+def test_memoryfilesystem_normalize():
+    assert MemoryFileSystem().normalize('./lib/../a.story') == 'a.story'
+
+
+def test_archivefilesystem_add():
+    filesystem = ArchiveFileSystem('release.zip')
+    filesystem.add('./lib/b.story', b'x = 0')
+    assert filesystem.files == {'lib/b.story': 'x = 0'}
+
+
+def test_archivefilesystem_add_invalid_utf8():
+    with raises(StoryError) as e:
+        ArchiveFileSystem('release.zip').add('lib/b.story', b'x = \xff')
+    assert e.value.error.error == 'unicode_decode_error'
+    assert '`lib/b.story` in `release.zip`' in e.value.short_message()
+
+
+def test_zipfilesystem(zip_archive):
+    filesystem = ZipFileSystem(zip_archive)
+    assert filesystem.path == zip_archive
+    assert filesystem.files == {'a.story': "import 'lib/b' as b",
+                                'lib/b.story': 'x = 0'}
+
+
+def test_tarfilesystem(tar_archive):
+    filesystem = TarFileSystem(tar_archive)
+    assert filesystem.path == tar_archive
+    assert filesystem.files == {'a.story': "import 'lib/b' as b",
+                                'lib/b.story': 'x = 0'}
+
+
+def test_tarfilesystem_invalid_utf8(tmpdir):
+    path = str(tmpdir.join('release.tar'))
+    with tarfile.open(path, 'w') as archive:
+        info = tarfile.TarInfo('a.story')
+        info.size = 1
+        archive.addfile(info, io.BytesIO(b'\xff'))
+    with raises(StoryError) as e:
+        TarFileSystem(path)
+    assert e.value.error.error == 'unicode_decode_error'
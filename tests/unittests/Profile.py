@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+import cProfile
+import pstats
+import time
+import tracemalloc
+from unittest import mock
+
+from lark.lexer import Token
+
+from pytest import fixture, raises
+
+from storyscript.Profile import Profile
+from storyscript.parser import Tree
+
+
+@fixture
+def profile():
+    return Profile(memory=False)
+
+
+@fixture
+def record():
+    return {'read': 0, 'parse': 0.5, 'lower': 1, 'semantics': 0, 'json': 0,
+            'nodes': 10, 'lowered_nodes': 5, 'fake_lines': 2,
+            'template_parses': 1, 'peak_memory': 2048}
+
+
+def test_profile_init():
+    profile = Profile()
+    assert profile.memory is True
+    assert profile.stories == {}
+    assert profile.names == []
+    assert profile.depth == 0
+
+
+def test_profile_current():
+    assert Profile.current() is None
+
+
+def test_profile_use(profile):
+    with Profile.use(profile):
+        assert Profile.current() is profile
+    assert Profile.current() is None
+
+
+def test_profile_use_none(profile):
+    with Profile.use(profile):
+        with Profile.use(None):
+            assert Profile.current() is profile
+
+
+def test_profile_use_error(profile):
+    with raises(ValueError):
+        with Profile.use(profile):
+            raise ValueError()
+    assert Profile.current() is None
+
+
+def test_profile_use_memory(patch):
+    patch.many(tracemalloc, ['start', 'stop'])
+    patch.object(tracemalloc, 'is_tracing', return_value=False)
+    with Profile.use(Profile()):
+        tracemalloc.start.assert_called()
+    tracemalloc.stop.assert_called()
+
+
+def test_profile_use_memory_tracing(patch):
+    """
+    Ensures memory that's already traced is left traced
+    """
+    patch.many(tracemalloc, ['start', 'stop'])
+    patch.object(tracemalloc, 'is_tracing', return_value=True)
+    with Profile.use(Profile()):
+        pass
+    tracemalloc.start.assert_not_called()
+    tracemalloc.stop.assert_not_called()
+
+
+def test_profile_use_no_memory(patch, profile):
+    patch.object(tracemalloc, 'start')
+    with Profile.use(profile):
+        pass
+    tracemalloc.start.assert_not_called()
+
+
+def test_profile_cprofile(patch):
+    patch.init(cProfile.Profile)
+    patch.many(cProfile.Profile, ['enable', 'disable', 'dump_stats'])
+    with Profile.cprofile('out.prof') as profiler:
+        assert isinstance(profiler, cProfile.Profile)
+        profiler.enable.assert_called()
+    profiler.disable.assert_called()
+    profiler.dump_stats.assert_called_with('out.prof')
+
+
+def test_profile_cprofile_stats(tmpdir):
+    """
+    Ensures the stats can be read by pstats
+    """
+    path = str(tmpdir.join('out.prof'))
+    with Profile.cprofile(path):
+        sorted(range(10))
+    stats = pstats.Stats(path)
+    assert any('sorted' in function for _, _, function in stats.stats)
+
+
+def test_profile_cprofile_none(patch):
+    patch.init(cProfile.Profile)
+    with Profile.cprofile(None) as profiler:
+        assert profiler is None
+    cProfile.Profile.__init__.assert_not_called()
+
+
+def test_profile_allocations(tmpdir):
+    path = tmpdir.join('out.txt')
+    with Profile.allocations(str(path), limit=3):
+        kept = [str(i) * 100 for i in range(1000)]
+    lines = path.read().splitlines()
+    assert 0 < len(lines) <= 3
+    assert lines[0].startswith(__file__)
+    assert len(kept) == 1000
+    assert tracemalloc.is_tracing() is False
+
+
+def test_profile_allocations_tracing(patch, tmpdir):
+    """
+    Ensures memory that's already traced is left traced
+    """
+    tracemalloc.start()
+    try:
+        with Profile.allocations(str(tmpdir.join('out.txt'))):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_profile_allocations_none(patch):
+    patch.object(tracemalloc, 'start')
+    with Profile.allocations(None):
+        pass
+    tracemalloc.start.assert_not_called()
+
+
+def test_profile_record(profile):
+    record = profile.record()
+    assert profile.stories == {'<string>': record}
+    assert record['parse'] == 0
+    assert record['fake_lines'] == 0
+    assert record['peak_memory'] == 0
+    assert profile.record() is record
+
+
+def test_profile_story(profile):
+    with Profile.use(profile):
+        with Profile.story('a.story'):
+            assert profile.names == ['a.story']
+            with Profile.story('b.story'):
+                Profile.count('fake_lines')
+            Profile.count('fake_lines', 2)
+        assert profile.names == []
+    assert profile.stories['a.story']['fake_lines'] == 2
+    assert profile.stories['b.story']['fake_lines'] == 1
+
+
+def test_profile_story_no_profile():
+    with Profile.story('a.story'):
+        pass
+
+
+def test_profile_phase(patch, profile):
+    patch.object(time, 'perf_counter', side_effect=[1, 3])
+    with Profile.use(profile):
+        with Profile.phase('parse'):
+            assert profile.depth == 1
+    assert profile.depth == 0
+    assert profile.stories['<string>']['parse'] == 2
+
+
+def test_profile_phase_nested(patch, profile):
+    """
+    Ensures phases inside a phase are counted as part of the outer phase
+    """
+    patch.object(time, 'perf_counter', side_effect=[1, 5])
+    with Profile.use(profile):
+        with Profile.phase('lower'):
+            with Profile.phase('parse'):
+                pass
+    assert profile.stories['<string>']['lower'] == 4
+    assert profile.stories['<string>']['parse'] == 0
+
+
+def test_profile_phase_error(profile):
+    with Profile.use(profile):
+        with raises(ValueError):
+            with Profile.phase('parse'):
+                raise ValueError()
+    assert profile.depth == 0
+    assert profile.stories['<string>']['parse'] > 0
+
+
+def test_profile_reset_peak(patch, monkeypatch):
+    monkeypatch.setattr(tracemalloc, 'reset_peak', mock.Mock(),
+                        raising=False)
+    patch.many(tracemalloc, ['start', 'stop'])
+    assert Profile.reset_peak() is True
+    tracemalloc.reset_peak.assert_called()
+    tracemalloc.stop.assert_not_called()
+
+
+def test_profile_reset_peak_unsupported(patch, monkeypatch):
+    """
+    Ensures tracing isn't restarted before Python 3.9, which would forget
+    the traces of snapshots
+    """
+    monkeypatch.delattr(tracemalloc, 'reset_peak', raising=False)
+    patch.many(tracemalloc, ['start', 'stop'])
+    assert Profile.reset_peak() is False
+    tracemalloc.stop.assert_not_called()
+    tracemalloc.start.assert_not_called()
+
+
+def test_profile_phase_memory(patch):
+    patch.many(tracemalloc, ['start', 'stop'])
+    patch.object(Profile, 'reset_peak', return_value=True)
+    patch.object(tracemalloc, 'is_tracing', return_value=True)
+    patch.object(tracemalloc, 'get_traced_memory',
+                 side_effect=[(50, 50), (100, 100), (150, 400)])
+    profile = Profile()
+    with Profile.use(profile):
+        assert profile.traced == 50
+        with Profile.phase('parse'):
+            pass
+    Profile.reset_peak.assert_called()
+    assert profile.stories['<string>']['peak_memory'] == 300
+
+
+def test_profile_phase_memory_cumulative(patch):
+    """
+    Ensures the peak since the profile started tracing is reported when the
+    peak can't be reset
+    """
+    patch.many(tracemalloc, ['start', 'stop'])
+    patch.object(Profile, 'reset_peak', return_value=False)
+    patch.object(tracemalloc, 'is_tracing', return_value=True)
+    patch.object(tracemalloc, 'get_traced_memory',
+                 side_effect=[(50, 50), (150, 400)])
+    profile = Profile()
+    with Profile.use(profile):
+        with Profile.phase('parse'):
+            pass
+    assert profile.stories['<string>']['peak_memory'] == 350
+
+
+def test_profile_phase_allocations(tmpdir):
+    """
+    Ensures profiling phases keeps the traces of the allocations snapshot
+    """
+    path = str(tmpdir.join('allocations.txt'))
+    with Profile.use(Profile()), Profile.allocations(path):
+        with Profile.phase('parse'):
+            data = [str(i) * 10 for i in range(10000)]
+    assert tracemalloc.is_tracing() is False
+    with open(path) as f:
+        assert f.read() != ''
+    assert len(data) == 10000
+
+
+def test_profile_phase_no_profile():
+    with Profile.phase('parse'):
+        pass
+
+
+def test_profile_count_no_profile():
+    Profile.count('fake_lines')
+
+
+def test_profile_count_nodes(profile):
+    tree = Tree('start', [Tree('block', [Token('NAME', 'a')]),
+                          Tree('block', [])])
+    with Profile.use(profile):
+        Profile.count_nodes('nodes', tree)
+    assert profile.stories['<string>']['nodes'] == 4
+
+
+def test_profile_count_nodes_no_profile(magic):
+    tree = magic()
+    Profile.count_nodes('nodes', tree)
+    assert tree.children.__iter__.call_count == 0
+
+
+def test_profile_totals(profile, record):
+    other = {**record, 'parse': 1.5, 'peak_memory': 1024}
+    profile.stories = {'a.story': record, 'b.story': other}
+    totals = profile.totals()
+    assert totals['parse'] == 2
+    assert totals['nodes'] == 20
+    assert totals['peak_memory'] == 2048
+
+
+def test_profile_metrics(profile, record):
+    profile.stories = {'a.story': record}
+    story = {'tree': {'1': {}, '2': {}}, 'services': ['alpine'],
+             'functions': {'f': '1'}}
+    stories = {'a.story': story, 'b.story': {**story, 'functions': {}}}
+    metrics = profile.metrics(['ab', 'c'], stories)
+    assert metrics == {
+        'phases': {'read': 0, 'parse': 0.5, 'lower': 1, 'semantics': 0,
+                   'json': 0},
+        'source_size': 3,
+        'nodes': 10,
+        'lowered_nodes': 5,
+        'stories': 2,
+        'output_lines': 4,
+        'services': 1,
+        'functions': 1,
+        'cache_hits': None,
+    }
+
+
+def test_profile_metrics_baseline(profile, record):
+    """
+    Ensures only the measurements since the baseline are counted
+    """
+    baseline = profile.totals()
+    profile.stories = {'a.story': record}
+    metrics = profile.metrics([], {}, baseline=baseline, cache_hits=1)
+    assert metrics['nodes'] == 10
+    baseline = profile.totals()
+    assert profile.metrics([], {}, baseline=baseline)['nodes'] == 0
+    assert metrics['cache_hits'] == 1
+
+
+def test_profile_metrics_trees(profile):
+    """
+    Ensures stories that weren't compiled to JSON aren't counted
+    """
+    metrics = profile.metrics(['a'], {'a.story': Tree('start', [])})
+    assert metrics['stories'] == 0
+    assert metrics['output_lines'] == 0
+
+
+def test_profile_report(patch, profile):
+    patch.object(Profile, 'totals')
+    assert profile.report() == {'stories': {}, 'totals': Profile.totals()}
+
+
+def test_profile_table(profile, record):
+    profile.stories = {'a.story': record}
+    lines = profile.table().split('\n')
+    assert lines[0].split() == ['story', 'read', 'parse', 'lower',
+                                'semantics', 'json', 'nodes', 'lowered',
+                                'fake', 'templates', 'peak', 'kB']
+    assert lines[1].split() == ['a.story', '0.0', '500.0', '1000.0', '0.0',
+                                '0.0', '10', '5', '2', '1', '2']
+    assert lines[2].split()[0] == 'total'
+    assert len(set(len(line) for line in lines)) == 1
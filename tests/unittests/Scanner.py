@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+from pytest import fixture
+
+from storyscript.Scanner import Scanner
+
+
+@fixture
+def tree(tmpdir, monkeypatch):
+    """
+    Creates a directory tree with stories and changes into it.
+    """
+    tmpdir = tmpdir.mkdir('project')
+    tmpdir.join('a.story').write('a = 0')
+    tmpdir.join('b.txt').write('b')
+    tmpdir.mkdir('sub').join('c.story').write('c = 0')
+    tmpdir.join('sub').mkdir('deep').join('d.story').write('d = 0')
+    tmpdir.mkdir('node_modules').join('e.story').write('e = 0')
+    tmpdir.mkdir('.git').join('f.story').write('f = 0')
+    monkeypatch.chdir(tmpdir)
+    return tmpdir
+
+
+def test_scanner_init():
+    scanner = Scanner()
+    assert scanner.ignores == set()
+    assert scanner.excluded == set()
+    assert scanner.index_path is None
+    assert scanner.index == {}
+
+
+def test_scanner_init_excluded():
+    scanner = Scanner(ignores=['a.story'], excluded=['build'])
+    assert scanner.ignores == {'a.story'}
+    assert scanner.excluded == {'build'}
+
+
+def test_scanner_join():
+    assert Scanner.join('.', 'a.story') == 'a.story'
+    assert Scanner.join('dir', 'a.story') == os.path.join('dir', 'a.story')
+
+
+def test_scanner_scan(tree):
+    """
+    Ensures no directory is excluded by default
+    """
+    result = Scanner().scan('.')
+    assert result == ['a.story', os.path.join('.git', 'f.story'),
+                      os.path.join('node_modules', 'e.story'),
+                      os.path.join('sub', 'c.story'),
+                      os.path.join('sub', 'deep', 'd.story')]
+
+
+def test_scanner_scan_subdirectory(tree):
+    result = Scanner().scan('sub')
+    assert result == [os.path.join('sub', 'c.story'),
+                      os.path.join('sub', 'deep', 'd.story')]
+
+
+def test_scanner_scan_absolute(tree):
+    result = Scanner().scan(str(tree.join('sub')))
+    assert result == [os.path.join('sub', 'c.story'),
+                      os.path.join('sub', 'deep', 'd.story')]
+
+
+def test_scanner_scan_ignores(tree):
+    ignores = ['a.story', os.path.join('sub', 'deep', '')]
+    result = Scanner(ignores=ignores,
+                     excluded=['.git', 'node_modules']).scan('.')
+    assert result == [os.path.join('sub', 'c.story')]
+
+
+def test_scanner_scan_excluded(tree):
+    result = Scanner(excluded=['sub']).scan('.')
+    assert result == ['a.story', os.path.join('.git', 'f.story'),
+                      os.path.join('node_modules', 'e.story')]
+
+
+def test_scanner_load_index_missing(tmpdir):
+    assert Scanner.load_index(str(tmpdir.join('index.json'))) == {}
+
+
+def test_scanner_load_index_outdated(tmpdir):
+    index = tmpdir.join('index.json')
+    index.write(json.dumps({'version': 0, 'directories': {'a': []}}))
+    assert Scanner.load_index(str(index)) == {}
+
+
+def test_scanner_load_index_invalid(tmpdir):
+    index = tmpdir.join('index.json')
+    index.write('{')
+    assert Scanner.load_index(str(index)) == {}
+
+
+def test_scanner_scan_index(patch, tree):
+    index = str(tree.dirpath('index.json'))
+    result = Scanner(index=index).scan('.')
+    saved = json.loads(tree.dirpath('index.json').read())
+    assert saved['version'] == Scanner.index_version
+    assert sorted(saved['directories']) == [
+        str(tree), str(tree.join('.git')), str(tree.join('node_modules')),
+        str(tree.join('sub')), str(tree.join('sub', 'deep'))]
+
+    # unchanged directories are not listed again
+    patch.object(Scanner, 'list_directory')
+    assert Scanner(index=index).scan('.') == result
+    Scanner.list_directory.assert_not_called()
+
+
+def test_scanner_scan_index_modified(tree):
+    index = str(tree.dirpath('index.json'))
+    Scanner(index=index).scan('.')
+    deep = tree.join('sub', 'deep')
+    deep.join('g.story').write('g = 0')
+    os.utime(str(deep), ns=(0, 0))
+    result = Scanner(index=index).scan('sub')
+    assert result == [os.path.join('sub', 'c.story'),
+                      os.path.join('sub', 'deep', 'd.story'),
+                      os.path.join('sub', 'deep', 'g.story')]
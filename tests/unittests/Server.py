@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import stat
+import threading
+
+from pytest import fixture, mark, raises
+
+from storyscript.App import App
+from storyscript.Server import Server, Writer
+from storyscript.Story import Story
+from storyscript.Version import version
+from storyscript.exceptions import CompilerError, StoryError
+
+
+@fixture
+def server():
+    return Server()
+
+
+def request(method, params=None, id=1):
+    request = {'jsonrpc': '2.0', 'id': id, 'method': method}
+    if params is not None:
+        request['params'] = params
+    return json.dumps(request)
+
+
+def test_server_init(server):
+    assert sorted(server.methods) == ['check', 'compile', 'lex', 'parse',
+                                      'version']
+
+
+def test_server_warm(patch):
+    patch.init(Story)
+    patch.object(Story, 'process')
+    Server.warm()
+    Story.__init__.assert_called_with('a = 0')
+    Story.process.assert_called()
+
+
+def test_server_compile(patch):
+    patch.object(App, 'compile')
+    result = Server.compile('path', entries=['a.story'], index='index.json')
+    App.compile.assert_called_with('path', ignored_path=None, ebnf=None,
+                                   concise=False, first=False,
+                                   entries=['a.story'], index='index.json',
+                                   excluded=None)
+    assert result == App.compile()
+
+
+def test_server_compile_output_dir(patch):
+    patch.object(App, 'compile_shards')
+    result = Server.compile('path', output_dir='out')
+    App.compile_shards.assert_called_with('path', 'out', ignored_path=None,
+                                          ebnf=None, concise=False,
+                                          entries=None, index=None,
+                                          excluded=None)
+    assert result == App.compile_shards()
+
+
+def test_server_parse(patch, magic):
+    tree = magic()
+    patch.object(App, 'parse', return_value={'a.story': tree})
+    assert Server.parse('path') == {'a.story': tree.pretty()}
+    App.parse.assert_called_with('path', ignored_path=None, ebnf=None,
+                                 lower=False)
+
+
+def test_server_parse_raw(patch):
+    patch.object(App, 'parse', return_value={'a.story': 'tree'})
+    assert Server.parse('path', raw=True) == {'a.story': 'tree'}
+
+
+def test_server_lex(patch, magic):
+    token = magic(type='NAME', value='a')
+    patch.object(App, 'lex', return_value={'a.story': [token]})
+    assert Server.lex('path') == {'a.story': [['NAME', 'a']]}
+    App.lex.assert_called_with('path', ebnf=None)
+
+
+def test_server_check(patch):
+    patch.object(App, 'check')
+    assert Server.check('path') is True
+    App.check.assert_called_with('path', ignored_path=None, ebnf=None,
+                                 entries=None, stage=None, index=None,
+                                 excluded=None)
+
+
+def test_server_check_stage(patch):
+    patch.object(App, 'check')
+    assert Server.check('path', stage='parse', excluded=['vendor']) is True
+    App.check.assert_called_with('path', ignored_path=None, ebnf=None,
+                                 entries=None, stage='parse', index=None,
+                                 excluded=['vendor'])
+
+
+def test_server_version():
+    assert Server.version() == version
+
+
+def test_server_call(server, magic, tmpdir):
+    server.methods['version'] = magic()
+    cwd = os.getcwd()
+    result = server.call('version', {'a': 1}, cwd=str(tmpdir))
+    server.methods['version'].assert_called_with(a=1)
+    assert result == server.methods['version']()
+    assert os.getcwd() == cwd
+
+
+def test_server_call_worker(server):
+    """
+    Ensures methods run on the same thread, whichever thread calls them
+    """
+    server.methods['version'] = threading.get_ident
+    idents = []
+
+    def call():
+        idents.append(server.call('version', {}))
+
+    threads = [threading.Thread(target=call) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert idents[0] == idents[1]
+    assert idents[0] != threading.get_ident()
+
+
+def test_server_call_cwd(server, tmpdir):
+    """
+    Ensures methods run in the working directory of the client
+    """
+    server.methods['version'] = os.getcwd
+    assert server.call('version', {}, cwd=str(tmpdir)) == str(tmpdir)
+
+
+def test_server_handle(server):
+    response = server.handle(request('version'))
+    assert response == {'jsonrpc': '2.0', 'id': 1, 'result': version}
+
+
+def test_server_handle_parse_error(server):
+    response = server.handle('{')
+    assert response['error']['code'] == Server.parse_error
+    assert response['id'] is None
+
+
+def test_server_handle_invalid_request(server):
+    response = server.handle('[]')
+    assert response['error']['code'] == Server.invalid_request
+
+
+def test_server_handle_method_not_found(server):
+    response = server.handle(request('unknown'))
+    assert response['error']['code'] == Server.method_not_found
+
+
+def test_server_handle_invalid_params(server):
+    response = server.handle(request('version', params={'path': 'a'}))
+    assert response['error']['code'] == Server.invalid_params
+    response = server.handle(request('version', params=[]))
+    assert response['error']['code'] == Server.invalid_params
+
+
+def test_server_handle_story_error(patch, server):
+    error = StoryError(CompilerError('file_not_found',
+                                     format={'path': 'a', 'abspath': 'a'}),
+                       None)
+    patch.object(App, 'compile', side_effect=error)
+    response = server.handle(request('compile', params={'path': 'a'}))
+    assert response['error'] == {'code': Server.story_error,
+                                 'message': error.message()}
+
+
+def test_server_handle_internal_error(patch, server):
+    patch.object(App, 'compile', side_effect=Exception('ICE'))
+    response = server.handle(request('compile', params={'path': 'a'}))
+    assert response['error']['code'] == Server.internal_error
+    assert response['error']['message'].startswith(
+        'Internal error occured: ICE')
+
+
+def test_server_serve_stream(server):
+    reader = io.StringIO(request('version') + '\n\n' + request('x', id=2))
+    writer = io.StringIO()
+    server.serve_stream(reader, writer)
+    lines = writer.getvalue().splitlines()
+    assert json.loads(lines[0])['result'] == version
+    assert json.loads(lines[1])['id'] == 2
+    assert len(lines) == 2
+
+
+def test_server_listening(tmpdir):
+    assert Server.listening(str(tmpdir.join('missing.sock'))) is False
+
+
+def test_server_remove_stale_missing(patch, tmpdir):
+    patch.object(os, 'remove')
+    Server.remove_stale(str(tmpdir.join('missing.sock')))
+    os.remove.assert_not_called()
+
+
+def test_server_remove_stale(patch, magic):
+    patch.object(os, 'lstat', return_value=magic(st_mode=stat.S_IFSOCK))
+    patch.object(os, 'remove')
+    patch.object(Server, 'listening', return_value=False)
+    Server.remove_stale('path')
+    Server.listening.assert_called_with('path')
+    os.remove.assert_called_with('path')
+
+
+@mark.parametrize('mode, listening', [
+    (stat.S_IFSOCK, True),
+    (stat.S_IFREG, False),
+])
+def test_server_remove_stale_in_use(patch, magic, mode, listening):
+    patch.object(os, 'lstat', return_value=magic(st_mode=mode))
+    patch.object(os, 'remove')
+    patch.object(Server, 'listening', return_value=listening)
+    with raises(StoryError) as e:
+        Server.remove_stale('path')
+    assert e.value.error.error == 'socket_in_use'
+    os.remove.assert_not_called()
+
+
+def test_server_unix_server_umask(patch, server, tmpdir):
+    """
+    Ensures the socket is private from the start
+    """
+    patch.object(Server, 'remove_stale')
+    patch.object(os, 'umask', return_value=0o22)
+    unix_server = server.unix_server(str(tmpdir.join('storyscript.sock')))
+    unix_server.server_close()
+    assert os.umask.call_args_list[0][0] == (0o177,)
+    os.umask.assert_called_with(0o22)
+
+
+def test_server_writer():
+    stream = io.BytesIO()
+    Writer(stream).write('ä')
+    assert stream.getvalue() == 'ä'.encode('utf8')
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+from pytest import fixture, mark, raises
+
+from storyscript.Shards import Shards
+from storyscript.exceptions import StoryError
+
+
+@fixture
+def bundle():
+    return {
+        'entrypoint': ['a.story'],
+        'services': ['alpine'],
+        'stories': {
+            'a.story': {'tree': {'1': {}}, 'services': ['alpine'],
+                        'modules': {'b': 'b'}},
+            'b.story': {'tree': {}, 'services': [], 'modules': {}},
+        }
+    }
+
+
+@fixture
+def shards(tmpdir):
+    return Shards(str(tmpdir.join('out')))
+
+
+def read(shards, name):
+    with open(os.path.join(shards.directory, name)) as f:
+        return f.read()
+
+
+@mark.parametrize('story, name', [
+    ('a.story', 'shards/a.json'),
+    ('./dir/a.story', 'shards/dir/a.json'),
+    ('/abs/a.story', 'shards/abs/a.json'),
+    ('../a.story', 'shards/__/a.json'),
+    ('a', 'shards/a.json'),
+    ('manifest.story', 'shards/manifest.json'),
+])
+def test_shards_shard_name(story, name):
+    assert Shards.shard_name(story) == name
+
+
+def test_shards_shard_names(shards):
+    names = shards.shard_names(['a.story', 'dir/a.story'])
+    assert names == {'a.story': 'shards/a.json',
+                     'dir/a.story': 'shards/dir/a.json'}
+
+
+@mark.parametrize('first, second, name', [
+    ('a', 'a.story', 'shards/a.json'),
+    ('/abs/a.story', 'abs/a.story', 'shards/abs/a.json'),
+])
+def test_shards_shard_names_conflict(shards, first, second, name):
+    with raises(StoryError) as e:
+        shards.shard_names([first, second])
+    assert e.value.error.error == 'shard_conflict'
+    assert e.value.error.message() == (
+        f'Stories `{first}` and `{second}` would both be written to '
+        f'`{name}`.')
+
+
+def test_shards_digest():
+    assert Shards.digest('') == ('e3b0c44298fc1c149afbf4c8996fb924'
+                                 '27ae41e4649b934ca495991b7852b855')
+
+
+def test_shards_imports():
+    story = {'modules': {'b': 'b', 'c': 'lib/c.story', 'd': 'b.story'}}
+    assert Shards.imports(story) == ['b.story', 'lib/c.story']
+
+
+def test_shards_imports_concise():
+    assert Shards.imports({}) == []
+
+
+def test_shards_write(shards, bundle):
+    written = shards.write(bundle)
+    directory = shards.directory
+    assert written == [os.path.join(directory, 'shards/a.json'),
+                       os.path.join(directory, 'shards/b.json'),
+                       os.path.join(directory, 'manifest.json')]
+    a = read(shards, 'shards/a.json')
+    assert json.loads(a) == bundle['stories']['a.story']
+    manifest = json.loads(read(shards, 'manifest.json'))
+    assert manifest == {
+        'entrypoint': ['a.story'],
+        'services': ['alpine'],
+        'stories': {
+            'a.story': {'file': 'shards/a.json', 'hash': Shards.digest(a),
+                        'services': ['alpine'], 'imports': ['b.story']},
+            'b.story': {'file': 'shards/b.json',
+                        'hash': Shards.digest(read(shards, 'shards/b.json')),
+                        'services': [], 'imports': []},
+        }
+    }
+
+
+def test_shards_write_unchanged(shards, bundle):
+    shards.write(bundle)
+    assert shards.write(bundle) == []
+
+
+def test_shards_write_changed(shards, bundle):
+    shards.write(bundle)
+    bundle['stories']['b.story']['tree'] = {'1': {}}
+    written = shards.write(bundle)
+    assert written == [os.path.join(shards.directory, 'shards/b.json'),
+                       os.path.join(shards.directory, 'manifest.json')]
+
+
+def test_shards_write_stale(shards, bundle):
+    shards.write(bundle)
+    del bundle['stories']['b.story']
+    shards.write(bundle)
+    assert not os.path.exists(os.path.join(shards.directory, 'shards/b.json'))
+    assert os.path.exists(os.path.join(shards.directory, 'shards/a.json'))
+
+
+def test_shards_write_manifest_story(shards, bundle):
+    """
+    Ensures a story named manifest doesn't replace the manifest
+    """
+    bundle['stories']['manifest.story'] = bundle['stories'].pop('b.story')
+    written = shards.write(bundle)
+    assert len(written) == len(set(written)) == 3
+    manifest = json.loads(read(shards, 'manifest.json'))
+    assert manifest['stories']['manifest.story']['file'] == \
+        'shards/manifest.json'
+    assert shards.write(bundle) == []
+
+
+def test_shards_write_conflict(shards, bundle):
+    bundle['stories']['a'] = {}
+    with raises(StoryError):
+        shards.write(bundle)
+    assert not os.path.exists(shards.directory)
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from storyscript.Cli import Cli
+from storyscript.Stages import Stages
+from storyscript.compiler import Compiler, PassManager
+
+
+def test_stages():
+    assert Stages.names == ['parse', 'lower', 'semantics', 'json']
+    assert Stages.passes == ['lower', 'semantics', 'json']
+    assert Stages.stoppable == ['parse', 'lower', 'semantics']
+
+
+def test_stages_users():
+    assert Cli.stages is Stages.stoppable
+    assert Compiler.stages is Stages.stoppable
+    assert PassManager.stages is Stages.passes
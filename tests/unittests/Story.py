@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 import io
 import os
+import threading
 
 from lark.exceptions import UnexpectedInput, UnexpectedToken
 
 from pytest import fixture, mark, raises
 
-from storyscript.Story import Story
+import storyscript.Story as StoryModule
+from storyscript.Budget import Budget
+from storyscript.Story import Story, _parser
 from storyscript.compiler import Compiler
 from storyscript.compiler.lowering.Lowering import Lowering
 from storyscript.exceptions import CompilerError, StoryError, StorySyntaxError
@@ -122,25 +125,54 @@ def test_story_modules(magic, story):
     import_tree = magic()
     story.tree = magic()
     story.tree.find_data.return_value = [import_tree]
+    import_tree.string.child.return_value = magic(value='hello.story')
     result = story.modules()
-    assert result == [import_tree.string.child().value[1:-1]]
+    assert result == ['hello.story']
 
 
 def test_story_modules_no_extension(magic, story):
     import_tree = magic()
-    import_tree.string.child.return_value = magic(value='"hello"')
+    import_tree.string.child.return_value = magic(value='hello')
     story.tree = magic()
     story.tree.find_data.return_value = [import_tree]
     result = story.modules()
     assert result == ['hello.story']
 
 
+@mark.parametrize('path, expected', [
+    ('hello', 'hello.story'),
+    ('hello.story', 'hello.story'),
+    ('lib/hello', 'lib/hello.story'),
+])
+def test_story_module_path(path, expected):
+    assert Story.module_path(path) == expected
+
+
 def test_story_compile(patch, story, compiler):
     story.compile()
-    Compiler.compile.assert_called_with(story.tree, story=story)
+    Compiler.compile.assert_called_with(story.tree, story=story,
+                                        mutation_table=None,
+                                        stop_after=None)
     assert story.compiled == Compiler.compile()
 
 
+def test_story_compile_stop_after(patch, story, compiler):
+    tree = story.tree
+    story.compile(stop_after='lower')
+    Compiler.compile.assert_called_with(tree, story=story,
+                                        mutation_table=None,
+                                        stop_after='lower')
+    assert story.tree == Compiler.compile()
+    assert hasattr(story, 'compiled') is False
+
+
+def test_story_compile_mutation_table(patch, story, compiler):
+    story.compile(mutation_table='table')
+    Compiler.compile.assert_called_with(story.tree, story=story,
+                                        mutation_table='table',
+                                        stop_after=None)
+
+
 @mark.parametrize('error', [StorySyntaxError('error'), CompilerError('error')])
 def test_story_compiler_error(patch, story, compiler, error):
     """
@@ -164,6 +196,22 @@ def test_story_lex_parser(patch, story, parser):
     parser.lex.assert_called_with(story.story)
 
 
+def test_story_parser_per_thread(patch, monkeypatch):
+    """
+    Ensures every thread gets its own cached parser
+    """
+    patch.init(Parser)
+    monkeypatch.setattr(StoryModule._local, 'parser', None, raising=False)
+    parser = _parser()
+    assert isinstance(parser, Parser)
+    assert _parser() is parser
+    parsers = []
+    thread = threading.Thread(target=lambda: parsers.append(_parser()))
+    thread.start()
+    thread.join()
+    assert parsers[0] is not parser
+
+
 def test_story_lex_parser_cached(patch, story, magic):
     my_parser = magic()
     patch.object(Story, '_parser', return_value=my_parser)
@@ -180,14 +228,47 @@ def test_story_process(patch, story):
     assert len(kw_args) == 1
     assert isinstance(kw_args['parser'], Parser)
     story.parse.assert_called()
-    story.compile.assert_called_with()
+    story.compile.assert_called_with(mutation_table=None, stop_after=None)
     assert result == story.compiled
 
 
 def test_story_process_parser(patch, story, parser):
     patch.many(Story, ['parse', 'compile'])
     story.compiled = 'compiled'
-    result = story.process(parser=parser)
+    result = story.process(parser=parser, mutation_table='table')
     story.parse.assert_called_with(parser=parser)
-    story.compile.assert_called_with()
+    story.compile.assert_called_with(mutation_table='table',
+                                     stop_after=None)
     assert result == story.compiled
+
+
+def test_story_process_stop_after_parse(patch, story):
+    patch.many(Story, ['parse', 'compile'])
+    story.tree = 'tree'
+    assert story.process(stop_after='parse') == 'tree'
+    story.compile.assert_not_called()
+
+
+@mark.parametrize('stage', ['lower', 'semantics'])
+def test_story_process_stop_after(patch, story, stage):
+    patch.many(Story, ['parse', 'compile'])
+    story.tree = 'tree'
+    assert story.process(stop_after=stage) == 'tree'
+    story.compile.assert_called_with(mutation_table=None, stop_after=stage)
+
+
+def test_story_process_budget(patch, story):
+    patch.many(Story, ['parse', 'compile'])
+    patch.object(Budget, 'use')
+    story.compiled = 'compiled'
+    story.process(budget='budget')
+    Budget.use.assert_called_with('budget')
+    Budget.use().__enter__.assert_called()
+
+
+def test_story_getstate(story):
+    story.tree = 'tree'
+    story.compiled = 'compiled'
+    state = story.__getstate__()
+    assert state == {'story': 'story', 'path': None, 'lines': ['story']}
+    assert story.tree == 'tree'
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from pytest import mark
+
+from storyscript.StoryGenerator import StoryGenerator
+
+
+def test_storygenerator_seed():
+    assert StoryGenerator(1).lines(50) == StoryGenerator(1).lines(50)
+    assert StoryGenerator(1).lines(50) != StoryGenerator(2).lines(50)
+
+
+def test_storygenerator_pick():
+    generator = StoryGenerator()
+    assert generator.pick([], 'default') == 'default'
+    assert generator.pick(['a'], 'default') == 'a'
+
+
+@mark.parametrize('kind', range(8))
+def test_storygenerator_statement(patch, kind):
+    generator = StoryGenerator()
+    patch.object(generator.random, 'randrange', return_value=kind)
+    names = {'int': [], 'string': [], 'list': []}
+    lines = generator.statement(3, names)
+    assert len(lines) > 0
+    assert sum(len(n) for n in names.values()) <= 1
+
+
+def test_storygenerator_statement_names():
+    generator = StoryGenerator()
+    names = {'int': [], 'string': [], 'list': []}
+    for index in range(50):
+        generator.statement(index, names)
+    assert all(name.startswith('n') for name in names['int'])
+    assert all(name.startswith('s') for name in names['string'])
+    assert all(name.startswith('l') for name in names['list'])
+
+
+def test_storygenerator_lines():
+    lines = StoryGenerator().lines(100).splitlines()
+    assert 100 <= len(lines) < 104
+
+
+def test_storygenerator_nesting():
+    lines = StoryGenerator().nesting(3).splitlines()
+    assert lines[2:] == ['if x > 0', '    y0 = x + 0',
+                         '    foreach items as i1', '        y1 = x + 1',
+                         '        if x > 2', '            y2 = x + 2']
+
+
+def test_storygenerator_ladder():
+    lines = StoryGenerator().ladder(3).splitlines()
+    assert lines == ['x = 0', 'if x == 0', '    y = 0', 'else if x == 1',
+                     '    y = 1', 'else if x == 2', '    y = 2', 'else',
+                     '    y = -1']
+
+
+def test_storygenerator_list_literal():
+    story = StoryGenerator().list_literal(5)
+    assert story.startswith('items = [')
+    assert story.count(',') == 4
+
+
+def test_storygenerator_templates():
+    lines = StoryGenerator().templates(10).splitlines()
+    assert len(lines) == 12
+    assert all('{' in line for line in lines[2:])
+
+
+def test_storygenerator_inline():
+    lines = StoryGenerator().inline(10).splitlines()
+    assert lines[1].startswith('values = [')
+    assert lines[1].count('items length') == 10
+
+
+def test_storygenerator_bundle():
+    files = StoryGenerator().bundle(20, fan_in=3, depth=4)
+    assert len(files) == 20
+    assert 'import' not in files['stories/s19.story']
+    imports = files['stories/s0.story'].splitlines()[:3]
+    for number, line in enumerate(imports):
+        assert line.startswith("import 'stories/s")
+        assert line.endswith(f' as m{number}')
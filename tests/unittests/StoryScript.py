@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+from pytest import raises
+
+import storyscript
 from storyscript import load, load_map, loads, version
 from storyscript.Api import Api
 from storyscript.Version import version as real_version
@@ -18,3 +21,17 @@ def test_storyscript_load_map():
 
 def test_storyscript_version():
     assert version == real_version
+
+
+def test_storyscript_dunder_version():
+    assert storyscript.__version__ == real_version
+
+
+def test_storyscript_package():
+    assert isinstance(storyscript, storyscript.Package)
+    assert '__getattr__' not in vars(storyscript)
+
+
+def test_storyscript_unknown_attribute():
+    with raises(AttributeError):
+        storyscript.unknown
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 import io
+import os
+import pkgutil
 import subprocess
 from unittest import mock
 
-import pkg_resources
+from pytest import raises
 
 from storyscript import Version
 
@@ -49,12 +51,16 @@ def test_read_version_file(patch):
 
 
 def test_read_version_package(patch):
-    patch.object(pkg_resources, 'resource_string')
-    r = Version.read_version()
-    pkg_resources.resource_string.assert_called_with(
-        'storyscript', 'VERSION'
-    )
-    assert r == pkg_resources.resource_string().decode('utf8').strip()
+    patch.object(pkgutil, 'get_data')
+    r = Version.read_version_package()
+    pkgutil.get_data.assert_called_with('storyscript', 'VERSION')
+    assert r == pkgutil.get_data().decode('utf8').strip()
+
+
+def test_is_checkout(patch):
+    patch.object(os.path, 'exists', return_value=True)
+    assert Version.is_checkout() is True
+    os.path.exists.assert_called_with(os.path.join(Version.root_dir, '.git'))
 
 
 def test_read_version(patch):
@@ -74,6 +80,7 @@ def test_get_version(patch):
     assert Version.get_version() == Version._version
 
     patch.object(Version, 'git_describe')
+    patch.object(Version, 'is_checkout', return_value=True)
     Version._version = None
     assert Version.get_version() == Version.git_describe()
 
@@ -86,8 +93,44 @@ def test_get_release_version(patch):
     assert Version.get_release_version() == Version._version
 
     patch.object(Version, 'git_version')
+    patch.object(Version, 'is_checkout', return_value=True)
     Version._version = None
     assert Version.get_release_version() == Version.git_version()
 
     Version.git_version.side_effect = Exception('.no.file.found.')
     assert Version.get_release_version() == '0.0.0'
+
+
+def test_get_version_release(patch):
+    """
+    Ensures installed releases never run git
+    """
+    patch.object(Version, '_version', None)
+    patch.many(Version, ['git_describe', 'git_version'])
+    patch.object(Version, 'is_checkout', return_value=False)
+    assert Version.get_version() == '0.0.0'
+    assert Version.get_release_version() == '0.0.0'
+    Version.git_describe.assert_not_called()
+    Version.git_version.assert_not_called()
+
+
+def test_version_lazy(monkeypatch):
+    monkeypatch.delattr(Version, 'release_version', raising=False)
+    monkeypatch.setitem(Version._getters, 'release_version',
+                        mock.Mock(return_value='1.0'))
+    assert Version.release_version == '1.0'
+    assert Version.release_version == '1.0'
+    assert Version._getters['release_version'].call_count == 1
+
+
+def test_version_module():
+    """
+    Ensures the lazy attributes don't need a module level __getattr__
+    """
+    assert isinstance(Version, Version.LazyModule)
+    assert '__getattr__' not in vars(Version)
+
+
+def test_version_unknown_attribute():
+    with raises(AttributeError):
+        Version.unknown
@@ -1,29 +1,148 @@
 # -*- coding: utf-8 -*-
+from pytest import mark
 
-from storyscript.compiler import Compiler
+from storyscript.Budget import Budget
+from storyscript.Profile import Profile
+from storyscript.compiler import Compiler, PassManager
 from storyscript.compiler.json import JSONCompiler
-from storyscript.compiler.lowering import Lowering
+from storyscript.compiler.lowering import Compactor, Deduplicator, \
+        Lowering
 from storyscript.compiler.semantics import Semantics
 
 
 def test_compiler_generate(patch, magic):
     patch.init(Lowering)
     patch.object(Lowering, 'process')
+    patch.object(Compactor, 'process')
     patch.object(Semantics, 'process')
     patch.many(JSONCompiler, ['compile'])
     tree = magic()
     result = Compiler.generate(tree)
     Lowering.__init__.assert_called_with(parser=tree.parser)
     Lowering.process.assert_called_with(tree)
-    Semantics.process.assert_called_with(Lowering.process())
+    Compactor.process.assert_called_with(Lowering.process())
+    Semantics.process.assert_called_with(Compactor.process())
     assert result == Semantics.process()
 
 
-def test_compiler_compile(patch, magic):
-    patch.object(Compiler, 'generate')
-    patch.object(JSONCompiler, 'compile')
+def test_compiler_generate_mutation_table(patch, magic):
+    patch.init(Lowering)
+    patch.init(Semantics)
+    patch.many(Lowering, ['process'])
+    patch.object(Semantics, 'process')
+    Compiler.generate(magic(), mutation_table='table')
+    Semantics.__init__.assert_called_with(mutation_table='table')
+
+
+def test_compiler_generate_stop_after_lower(patch, magic):
+    patch.init(Lowering)
+    patch.object(Lowering, 'process')
+    patch.object(Compactor, 'process')
+    patch.object(Semantics, 'process')
+    result = Compiler.generate(magic(), stop_after='lower')
+    Semantics.process.assert_not_called()
+    assert result == Compactor.process()
+
+
+def test_compiler_generate_passes(patch, magic):
+    patch.object(Compiler.passes, 'run')
     tree = magic()
-    result = Compiler.compile(tree, story=None)
-    Compiler.generate.assert_called_with(tree, debug=False)
-    JSONCompiler.compile.assert_called_with(Compiler.generate(), debug=False)
+    result = Compiler.generate(tree, debug=True, stop_after='lower')
+    Compiler.passes.run.assert_called_with(tree, None, stop_after='lower',
+                                           debug=True, mutation_table=None)
+    assert result == Compiler.passes.run()
+
+
+def test_compiler_lower(patch, magic):
+    patch.init(Lowering)
+    patch.object(Lowering, 'process')
+    tree = magic()
+    result = Compiler.lower(tree, 'story', debug=False)
+    Lowering.__init__.assert_called_with(parser=tree.parser)
+    Lowering.process.assert_called_with(tree)
+    assert result == Lowering.process()
+
+
+def test_compiler_compact(patch):
+    patch.object(Compactor, 'process')
+    patch.object(Profile, 'count_nodes')
+    result = Compiler.compact('tree', 'story')
+    Compactor.process.assert_called_with('tree')
+    Profile.count_nodes.assert_called_with('lowered_nodes',
+                                           Compactor.process())
+    assert result == Compactor.process()
+
+
+def test_compiler_check_budget(patch):
+    patch.object(Budget, 'check_tree')
+    assert Compiler.check_budget('tree', 'story') == 'tree'
+    Budget.check_tree.assert_called_with('tree')
+
+
+def test_compiler_semantics(patch):
+    patch.init(Semantics)
+    patch.object(Semantics, 'process')
+    result = Compiler.semantics('tree', 'story', mutation_table='table')
+    Semantics.__init__.assert_called_with(mutation_table='table')
+    Semantics.process.assert_called_with('tree')
+    assert result == Semantics.process()
+
+
+def test_compiler_deduplicate(patch):
+    patch.object(Deduplicator, 'process')
+    result = Compiler.deduplicate('tree', 'story')
+    Deduplicator.process.assert_called_with('tree')
+    assert result == Deduplicator.process()
+
+
+def test_compiler_deduplicate_not_registered():
+    assert 'deduplicate' not in Compiler.passes.names()
+
+
+def test_compiler_json(patch):
+    patch.init(JSONCompiler)
+    patch.object(JSONCompiler, 'compile')
+    patch.object(Budget, 'check_time')
+    result = Compiler.json('tree', 'story', debug=True)
+    Budget.check_time.assert_called()
+    JSONCompiler.__init__.assert_called_with('story')
+    JSONCompiler.compile.assert_called_with('tree', debug=True)
     assert result == JSONCompiler.compile()
+
+
+def test_compiler_default_passes():
+    passes = Compiler.default_passes()
+    assert isinstance(passes, PassManager)
+    assert passes.names() == ['lower', 'compact', 'check_budget',
+                              'semantics', 'json']
+    assert [p.stage for p in passes.passes] == ['lower', 'lower',
+                                                'semantics', 'semantics',
+                                                'json']
+    assert passes.passes[0].run == Compiler.lower
+
+
+def test_compiler_passes():
+    assert Compiler.passes.names() == Compiler.default_passes().names()
+
+
+def test_compiler_compile(patch, magic):
+    patch.object(Compiler.passes, 'run')
+    patch.object(Profile, 'count_nodes')
+    tree = magic()
+    result = Compiler.compile(tree, story='story')
+    Profile.count_nodes.assert_called_with('nodes', tree)
+    Compiler.passes.run.assert_called_with(tree, 'story', stop_after=None,
+                                           debug=False, mutation_table=None)
+    assert result == Compiler.passes.run()
+
+
+@mark.parametrize('stage', ['lower', 'semantics'])
+def test_compiler_compile_stop_after(patch, magic, stage):
+    patch.object(Compiler.passes, 'run')
+    tree = magic()
+    result = Compiler.compile(tree, story=None, stop_after=stage,
+                              mutation_table='table')
+    Compiler.passes.run.assert_called_with(tree, None, stop_after=stage,
+                                           debug=False,
+                                           mutation_table='table')
+    assert result == Compiler.passes.run()
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+from storyscript.compiler import Pass
+
+
+def test_pass_init():
+    p = Pass('name', 'lower', 'run')
+    assert p.name == 'name'
+    assert p.stage == 'lower'
+    assert p.run == 'run'
+
+
+def test_pass_repr():
+    assert repr(Pass('name', 'lower', 'run')) == "Pass('name', 'lower')"
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from pytest import fixture, mark, raises
+
+from storyscript.Profile import Profile
+from storyscript.compiler import Pass, PassManager
+
+
+@fixture
+def passes(magic):
+    return PassManager([Pass('lower', 'lower', magic()),
+                        Pass('semantics', 'semantics', magic()),
+                        Pass('json', 'json', magic())])
+
+
+def test_passmanager_init():
+    manager = PassManager()
+    assert manager.passes == []
+    assert manager.before == []
+    assert manager.after == []
+
+
+def test_passmanager_init_passes(passes):
+    assert PassManager(passes.passes).passes is not passes.passes
+
+
+def test_passmanager_names(passes):
+    assert passes.names() == ['lower', 'semantics', 'json']
+
+
+def test_passmanager_index(passes):
+    assert passes.index('json') == 2
+
+
+def test_passmanager_index_unknown(passes):
+    with raises(ValueError):
+        passes.index('unknown')
+
+
+def test_passmanager_register(passes):
+    passes.register(Pass('custom', 'json', None))
+    assert passes.names() == ['lower', 'semantics', 'json', 'custom']
+
+
+def test_passmanager_register_before(passes):
+    passes.register(Pass('custom', 'semantics', None), before='semantics')
+    assert passes.names() == ['lower', 'custom', 'semantics', 'json']
+
+
+def test_passmanager_register_after(passes):
+    passes.register(Pass('custom', 'semantics', None), after='semantics')
+    assert passes.names() == ['lower', 'semantics', 'custom', 'json']
+
+
+def test_passmanager_register_stage(passes):
+    """
+    Ensures passes are registered as the last pass of their stage
+    """
+    passes.register(Pass('custom', 'lower', None))
+    assert passes.names() == ['lower', 'custom', 'semantics', 'json']
+
+
+def test_passmanager_register_empty():
+    manager = PassManager()
+    manager.register(Pass('custom', 'json', None))
+    assert manager.names() == ['custom']
+
+
+def test_passmanager_register_unknown_stage(passes):
+    with raises(ValueError):
+        passes.register(Pass('custom', 'parse', None))
+
+
+def test_passmanager_register_twice(passes):
+    with raises(ValueError):
+        passes.register(Pass('json', 'json', None))
+
+
+@mark.parametrize('stage, options', [
+    ('json', {'before': 'semantics'}),
+    ('json', {'after': 'lower'}),
+    ('lower', {'after': 'semantics'}),
+])
+def test_passmanager_register_order(passes, stage, options):
+    """
+    Ensures passes can't run before the passes of earlier stages
+    """
+    with raises(ValueError):
+        passes.register(Pass('custom', stage, None), **options)
+    assert passes.names() == ['lower', 'semantics', 'json']
+
+
+def test_passmanager_register_copy(passes):
+    """
+    Ensures registering replaces the passes, s.t. running compilations
+    aren't affected
+    """
+    registered = passes.passes
+    passes.register(Pass('custom', 'json', None))
+    assert registered == passes.passes[:3]
+
+
+def test_passmanager_unregister(passes):
+    json = passes.passes[2]
+    assert passes.unregister('json') == json
+    assert passes.names() == ['lower', 'semantics']
+
+
+def test_passmanager_unregister_unknown(passes):
+    with raises(ValueError):
+        passes.unregister('unknown')
+
+
+def test_passmanager_add_hook(passes):
+    passes.add_hook(before='before', after='after')
+    passes.add_hook(after='other')
+    assert passes.before == ['before']
+    assert passes.after == ['after', 'other']
+
+
+def test_passmanager_remove_hook(passes):
+    passes.add_hook(before='before', after='after')
+    passes.remove_hook(before='before', after='after')
+    assert passes.before == []
+    assert passes.after == []
+
+
+def test_passmanager_hooks_copy(passes):
+    before = passes.before
+    passes.add_hook(before='before')
+    passes.remove_hook(before='before')
+    assert before == []
+    assert passes.before is not before
+
+
+def test_passmanager_run(passes):
+    lower, semantics, json = (p.run for p in passes.passes)
+    result = passes.run('tree', 'story', debug=True)
+    lower.assert_called_with('tree', 'story', debug=True)
+    semantics.assert_called_with(lower(), 'story', debug=True)
+    json.assert_called_with(semantics(), 'story', debug=True)
+    assert result == json()
+
+
+def test_passmanager_run_stop_after(passes):
+    result = passes.run('tree', 'story', stop_after='semantics')
+    passes.passes[2].run.assert_not_called()
+    assert result == passes.passes[1].run()
+
+
+def test_passmanager_run_hooks(patch, magic, passes):
+    patch.object(time, 'perf_counter', side_effect=[1, 3])
+    before = magic()
+    after = magic()
+    passes.add_hook(before=before, after=after)
+    result = passes.run('tree', 'story', stop_after='lower')
+    before.assert_called_with('lower', 'story', 'tree')
+    after.assert_called_with('lower', 'story', result, 2)
+
+
+def test_passmanager_run_profile(patch, passes):
+    patch.object(Profile, 'phase')
+    passes.run('tree', 'story', stop_after='semantics')
+    Profile.phase.assert_called_with('semantics')
+    assert Profile.phase().__enter__.call_count == 2
+
+
+def test_passmanager_run_register(magic, passes):
+    """
+    Ensures passes registered during a run only take part in later runs
+    """
+    custom = Pass('custom', 'json', magic())
+
+    def register(tree, story, **options):
+        if 'custom' not in passes.names():
+            passes.register(custom)
+        return tree
+
+    passes.passes[0].run.side_effect = register
+    passes.run('tree', 'story')
+    custom.run.assert_not_called()
+    passes.run('tree', 'story')
+    custom.run.assert_called()
+
+
+def test_passmanager_lock(passes):
+    """
+    Ensures concurrent registrations don't lose passes
+    """
+    def register(i):
+        passes.register(Pass(f'custom{i}', 'json', None))
+
+    threads = [threading.Thread(target=register, args=(i,))
+               for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(passes.names()) == 23
@@ -84,7 +84,7 @@ def test_compiler_imports(patch, compiler, lines, tree):
     compiler.lines.modules = {}
     compiler.imports(tree, '1')
     module = tree.child(1).value
-    assert lines.modules[module] == tree.string.child(0).value[1:-1]
+    assert lines.modules[module] == tree.string.child(0).value
 
 
 def test_compiler_absolute_expression(patch, compiler, lines, tree):
@@ -172,6 +172,21 @@ def test_objects_string(patch, tree):
     assert result == {'$OBJECT': 'string', 'string': objects.unicode_escape()}
 
 
+def test_objects_string_template():
+    tree = Tree('string_template', [
+        Tree('string', [Token('DOUBLE_QUOTED', 'a {')]),
+        Tree('path', [Token('NAME', 'b')]),
+        Tree('string', [Token('DOUBLE_QUOTED', '} \\t')]),
+        Tree('path', [Token('NAME', 'c')]),
+    ])
+    assert Objects().string_template(tree) == {
+        '$OBJECT': 'string',
+        'string': 'a {{{}}} \t{}',
+        'values': [{'$OBJECT': 'path', 'paths': ['b']},
+                   {'$OBJECT': 'path', 'paths': ['c']}],
+    }
+
+
 def test_objects_boolean():
     tree = Tree('boolean', [Token('TRUE', 'true')])
     assert Objects.boolean(tree) == {'$OBJECT': 'boolean', 'boolean': True}
@@ -295,8 +310,8 @@ def test_objects_entity(patch, tree):
 
 
 @mark.parametrize('value_type', [
-    'string', 'boolean', 'list', 'number', 'map', 'regular_expression',
-    'types'
+    'string', 'string_template', 'boolean', 'list', 'number', 'map',
+    'regular_expression', 'types'
 ])
 def test_objects_values(patch, magic, value_type):
     patch.object(Objects, value_type)
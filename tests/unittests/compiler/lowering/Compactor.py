@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from lark.lexer import Token
+
+from storyscript.compiler.lowering import Compactor
+from storyscript.parser import Tree
+
+
+def chain(node, levels):
+    for level in reversed(levels):
+        node = Tree(level, [node])
+    return node
+
+
+def number(value):
+    """
+    A number in the full chain of precedence levels of the grammar
+    """
+    entity = Tree('entity', [Tree('values', [
+        Tree('number', [Token('INT', value)])])])
+    return chain(entity, ['or_expression', 'and_expression',
+                          'cmp_expression', 'arith_expression',
+                          'mul_expression', 'unary_expression',
+                          'pow_expression', 'primary_expression'])
+
+
+def mul_operand(value):
+    return number(value).follow(['and_expression', 'cmp_expression',
+                                 'arith_expression', 'mul_expression'])
+
+
+def test_compactor_operand_entity():
+    tree = number('1')
+    result = Compactor.operand(tree)
+    assert result.data == 'entity'
+    assert result.values.number.child(0) == '1'
+
+
+def test_compactor_operand_operation():
+    op = Token('PLUS', '+')
+    tree = Tree('arith_expression', [
+        Tree('arith_expression', [mul_operand('1')]),
+        Tree('arith_operator', [op]),
+        mul_operand('2')
+    ])
+    result = Compactor.operand(chain(tree, ['or_expression',
+                                            'and_expression',
+                                            'cmp_expression']))
+    assert result.data == 'operation'
+    assert result.child(0).data == 'entity'
+    assert result.child(1) is op
+    assert result.child(2).data == 'entity'
+
+
+def test_compactor_operand_and():
+    op = Token('AND', 'and')
+    tree = Tree('and_expression', [
+        Tree('and_expression', [number('1').child(0).child(0)]),
+        op,
+        number('2').child(0).child(0).child(0)
+    ])
+    result = Compactor.operand(tree)
+    assert result.data == 'operation'
+    assert result.children[1] is op
+
+
+def test_compactor_operand_unary():
+    op = Token('NOT', '!')
+    tree = Tree('unary_expression', [
+        Tree('unary_operator', [op]),
+        number('1').follow(['and_expression', 'cmp_expression',
+                            'arith_expression', 'mul_expression',
+                            'unary_expression'])
+    ])
+    result = Compactor.operand(tree)
+    assert result.data == 'operation'
+    assert result.child(0) is op
+    assert result.child(1).data == 'entity'
+
+
+def test_compactor_operand_cast():
+    as_operator = Tree('as_operator', [Tree('types', [])])
+    primary = number('1').follow(['and_expression', 'cmp_expression',
+                                  'arith_expression', 'mul_expression',
+                                  'unary_expression', 'pow_expression',
+                                  'primary_expression'])
+    tree = Tree('pow_expression', [primary, as_operator])
+    result = Compactor.operand(tree)
+    assert result.data == 'cast_expression'
+    assert result.child(0).data == 'entity'
+    assert result.child(1) is as_operator
+
+
+def test_compactor_operand_nested():
+    """
+    Ensures expressions nested in entities are compacted
+    """
+    item = Tree('base_expression', [Tree('expression', [number('1')])])
+    entity = Tree('entity', [Tree('values', [Tree('list', [item])])])
+    result = Compactor.operand(entity)
+    assert item.expression.child(0).data == 'entity'
+    assert result is entity
+
+
+def test_compactor_process():
+    expression = Tree('expression', [number('1')])
+    primary = Tree('primary_expression', [
+        number('2').child(0).child(0).child(0)])
+    tree = Tree('start', [Tree('block', [expression]),
+                          Tree('mutation', [primary])])
+    assert Compactor.process(tree) is tree
+    assert expression.child(0).data == 'entity'
+    assert primary.child(0).data == 'entity'
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+from lark.lexer import Token
+
+from pytest import fixture, mark
+
+from storyscript.compiler.lowering import Deduplicator
+from storyscript.parser import Tree
+
+
+@fixture
+def deduplicator():
+    return Deduplicator()
+
+
+def path(name):
+    return Tree('path', [Token('NAME', name)])
+
+
+def mutation(name, command):
+    return Tree('base_expression', [
+        Tree('mutation', [path(name), Tree('mutation_fragment', [
+            Token('NAME', command)])])
+    ])
+
+
+def assignment(name, value):
+    return Tree('assignment', [path(name), Tree('assignment_fragment', [
+        Token('EQUALS', '='), value])])
+
+
+def statement(name, *reads):
+    """
+    An assignment of a list of the read variables
+    """
+    values = [Tree('entity', [path(read)]) for read in reads]
+    return Tree('rules', [assignment(name, Tree('base_expression', [
+        Tree('expression', [Tree('entity', [Tree('values', [
+            Tree('list', values)])])])]))])
+
+
+def names(block):
+    return [child.child(0).child(0).value if child.data == 'assignment'
+            else child.child(0).child(0).child(0).value
+            for child in block.children]
+
+
+def test_deduplicator_key():
+    a = mutation('l', 'length')
+    b = mutation('l', 'length')
+    b.mutation.path.children[0] = Token('NAME', 'l', line=5)
+    assert Deduplicator.key(a) == Deduplicator.key(b)
+    assert Deduplicator.key(a) != Deduplicator.key(mutation('l', 'sort'))
+
+
+def test_deduplicator_reads():
+    assert Deduplicator.reads(statement('x', 'a', 'b')) == {'x', 'a', 'b'}
+
+
+def test_deduplicator_writes():
+    tree = Tree('foreach_block', [
+        Tree('foreach_statement', [path('items'), Tree('output', [
+            Token('NAME', 'item')])]),
+        Tree('nested_block', [Tree('block', [statement('x', 'item')])]),
+    ])
+    assert Deduplicator.writes(tree) == {'item', 'x'}
+
+
+@mark.parametrize('value, expected', [
+    (mutation('l', 'length'), True),
+    (mutation('l', 'random'), False),
+    (Tree('base_expression', [Tree('service', [path('alpine')])]), False),
+    (Tree('base_expression', [Tree('call_expression', [path('f')])]),
+     False),
+])
+def test_deduplicator_pure(value, expected):
+    assert Deduplicator.pure(value) is expected
+
+
+@mark.parametrize('tree, expected', [
+    (mutation('l', 'length'), False),
+    (mutation('l', 'pop'), True),
+    (Tree('base_expression', [Tree('call_expression', [path('f')])]), True),
+])
+def test_deduplicator_barrier(tree, expected):
+    assert Deduplicator.barrier(tree) is expected
+
+
+def test_deduplicator_is_fake():
+    assert Deduplicator.is_fake(assignment('__p-1.1', mutation('l', 'sort')))
+    assert not Deduplicator.is_fake(assignment('a', mutation('l', 'sort')))
+    assert not Deduplicator.is_fake(statement('a'))
+
+
+def test_deduplicator_rename(deduplicator):
+    deduplicator.renames = {'__p-1.2': '__p-1.1'}
+    tree = statement('x', '__p-1.2', 'a')
+    deduplicator.rename(tree)
+    assert Deduplicator.reads(tree) == {'x', '__p-1.1', 'a'}
+
+
+def test_deduplicator_block(deduplicator):
+    block = Tree('block', [
+        assignment('__p-1.1', mutation('l', 'length')),
+        assignment('__p-1.2', mutation('l', 'length')),
+        statement('x', '__p-1.1', '__p-1.2'),
+    ])
+    deduplicator.block(block, {})
+    assert names(block) == ['__p-1.1', 'x']
+    assert Deduplicator.reads(block.children[1]) == {'x', '__p-1.1'}
+
+
+def test_deduplicator_block_cascade(deduplicator):
+    block = Tree('block', [
+        assignment('__p-1.1', mutation('l', 'keys')),
+        assignment('__p-1.2', mutation('__p-1.1', 'length')),
+        assignment('__p-1.3', mutation('l', 'keys')),
+        assignment('__p-1.4', mutation('__p-1.3', 'length')),
+        statement('x', '__p-1.2', '__p-1.4'),
+    ])
+    deduplicator.block(block, {})
+    assert names(block) == ['__p-1.1', '__p-1.2', 'x']
+
+
+def test_deduplicator_block_impure(deduplicator):
+    block = Tree('block', [
+        assignment('__p-1.1', mutation('l', 'length')),
+        assignment('__p-1.2', mutation('l', 'remove')),
+        assignment('__p-1.3', mutation('l', 'length')),
+        statement('x', '__p-1.1', '__p-1.2', '__p-1.3'),
+    ])
+    deduplicator.block(block, {})
+    assert len(block.children) == 4
+
+
+def test_deduplicator_block_writes(deduplicator):
+    """
+    Ensures assignments aren't reused once the variables they read change
+    """
+    available = {}
+    first = Tree('block', [
+        assignment('__p-1.1', mutation('l', 'length')),
+        statement('l', '__p-1.1'),
+    ])
+    second = Tree('block', [
+        assignment('__p-2.1', mutation('l', 'length')),
+        statement('x', '__p-2.1'),
+    ])
+    deduplicator.block(first, available)
+    deduplicator.block(second, available)
+    assert names(second) == ['__p-2.1', 'x']
+
+
+def test_deduplicator_process():
+    nested = Tree('block', [
+        assignment('__p-2.1', mutation('l', 'length')),
+        statement('x', '__p-2.1'),
+    ])
+    if_block = Tree('if_block', [
+        Tree('if_statement', [path('__p-1.1')]),
+        Tree('nested_block', [nested]),
+    ])
+    tree = Tree('start', [Tree('block', [
+        assignment('__p-1.1', mutation('l', 'length')),
+        if_block,
+    ])])
+    assert Deduplicator.process(tree) == tree
+    assert names(nested) == ['x']
+    assert Deduplicator.reads(nested) == {'x', '__p-1.1'}
+
+
+def test_deduplicator_process_function():
+    """
+    Ensures assignments aren't reused in functions, which have their own
+    scope
+    """
+    nested = Tree('block', [
+        assignment('__p-2.1', mutation('l', 'length')),
+        statement('x', '__p-2.1'),
+    ])
+    tree = Tree('start', [Tree('block', [
+        assignment('__p-1.1', mutation('l', 'length')),
+        Tree('function_block', [Tree('nested_block', [nested])]),
+    ])])
+    Deduplicator.process(tree)
+    assert names(nested) == ['__p-2.1', 'x']
@@ -146,6 +146,8 @@ def test_faketree_add_assignment(patch, fake_tree, block):
     block.child.return_value = None
     result = fake_tree.add_assignment('value', original_line=10)
     FakeTree.assignment.assert_called_with('value')
+    assert block.children == [1]
+    fake_tree.splice()
     assert block.children == [FakeTree.assignment(), 1]
     name = Token('NAME', FakeTree.assignment().path.child(0), line=10)
     assert result.data == 'path'
@@ -157,6 +159,7 @@ def test_faketree_add_assignment_more_children(patch, fake_tree, block):
     patch.object(FakeTree, 'find_insert_pos', return_value=0)
     block.children = ['c1', fake_tree.block.last_child()]
     fake_tree.add_assignment('value', original_line=42)
+    fake_tree.splice()
     expected = [FakeTree.assignment(), 'c1', block.last_child()]
     assert block.children == expected
 
@@ -166,6 +169,7 @@ def test_faketree_add_assignment_four_children(patch, fake_tree, block):
     patch.object(FakeTree, 'find_insert_pos', return_value=1)
     block.children = ['c1', 'c2', 'c3', fake_tree.block.last_child()]
     fake_tree.add_assignment('value', original_line=42)
+    fake_tree.splice()
     expected = ['c1', FakeTree.assignment(), 'c2', 'c3', block.last_child()]
     assert block.children == expected
 
@@ -175,5 +179,43 @@ def test_faketree_add_assignment_four_children_bottom(patch, fake_tree, block):
     patch.object(FakeTree, 'find_insert_pos', return_value=-1)
     block.children = ['c1', 'c2', 'c3', fake_tree.block.last_child()]
     fake_tree.add_assignment('value', original_line=42)
+    fake_tree.splice()
     expected = ['c1', 'c2', 'c3', FakeTree.assignment(), block.last_child()]
     assert block.children == expected
+
+
+def test_faketree_add_assignment_order(patch, magic, fake_tree, block):
+    """
+    Ensures assignments added for the same line are inserted in order
+    """
+    a1, a2, a3 = magic(), magic(), magic()
+    patch.object(FakeTree, 'assignment', side_effect=[a1, a2, a3])
+    patch.object(FakeTree, 'find_insert_pos', side_effect=[1, 0, 1])
+    block.children = ['c1', 'c2']
+    for i in range(3):
+        fake_tree.add_assignment('value', original_line=42)
+    fake_tree.splice()
+    assert block.children == [a2, 'c1', a1, a3, 'c2']
+
+
+def test_faketree_find_insert_pos(magic, fake_tree, block):
+    block.children = [magic(), magic(), magic()]
+    for i, child in enumerate(block.children):
+        child.line.return_value = str(i + 1)
+    assert fake_tree.find_insert_pos('2') == 1
+    assert fake_tree.find_insert_pos('1') == 0
+    assert block.children[1].line.call_count == 1
+
+
+def test_faketree_find_insert_pos_missing(magic, fake_tree, block):
+    """
+    Ensures assignments of unknown lines are inserted before the last node
+    """
+    block.children = [magic(), magic()]
+    assert fake_tree.find_insert_pos('42') == 1
+
+
+def test_faketree_splice_empty(fake_tree, block):
+    block.children = ['c1']
+    fake_tree.splice()
+    assert block.children == ['c1']
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from unittest import mock
 
-from pytest import fixture
+from pytest import fixture, mark
 
 from storyscript.compiler.lowering import FakeTree, Lowering
 from storyscript.parser import Tree
@@ -10,6 +10,7 @@ from storyscript.parser import Tree
 @fixture
 def preprocessor(patch):
     patch.init(FakeTree)
+    patch.object(FakeTree, 'splice')
     patch.object(Lowering, 'fake_tree', return_value=FakeTree(None))
     return Lowering(parser=None)
 
@@ -125,6 +126,17 @@ def test_preprocessor_visit_one_children(patch, magic, preprocessor, entity):
     assert replace.call_count == 1
 
 
+def test_preprocessor_visit_block_splice(magic, preprocessor):
+    """
+    Check that the fake lines of a block are inserted once it was visited
+    """
+    tree = magic(data='block', children=[magic(children=[])])
+    preprocessor.visit(tree, None, None, lambda n: False, magic(),
+                       parent=None)
+    preprocessor.fake_tree.assert_called_with(tree)
+    FakeTree.splice.assert_called_once()
+
+
 def test_preprocessor_visit_two_children(patch, magic, preprocessor, entity):
     """
     Check that all inline_expressions are found
@@ -364,6 +376,45 @@ def test_preprocessor_visit_base_expression_ignore(patch, magic, preprocessor,
     replace.assert_not_called()
 
 
+@mark.parametrize('token, expected', [
+    ('\\', ('\\', False)),
+    (r'\{', ('{', False)),
+    (r'\"', ('"', False)),
+    (r'\ ', ('\\\\ ', False)),
+    (r'\n', (r'\n', False)),
+    (r'\N', (r'\N', True)),
+])
+def test_lowering_template_escape(token, expected):
+    assert Lowering.template_escape(token) == expected
+
+
+def test_lowering_template_part(tree):
+    assert Lowering.template_part(tree, ['a'], code=True) == \
+        {'$OBJECT': 'code', 'code': 'a'}
+    assert Lowering.template_part(tree, ['a', 'b'], code=False) == \
+        {'$OBJECT': 'string', 'string': 'ab'}
+
+
+@mark.parametrize('token, inside, expected, buffered', [
+    ('{', False, (None, True), []),
+    ('x', False, (None, False), ['x']),
+    ('x', True, (None, True), ['x']),
+])
+def test_lowering_interpolate(tree, token, inside, expected, buffered):
+    buf = []
+    assert Lowering.interpolate(tree, token, buf, inside) == expected
+    assert buf == buffered
+
+
+def test_lowering_interpolate_transitions(tree):
+    string, inside = Lowering.interpolate(tree, '{', ['a'], False)
+    assert string == flatten_to_string('a')
+    assert inside is True
+    code, inside = Lowering.interpolate(tree, '}', ['b'], True)
+    assert code == {'$OBJECT': 'code', 'code': 'b'}
+    assert inside is False
+
+
 def flatten_to_string(s):
     return {'$OBJECT': 'string', 'string': s}
 
@@ -444,3 +495,57 @@ def test_objects_flatten_template_escapes_uni3(patch, tree):
     assert result == [
         flatten_to_string(r'\N{LATIN CAPITAL LETTER A}'),
     ]
+
+
+def test_objects_flatten_template_escapes_space(patch, tree):
+    result = list(Lowering.flatten_template(tree, r'a\ b'))
+    assert result == [flatten_to_string(r'a\\ b')]
+
+
+def test_objects_flatten_template_trailing_backslash(patch, tree):
+    result = list(Lowering.flatten_template(tree, 'a\\'))
+    assert result == [flatten_to_string('a\\')]
+
+
+def test_objects_flatten_template_escapes_in_template(patch, tree):
+    result = list(Lowering.flatten_template(tree, r'{a\}b}'))
+    assert result == [{'$OBJECT': 'code', 'code': 'a}b'}]
+
+
+def test_objects_flatten_template_uni_braces(patch, tree):
+    """
+    Ensures braces of escaped unicode names aren't templates
+    """
+    result = list(Lowering.flatten_template(tree, r'{a}\N{DASH}{b}'))
+    assert result == [
+        {'$OBJECT': 'code', 'code': 'a'},
+        flatten_to_string(r'\N{DASH}'),
+        {'$OBJECT': 'code', 'code': 'b'},
+    ]
+
+
+@mark.parametrize('text, error', [
+    (r'\Nx', 'string_templates_nested'),
+    ('{a{b}}', 'string_templates_nested'),
+    ('a}', 'string_templates_unopened'),
+    ('{}', 'string_templates_empty'),
+])
+def test_objects_flatten_template_errors(patch, tree, text, error):
+    list(Lowering.flatten_template(tree, text))
+    failed = [args for args, kwargs in tree.expect.call_args_list
+              if not args[0]]
+    assert failed[0] == (False, error)
+
+
+def test_objects_flatten_template_unclosed(patch, tree):
+    list(Lowering.flatten_template(tree, '{a'))
+    tree.expect.assert_called_with(False, 'string_templates_unclosed')
+
+
+def test_objects_flatten_template_large(patch, tree):
+    """
+    Ensures large literals are kept as one string
+    """
+    text = r'\{"a": \"b\"\} ' * 1000
+    result = list(Lowering.flatten_template(tree, text))
+    assert result == [flatten_to_string('{"a": "b"} ' * 1000)]
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 from lark.lexer import Token
 
-from storyscript.compiler.semantics.TypeResolver import ScopeSelectiveVisitor
+from storyscript.compiler.semantics.TypeResolver import \
+    ScopeSelectiveVisitor, TypeResolver
+from storyscript.compiler.semantics.functions.MutationTable import \
+    MutationTable
 from storyscript.parser import Tree
 
 
@@ -72,3 +75,12 @@ def test_scope_selective_visitor_token():
     ]), scope=None)
     assert tv._a == 3
     assert tv._b == 1
+
+
+def test_type_resolver_mutation_table(patch):
+    patch.object(MutationTable, 'init')
+    assert TypeResolver().mutation_table == MutationTable.init()
+    table = MutationTable()
+    resolver = TypeResolver(mutation_table=table)
+    assert resolver.mutation_table == table
+    assert resolver.resolver.mutation_table == table
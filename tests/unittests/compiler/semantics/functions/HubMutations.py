@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from os import path
+
+from storyscript.compiler.semantics.functions import HubMutations
+from storyscript.compiler.semantics.functions.HubMutations import Hub
+from storyscript.compiler.semantics.functions.MutationCatalogue import \
+    MutationCatalogue
+
+
+def test_hub_init():
+    hub = Hub()
+    assert hub.catalogues == []
+    assert hub._loaded is None
+    assert hub._mutations == {}
+
+
+def test_hub_compiled():
+    assert path.isfile(Hub.compiled)
+
+
+def test_hub_catalogue(patch):
+    patch.object(MutationCatalogue, 'load')
+    result = Hub.catalogue()
+    MutationCatalogue.load.assert_called_with(Hub.compiled)
+    assert result == MutationCatalogue.load()
+
+
+def test_hub_catalogue_not_compiled(patch):
+    """
+    Ensures the signatures are compiled if the compiled catalogue is missing
+    """
+    patch.object(path, 'exists', return_value=False)
+    patch.object(MutationCatalogue, 'from_signatures')
+    result = Hub.catalogue()
+    MutationCatalogue.from_signatures.assert_called_with(
+        HubMutations.mutations)
+    assert result == MutationCatalogue.from_signatures()
+
+
+def test_hub_catalogue_up_to_date():
+    """
+    Ensures the compiled catalogue matches the signatures. Recompile it with
+    `MutationCatalogue.from_signatures(mutations).write(Hub.compiled)`.
+    """
+    catalogue = MutationCatalogue.from_signatures(HubMutations.mutations)
+    assert Hub.catalogue().dumps() == catalogue.dumps()
+
+
+def test_hub_load(patch):
+    patch.object(Hub, 'catalogue')
+    patch.object(MutationCatalogue, 'load')
+    hub = Hub(catalogues=['engine.mutations'])
+    loaded = hub.load()
+    MutationCatalogue.load.assert_called_once_with('engine.mutations')
+    assert loaded == [Hub.catalogue.return_value,
+                      MutationCatalogue.load.return_value]
+    assert hub.load() is loaded
+    assert MutationCatalogue.load.call_count == 1
+
+
+def test_hub_build(patch, magic):
+    a = magic()
+    a.mutations.return_value = ['a']
+    b = magic()
+    b.mutations.return_value = ['b']
+    patch.object(Hub, 'load', return_value=[a, b])
+    assert Hub().build('length') == ['a', 'b']
+    a.mutations.assert_called_with('length')
+    b.mutations.assert_called_with('length')
+
+
+def test_hub_mutations(patch):
+    patch.object(Hub, 'build', return_value=['mutation'])
+    hub = Hub()
+    assert hub.mutations('length') == ['mutation']
+    assert hub.mutations('length') == ['mutation']
+    Hub.build.assert_called_with('length')
+    assert Hub.build.call_count == 1
+    hub.mutations()
+    Hub.build.assert_called_with(None)
+
+
+def test_hub_mutations_real():
+    mutations = Hub().mutations('length')
+    assert {m.name() for m in mutations} == {'length'}
+    assert len(mutations) == len([m for m in Hub().mutations()
+                                  if m.name() == 'length'])
+
+
+def test_hub_add_catalogue(patch):
+    patch.many(Hub, ['build', 'catalogue'])
+    hub = Hub()
+    hub.load()
+    hub.mutations('length')
+    hub.add_catalogue('engine.mutations')
+    assert hub.catalogues == ['engine.mutations']
+    assert hub._loaded is None
+    hub.mutations('length')
+    assert Hub.build.call_count == 2
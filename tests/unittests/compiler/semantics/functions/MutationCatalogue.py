@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+from pytest import mark, raises
+
+from storyscript.compiler.semantics.functions.MutationBuilder import \
+    mutation_builder, parse_type
+from storyscript.compiler.semantics.functions.MutationCatalogue import \
+    MutationCatalogue
+from storyscript.exceptions import StoryError
+
+
+signatures = """
+List[A] append item:A -> List[A]
+# a comment
+
+Map[K,V] flatten -> List[List[any]]
+string replace pattern:regexp by:string -> string
+"""
+
+
+@mark.parametrize('text,expected', [
+    ('int', 'int'),
+    ('regexp', 'regexp'),
+    ('A', 'A'),
+    ('List[A]', ['List', ['A']]),
+    ('Map[K,V]', ['Map', ['K', 'V']]),
+    ('List[List[any]]', ['List', [['List', ['any']]]]),
+])
+def test_mutationcatalogue_types(text, expected):
+    type_ = parse_type(text)
+    assert MutationCatalogue.encode_type(type_) == expected
+    decoded = MutationCatalogue.decode_type(expected)
+    assert type(decoded) is type(type_)
+    assert MutationCatalogue.encode_type(decoded) == expected
+
+
+def test_mutationcatalogue_add():
+    catalogue = MutationCatalogue()
+    catalogue.add(mutation_builder('Map[K,V] get key:K default:V -> V'))
+    assert catalogue.index == {
+        'MapType': {'get': [[['Map', ['K', 'V']], {'key': 'K', 'default': 'V'},
+                             'V']]}
+    }
+
+
+def test_mutationcatalogue_from_signatures():
+    catalogue = MutationCatalogue.from_signatures(signatures)
+    assert sorted(catalogue.index) == ['ListType', 'MapType', 'StringType']
+    assert list(catalogue.index['StringType']) == ['replace']
+
+
+def test_mutationcatalogue_mutations():
+    catalogue = MutationCatalogue.from_signatures(signatures)
+    mutations = catalogue.mutations()
+    expected = [mutation_builder(line) for line in signatures.split('\n')
+                if line and not line.startswith('#')]
+    assert len(mutations) == len(expected)
+    encode = MutationCatalogue.encode_type
+    for mutation, built in zip(mutations, expected):
+        assert mutation.name() == built.name()
+        assert encode(mutation.type()) == encode(built.type())
+        assert mutation.base_type() == built.base_type()
+        assert mutation.arg_names_hash() == built.arg_names_hash()
+        assert encode(mutation.output()) == encode(built.output())
+
+
+def test_mutationcatalogue_mutations_name():
+    catalogue = MutationCatalogue.from_signatures(signatures)
+    mutations = catalogue.mutations('replace')
+    assert [m.name() for m in mutations] == ['replace']
+    assert mutations[0].base_type().__name__ == 'StringType'
+    assert catalogue.mutations('unknown') == []
+
+
+def test_mutationcatalogue_dumps_loads():
+    catalogue = MutationCatalogue.from_signatures(signatures)
+    loaded = MutationCatalogue.loads(catalogue.dumps())
+    assert loaded.index == catalogue.index
+
+
+@mark.parametrize('text', [
+    '{"format": 0, "mutations": {}}',
+    '{"mutations": {}}',
+])
+def test_mutationcatalogue_loads_format(text):
+    with raises(StoryError) as e:
+        MutationCatalogue.loads(text)
+    assert e.value.error.error == 'catalogue_format'
+
+
+def test_mutationcatalogue_write_load(tmpdir):
+    catalogue = MutationCatalogue.from_signatures(signatures)
+    path = str(tmpdir.join('engine.json'))
+    catalogue.write(path)
+    assert MutationCatalogue.load(path).index == catalogue.index
+
+
+def test_mutationcatalogue_load_signatures(tmpdir):
+    path = tmpdir.join('engine.mutations')
+    path.write(signatures)
+    catalogue = MutationCatalogue.load(str(path))
+    assert catalogue.index == MutationCatalogue.from_signatures(
+        signatures).index
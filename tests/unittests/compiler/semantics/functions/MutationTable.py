@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from storyscript.compiler.semantics.functions.HubMutations import Hub, hub
+from storyscript.compiler.semantics.functions.MutationBuilder import \
+    mutation_builder
+from storyscript.compiler.semantics.functions.MutationTable import \
+    MutationTable
+from storyscript.compiler.semantics.types.Types import AnyType, IntType, \
+    StringType
+
+
+def test_mutationtable_init():
+    table = MutationTable.init()
+    assert table.mutations == {}
+    assert table.hub is hub
+
+
+def test_mutationtable_init_catalogues():
+    table = MutationTable.init(catalogues=('engine.mutations',))
+    assert isinstance(table.hub, Hub)
+    assert table.hub.catalogues == ['engine.mutations']
+
+
+def test_mutationtable_lookup(patch):
+    patch.object(Hub, 'mutations', return_value=[
+        mutation_builder('string length -> int')])
+    table = MutationTable(hub=Hub())
+    assert list(table.lookup('length')) == ['StringType']
+    table.lookup('length')
+    Hub.mutations.assert_called_once_with('length')
+
+
+def test_mutationtable_lookup_unknown():
+    assert MutationTable(hub=Hub()).lookup('unknown') == {}
+    assert MutationTable().lookup('unknown') is None
+
+
+def test_mutationtable_resolve():
+    table = MutationTable.init()
+    overloads = table.resolve(StringType.instance(), 'length')
+    assert overloads.single().name() == 'length'
+    assert table.resolve(IntType.instance(), 'split') is None
+    assert table.resolve(StringType.instance(), 'unknown') is None
+    assert list(table.mutations) == ['length', 'split', 'unknown']
+
+
+def test_mutationtable_resolve_any():
+    overloads = MutationTable.init().resolve(AnyType.instance(), 'length')
+    assert len(overloads.all()) > 1
+
+
+def test_mutationtable_insert():
+    table = MutationTable()
+    table.insert(mutation_builder('int double -> int'))
+    assert table.resolve(IntType.instance(), 'double').single().name() == \
+        'double'
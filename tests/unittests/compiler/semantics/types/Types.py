@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import threading
+import time
+
 from lark.lexer import Token
 
 from pytest import mark, raises
@@ -21,6 +24,24 @@ def test_singleton():
     assert c == 1
 
 
+def test_singleton_threads():
+    """
+    Ensures concurrent first calls create a single instance
+    """
+    def test_fn():
+        time.sleep(0.01)
+        return object()
+    single_fn = singleton(test_fn)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(single_fn()))
+               for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(map(id, results))) == 1
+
+
 @mark.parametrize('type_,expected', [
     (BooleanType.instance(), 'boolean'),
     (IntType.instance(), 'int'),
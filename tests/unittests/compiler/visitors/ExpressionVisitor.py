@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
-from pytest import raises
+from lark.lexer import Token
+
+from pytest import mark, raises
 
 from storyscript.compiler.visitors.ExpressionVisitor import ExpressionVisitor
+from storyscript.parser import Tree
 
 
 def test_objects_primary_expression_entity(patch, tree):
@@ -265,3 +268,71 @@ def test_objects_as_expression(patch, tree):
     """
     with raises(NotImplementedError):
         ExpressionVisitor().as_expression(None, 0)
+
+
+def test_objects_operation(patch):
+    """
+    Ensures ExpressionVisitor.operation works with a compacted operation
+    """
+    patch.object(ExpressionVisitor, 'operand', side_effect=lambda t: t.data)
+    patch.object(ExpressionVisitor, 'nary_expression')
+    op = Token('PLUS', '+')
+    tree = Tree('operation', [Tree('a', []), op, Tree('b', []),
+                              Tree('c', [])])
+    r = ExpressionVisitor().operation(tree)
+    ExpressionVisitor.nary_expression.assert_called_with(tree, op,
+                                                         ['a', 'b', 'c'])
+    assert r == ExpressionVisitor.nary_expression()
+
+
+def test_objects_operation_unary(patch):
+    """
+    Ensures ExpressionVisitor.operation works with a compacted unary
+    operation
+    """
+    patch.object(ExpressionVisitor, 'operand', side_effect=lambda t: t.data)
+    patch.object(ExpressionVisitor, 'nary_expression')
+    op = Token('NOT', '!')
+    tree = Tree('operation', [op, Tree('a', [])])
+    ExpressionVisitor().operation(tree)
+    ExpressionVisitor.nary_expression.assert_called_with(tree, op, ['a'])
+
+
+def test_objects_cast_expression(patch):
+    """
+    Ensures ExpressionVisitor.cast_expression works with a compacted cast
+    """
+    patch.many(ExpressionVisitor, ['operand', 'as_expression'])
+    tree = Tree('cast_expression', [Tree('entity', []),
+                                    Tree('as_operator', [])])
+    r = ExpressionVisitor().cast_expression(tree)
+    ExpressionVisitor.operand.assert_called_with(tree.child(0))
+    ExpressionVisitor.as_expression.assert_called_with(
+        tree, ExpressionVisitor.operand())
+    assert r == ExpressionVisitor.as_expression()
+
+
+@mark.parametrize('name', ['entity', 'operation', 'cast_expression',
+                           'or_expression'])
+def test_objects_operand(patch, name):
+    """
+    Ensures ExpressionVisitor.operand dispatches compacted and grammar
+    expressions
+    """
+    patch.many(ExpressionVisitor, ['entity', 'operation', 'cast_expression',
+                                   'or_expression'])
+    tree = Tree(name, [])
+    r = ExpressionVisitor().operand(tree)
+    getattr(ExpressionVisitor, name).assert_called_with(tree)
+    assert r == getattr(ExpressionVisitor, name)()
+
+
+def test_objects_expression_compacted(patch):
+    """
+    Ensures ExpressionVisitor.expression works with a compacted expression
+    """
+    patch.object(ExpressionVisitor, 'operand')
+    tree = Tree('expression', [Tree('operation', [])])
+    r = ExpressionVisitor().expression(tree)
+    ExpressionVisitor.operand.assert_called_with(tree.child(0))
+    assert r == ExpressionVisitor.operand()
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import pickle
+from types import SimpleNamespace
+
 from pytest import fixture, raises
 
 from storyscript.exceptions.ProcessingError import ConstDict, ProcessingError
@@ -78,3 +81,21 @@ def test_const_dict():
     assert d.f2 == 'b2'
     with raises(Exception):
         d.bar
+
+
+def test_const_dict_private():
+    d = ConstDict({'_foo': 'bar'})
+    with raises(AttributeError):
+        d._foo
+    assert d['_foo'] == 'bar'
+
+
+def test_processingerror_pickle():
+    token = SimpleNamespace(line=1, column=2, end_column=3)
+    error = ProcessingError('service_name', token=token,
+                            format={'a': 'b'})
+    copy = pickle.loads(pickle.dumps(error))
+    assert copy.error == 'service_name'
+    assert (copy.line, copy.column, copy.end_column) == (1, 2, 3)
+    assert copy.format.a == 'b'
+    assert copy.message() == error.message()
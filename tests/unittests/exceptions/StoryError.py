@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import os
+import pickle
 
 import click
 
@@ -10,6 +11,7 @@ from pytest import fixture, mark
 
 from storyscript.ErrorCodes import ErrorCodes
 from storyscript.Intention import Intention
+from storyscript.Story import Story
 from storyscript.exceptions import CompilerError, StoryError
 
 
@@ -438,3 +440,36 @@ def test_storyerror_internal_message(patch):
         'Internal error occured: .ICE.\n'
         'Please report at https://github.com/storyscript/storyscript/issues')
     assert StoryError._internal_error(error) == expected
+
+
+def test_storyerror_pickle():
+    story = Story('a = 0', path='a.story')
+    error = StoryError(CompilerError('service_name'), story, path='a.story')
+    copy = pickle.loads(pickle.dumps(error))
+    assert copy.error.error == 'service_name'
+    assert copy.story.story == 'a = 0'
+    assert copy.path == 'a.story'
+
+
+def test_storyerror_pickle_lark_error(patch, magic):
+    """
+    Ensures lark errors are pickled in their identified form
+    """
+    error = UnexpectedCharacters('seq', 0, line=1, column=5)
+    storyerror = StoryError(error, Story('a = $'))
+    storyerror._format = {'character': '$'}
+    patch.object(StoryError, 'identify',
+                 return_value=ErrorCodes.invalid_character)
+    copy = pickle.loads(pickle.dumps(storyerror))
+    assert isinstance(copy.error, CompilerError)
+    assert copy.error.error == 'invalid_character'
+    assert copy.error.format.character == '$'
+    assert (copy.error.line, copy.error.column) == (1, 5)
+    assert not hasattr(copy.error, 'end_column')
+
+
+def test_storyerror_pickle_internal_error():
+    error = StoryError.internal_error(ValueError('ICE'))
+    copy = pickle.loads(pickle.dumps(error))
+    assert str(copy.error) == 'ICE'
+    assert copy.message() == error.message()
@@ -81,6 +81,12 @@ def test_ebnf_set_rule(patch, ebnf):
     assert ebnf._rules['rule'] == 'name'
 
 
+def test_ebnf_rule_definitions(ebnf):
+    ebnf._rules = {'rule': 'value', '!list': 'items', '?inline': 'x'}
+    result = ebnf.rule_definitions()
+    assert result == {'rule': 'value', 'list': 'items', 'inline': 'x'}
+
+
 def test_ebnf_ignore(ebnf):
     ebnf.ignore('terminal')
     assert ebnf._ignores == ['%ignore terminal']
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from lark.lexer import Token
+
+from storyscript.parser import Field, Tree
+
+
+class Node(Tree):
+    __slots__ = ()
+    path = Field('path')
+
+
+def test_field_init():
+    assert Field('path').name == 'path'
+
+
+def test_field_get():
+    path = Tree('path', [])
+    node = Node('node', [Token('NAME', 'path'), Tree('other', []), path,
+                         Tree('path', [])])
+    assert node.path is path
+
+
+def test_field_get_missing():
+    assert Node('node', [Tree('other', [])]).path is None
+
+
+def test_field_get_class():
+    assert isinstance(Node.path, Field)
+
+
+def test_field_override():
+    """
+    Ensures a field can be overridden on a node, like attributes of Tree
+    """
+    node = Node('node', [Tree('path', [])])
+    node.path = 'override'
+    assert node.path == 'override'
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import io
+
+from pytest import fixture
+
+from storyscript.parser import Grammar, NodeGenerator, Nodes, Tree
+
+
+@fixture
+def generator():
+    return NodeGenerator({'service_block': 'service _NL (nested_block)?',
+                          'service': 'path NAME', 'path': 'NAME',
+                          'nested_block': '_INDENT block+ _DEDENT'})
+
+
+def test_nodegenerator_init():
+    assert NodeGenerator('rules').rules == 'rules'
+
+
+def test_nodegenerator_from_grammar(patch):
+    patch.object(Grammar, 'build')
+    result = NodeGenerator.from_grammar()
+    Grammar.build.assert_called_with()
+    assert result.rules == {}
+
+
+def test_nodegenerator_class_name():
+    assert NodeGenerator.class_name('service_block') == 'ServiceBlock'
+    assert NodeGenerator.class_name('start') == 'Start'
+
+
+def test_nodegenerator_fields(generator):
+    assert generator.fields('service_block') == ['service', 'nested_block']
+    assert generator.fields('service') == ['path']
+    assert generator.fields('path') == []
+
+
+def test_nodegenerator_fields_tree_attributes():
+    """
+    Ensures fields don't hide attributes of Tree
+    """
+    generator = NodeGenerator({'rule': 'children node path', 'path': 'NAME',
+                               'children': 'NAME', 'node': 'NAME'})
+    assert generator.fields('rule') == ['path']
+
+
+def test_nodegenerator_field_tuple():
+    assert NodeGenerator.field_tuple([]) == ['    fields = ()']
+    assert NodeGenerator.field_tuple(['a']) == ["    fields = ('a',)"]
+    assert NodeGenerator.field_tuple(['a', 'b']) == ["    fields = ('a', 'b')"]
+
+
+def test_nodegenerator_field_tuple_long():
+    result = NodeGenerator.field_tuple(['field'] * 12)
+    assert result[0] == '    fields = ('
+    assert result[-1] == '    )'
+    assert max(len(line) for line in result) <= 79
+
+
+def test_nodegenerator_node_class(generator):
+    result = generator.node_class('service')
+    assert result == ('class Service(Tree):\n'
+                      '    """\n'
+                      '    service: path NAME\n'
+                      '    """\n'
+                      '    __slots__ = ()\n'
+                      "    fields = ('path',)\n"
+                      "    path = Field('path')\n")
+
+
+def test_nodegenerator_generate(generator):
+    namespace = {}
+    exec(generator.generate().replace('from .', 'from storyscript.parser.'),
+         namespace)
+    node = namespace['node']('service', [Tree('path', [])])
+    assert type(node) is namespace['Service']
+    assert node.path == Tree('path', [])
+    assert type(namespace['node']('other', [])) is Tree
+
+
+def test_nodegenerator_write(tmpdir, generator):
+    target = str(tmpdir.join('Nodes.py'))
+    generator.write(target)
+    with io.open(target, 'r', encoding='utf8') as f:
+        assert f.read() == generator.generate()
+
+
+def test_nodegenerator_write_target(patch, generator):
+    patch.object(io, 'open')
+    generator.write()
+    io.open.assert_called_with(NodeGenerator.target, 'w', encoding='utf8')
+
+
+def test_nodegenerator_up_to_date():
+    """
+    Ensures the node classes match the grammar. Regenerate them with
+    `NodeGenerator.from_grammar().write()`.
+    """
+    with io.open(NodeGenerator.target, 'r', encoding='utf8') as f:
+        assert f.read() == NodeGenerator.from_grammar().generate()
+
+
+def test_nodes_node():
+    node = Nodes.node('if_block', [])
+    assert isinstance(node, Nodes.IfBlock)
+    assert node.data == 'if_block'
+    assert type(Nodes.node('concise_when_block', [])) is Tree
@@ -5,7 +5,7 @@ from lark.lexer import Token
 from pytest import fixture, mark, raises
 
 from storyscript.exceptions import StorySyntaxError
-from storyscript.parser import Transformer, Tree
+from storyscript.parser import Nodes, Transformer, Tree
 
 
 @fixture
@@ -151,6 +151,15 @@ def test_transformer_rules(rule):
     assert result.children == ['matches']
 
 
+def test_transformer_rules_nodes():
+    """
+    Ensures rules are transformed to their node classes
+    """
+    result = Transformer().service_block(['matches'])
+    assert isinstance(result, Nodes.ServiceBlock)
+    assert type(Transformer().line(['matches'])) is Tree
+
+
 def test_transformer_absolute_expression(patch, tree):
     """
     Ensures absolute_expression are untouched when they don't contain